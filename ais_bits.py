@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# ais_bits.py
+# Núcleo do decodificador AIS só com inteiros: o payload armorado vira um único
+# int Python (tabela de 256 entradas para o valor 6-bit de cada caractere) e
+# os campos saem por shift/mask, sem montar strings de '0'/'1'.
+# Tipos 1/2/3: resultados idênticos a aisreal2.decode_position_report(payload_to_bitstring(p)).
+# Tipos 5, 18, 19 e 24 usam o mesmo formato de dict e as mesmas sentinelas.
+#
+# Uso (micro-benchmark contra o caminho por string):
+#   python3 ais_bits.py [n_mensagens]
+
+import sys
+import time
+
+# === Tabela 6-bit ===
+# Mesma regra de sixbit_from_char, pré-calculada para todo byte 0..255.
+def _sixbit(b):
+    v = b - 48
+    if v > 40:
+        v -= 8
+    return v & 0x3F
+
+SIXBIT_TABLE = bytes(_sixbit(b) for b in range(256))
+
+# Sentinelas "não disponível" (ITU-R M.1371)
+ROT_NOT_AVAILABLE = -128
+SOG_NOT_AVAILABLE = 1023
+LON_NOT_AVAILABLE = 181 * 600000        # 108600000
+LAT_NOT_AVAILABLE = 91 * 600000         # 54600000
+COG_NOT_AVAILABLE = 3600
+HEADING_NOT_AVAILABLE = 511
+
+
+def payload_to_int(payload):
+    """Empacota o payload em (valor, n_bits); aceita str ou bytes."""
+    if isinstance(payload, str):
+        try:
+            payload = payload.encode('ascii')
+        except UnicodeEncodeError:
+            # caracteres fora do ASCII: mesma regra, caractere a caractere
+            v = 0
+            for ch in payload:
+                v = (v << 6) | _sixbit(ord(ch))
+            return v, 6 * len(payload)
+    v = 0
+    for b in payload.translate(SIXBIT_TABLE):
+        v = (v << 6) | b
+    return v, 6 * len(payload)
+
+
+def get_uint(v, nbits, start, length):
+    # Campos que passam do fim do payload usam só os bits existentes,
+    # como o fatiamento de string do decodificador antigo.
+    end = start + length
+    if end > nbits:
+        if start >= nbits:
+            return 0
+        end = nbits
+    return (v >> (nbits - end)) & ((1 << (end - start)) - 1)
+
+
+def get_int(v, nbits, start, length):
+    end = start + length
+    if end > nbits:
+        if start >= nbits:
+            return 0
+        end = nbits
+    width = end - start
+    val = (v >> (nbits - end)) & ((1 << width) - 1)
+    # complemento de dois
+    if val >> (width - 1):
+        val -= 1 << width
+    return val
+
+
+def decode_position_report(v, nbits):
+    # Mesmos offsets de missao_ais.decode_position_report (tipos 1/2/3).
+    if nbits >= 143:
+        # caminho rápido: mensagem completa, sem recorte de campos
+        tail = v >> (nbits - 143)
+        rot_raw = (tail >> 93) & 0xFF
+        if rot_raw & 0x80:
+            rot_raw -= 0x100
+        lon_raw = (tail >> 54) & 0xFFFFFFF
+        if lon_raw & 0x8000000:
+            lon_raw -= 0x10000000
+        lat_raw = (tail >> 27) & 0x7FFFFFF
+        if lat_raw & 0x4000000:
+            lat_raw -= 0x8000000
+        msgtype = tail >> 137
+        repeat = (tail >> 135) & 0x3
+        mmsi = (tail >> 105) & 0x3FFFFFFF
+        nav_status = (tail >> 101) & 0xF
+        sog_raw = (tail >> 83) & 0x3FF
+        pos_acc = (tail >> 82) & 0x1
+        cog_raw = (tail >> 15) & 0xFFF
+        heading_raw = (tail >> 6) & 0x1FF
+        timestamp = tail & 0x3F
+    else:
+        msgtype = get_uint(v, nbits, 0, 6)
+        repeat = get_uint(v, nbits, 6, 2)
+        mmsi = get_uint(v, nbits, 8, 30)
+        nav_status = get_uint(v, nbits, 38, 4)
+        rot_raw = get_int(v, nbits, 42, 8)
+        sog_raw = get_uint(v, nbits, 50, 10)
+        pos_acc = get_uint(v, nbits, 60, 1)
+        lon_raw = get_int(v, nbits, 61, 28)
+        lat_raw = get_int(v, nbits, 89, 27)
+        cog_raw = get_uint(v, nbits, 116, 12)
+        heading_raw = get_uint(v, nbits, 128, 9)
+        timestamp = get_uint(v, nbits, 137, 6)
+
+    return {
+        'msgtype': msgtype,
+        'repeat': repeat,
+        'mmsi': mmsi,
+        'nav_status': nav_status,
+        'rot_raw': None if rot_raw == ROT_NOT_AVAILABLE else rot_raw,
+        'sog': None if sog_raw == SOG_NOT_AVAILABLE else sog_raw / 10.0,
+        'pos_acc': pos_acc,
+        'lon': None if lon_raw == LON_NOT_AVAILABLE else lon_raw / 600000.0,
+        'lat': None if lat_raw == LAT_NOT_AVAILABLE else lat_raw / 600000.0,
+        'cog': None if cog_raw >= COG_NOT_AVAILABLE else cog_raw / 10.0,
+        'true_heading': None if heading_raw == HEADING_NOT_AVAILABLE else heading_raw,
+        'timestamp': timestamp,
+    }
+
+
+# === Texto 6-bit (callsign, nome, destino) ===
+SIXBIT_ASCII = "@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !\"#$%&'()*+,-./0123456789:;<=>?"
+
+
+def get_text(v, nbits, start, length):
+    # Só caracteres completos; '@' é enchimento e espaços finais são descartados.
+    nchars = min(length, nbits - start) // 6
+    if nchars <= 0:
+        return None
+    val = (v >> (nbits - start - 6 * nchars)) & ((1 << (6 * nchars)) - 1)
+    chars = []
+    for shift in range(6 * (nchars - 1), -1, -6):
+        chars.append(SIXBIT_ASCII[(val >> shift) & 0x3F])
+    texto = ''.join(chars).split('@', 1)[0].rstrip()
+    return texto or None
+
+
+def _dimensions(v, nbits, start, out):
+    out['to_bow'] = get_uint(v, nbits, start, 9)
+    out['to_stern'] = get_uint(v, nbits, start + 9, 9)
+    out['to_port'] = get_uint(v, nbits, start + 18, 6)
+    out['to_starboard'] = get_uint(v, nbits, start + 24, 6)
+
+
+def _class_b_position(v, nbits, out):
+    # Bloco comum dos tipos 18/19 (mesmas sentinelas dos tipos 1/2/3)
+    sog_raw = get_uint(v, nbits, 46, 10)
+    out['sog'] = None if sog_raw == SOG_NOT_AVAILABLE else sog_raw / 10.0
+    out['pos_acc'] = get_uint(v, nbits, 56, 1)
+    lon_raw = get_int(v, nbits, 57, 28)
+    lat_raw = get_int(v, nbits, 85, 27)
+    out['lon'] = None if lon_raw == LON_NOT_AVAILABLE else lon_raw / 600000.0
+    out['lat'] = None if lat_raw == LAT_NOT_AVAILABLE else lat_raw / 600000.0
+    cog_raw = get_uint(v, nbits, 112, 12)
+    out['cog'] = None if cog_raw >= COG_NOT_AVAILABLE else cog_raw / 10.0
+    heading_raw = get_uint(v, nbits, 124, 9)
+    out['true_heading'] = None if heading_raw == HEADING_NOT_AVAILABLE else heading_raw
+    out['timestamp'] = get_uint(v, nbits, 133, 6)
+
+
+def _header(v, nbits):
+    return {
+        'msgtype': get_uint(v, nbits, 0, 6),
+        'repeat': get_uint(v, nbits, 6, 2),
+        'mmsi': get_uint(v, nbits, 8, 30),
+    }
+
+
+def decode_static_voyage(v, nbits):
+    # Tipo 5: dados estáticos e de viagem (424 bits)
+    out = _header(v, nbits)
+    out['ais_version'] = get_uint(v, nbits, 38, 2)
+    imo = get_uint(v, nbits, 40, 30)
+    out['imo'] = imo or None
+    out['callsign'] = get_text(v, nbits, 70, 42)
+    out['shipname'] = get_text(v, nbits, 112, 120)
+    out['shiptype'] = get_uint(v, nbits, 232, 8)
+    _dimensions(v, nbits, 240, out)
+    out['epfd'] = get_uint(v, nbits, 270, 4)
+    # ETA: 0 (mês/dia), 24 (hora) e 60 (minuto) = não disponível
+    month = get_uint(v, nbits, 274, 4)
+    day = get_uint(v, nbits, 278, 5)
+    hour = get_uint(v, nbits, 283, 5)
+    minute = get_uint(v, nbits, 288, 6)
+    out['eta_month'] = month or None
+    out['eta_day'] = day or None
+    out['eta_hour'] = None if hour == 24 else hour
+    out['eta_minute'] = None if minute == 60 else minute
+    draught = get_uint(v, nbits, 294, 8)
+    out['draught'] = draught / 10.0 if draught else None
+    out['destination'] = get_text(v, nbits, 302, 120)
+    out['dte'] = get_uint(v, nbits, 422, 1)
+    return out
+
+
+def decode_class_b_position(v, nbits):
+    # Tipo 18: posição classe B padrão (168 bits)
+    out = _header(v, nbits)
+    _class_b_position(v, nbits, out)
+    out['cs_unit'] = get_uint(v, nbits, 141, 1)
+    out['raim'] = get_uint(v, nbits, 147, 1)
+    return out
+
+
+def decode_class_b_extended(v, nbits):
+    # Tipo 19: posição classe B estendida, com nome e dimensões (312 bits)
+    out = _header(v, nbits)
+    _class_b_position(v, nbits, out)
+    out['shipname'] = get_text(v, nbits, 143, 120)
+    out['shiptype'] = get_uint(v, nbits, 263, 8)
+    _dimensions(v, nbits, 271, out)
+    out['epfd'] = get_uint(v, nbits, 301, 4)
+    out['raim'] = get_uint(v, nbits, 305, 1)
+    out['dte'] = get_uint(v, nbits, 306, 1)
+    return out
+
+
+def decode_static_data_report(v, nbits):
+    # Tipo 24: parte A (nome) ou parte B (tipo, callsign, dimensões)
+    out = _header(v, nbits)
+    partno = get_uint(v, nbits, 38, 2)
+    out['partno'] = partno
+    if partno == 0:
+        out['shipname'] = get_text(v, nbits, 40, 120)
+    else:
+        out['shiptype'] = get_uint(v, nbits, 40, 8)
+        out['vendorid'] = get_text(v, nbits, 48, 18)
+        out['model'] = get_uint(v, nbits, 66, 4)
+        out['serial'] = get_uint(v, nbits, 70, 20)
+        out['callsign'] = get_text(v, nbits, 90, 42)
+        # MMSI de embarcação auxiliar (98xxxyyyy): o bloco de dimensões é o MMSI da nave-mãe
+        if 980000000 <= out['mmsi'] <= 989999999:
+            out['mothership_mmsi'] = get_uint(v, nbits, 132, 30)
+        else:
+            _dimensions(v, nbits, 132, out)
+    return out
+
+
+DECODERS = {
+    1: decode_position_report,
+    2: decode_position_report,
+    3: decode_position_report,
+    5: decode_static_voyage,
+    18: decode_class_b_position,
+    19: decode_class_b_extended,
+    24: decode_static_data_report,
+}
+
+POSITION_TYPES = (1, 2, 3, 18, 19)
+
+
+def decode_message(v, nbits):
+    # Despacha pelo tipo; None para tipos não suportados
+    if nbits < 6:
+        return None
+    decoder = DECODERS.get(get_uint(v, nbits, 0, 6))
+    if decoder is None:
+        return None
+    return decoder(v, nbits)
+
+
+def decode_payload(payload, fill=0):
+    # Atalho: payload -> dict (ou None se o tipo não for suportado)
+    v, nbits = payload_to_int(payload)
+    if fill:
+        v >>= fill
+        nbits -= fill
+    return decode_message(v, nbits)
+
+
+# === Micro-benchmark ===
+BENCH_PAYLOADS = [
+    "13aEOK?POOPD2WVMDLDRhgvl289?",
+    "13aG;P0P01G?tR;E`R2Dwwv028G",
+    "15N?;P001oG?tR;E`R2Dwwv028G",
+    "15Muq@0020o?;TPG5J0Qw?vN0<0u",
+]
+
+def benchmark(n=100000):
+    import aisreal2
+
+    payloads = [BENCH_PAYLOADS[i % len(BENCH_PAYLOADS)] for i in range(n)]
+
+    # confere equivalência antes de medir
+    for p in BENCH_PAYLOADS:
+        antigo = aisreal2.decode_position_report(aisreal2.payload_to_bitstring(p))
+        novo = decode_position_report(*payload_to_int(p))
+        if antigo != novo:
+            raise AssertionError(f"Divergência em {p}: {antigo} != {novo}")
+
+    t0 = time.perf_counter()
+    for p in payloads:
+        aisreal2.decode_position_report(aisreal2.payload_to_bitstring(p))
+    t_str = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for p in payloads:
+        decode_position_report(*payload_to_int(p))
+    t_int = time.perf_counter() - t0
+
+    print(f"Mensagens: {n}")
+    print(f"String '0'/'1' (aisreal2): {n / t_str:,.0f} msg/s")
+    print(f"Inteiro + tabela (ais_bits): {n / t_int:,.0f} msg/s")
+    print(f"Ganho: {t_str / t_int:.2f}x")
+    return n / t_str, n / t_int
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) >= 2 else 100000)
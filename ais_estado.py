@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# ais_estado.py
+# Tabela em memória com o último estado conhecido de cada embarcação (por MMSI).
+# Upsert O(1) (dict + OrderedDict na ordem da última atualização), expiração por
+# idade máxima e capacidade limitada; registros compactos com __slots__.
+#
+# Uso:
+#   tabela = TabelaEmbarcacoes(max_idade=600, capacidade=20000)
+#   tabela.atualizar(decoded)       # dict de ais_bits / aisreal2 / ais_nmea
+
+import time
+from collections import OrderedDict
+
+from ais_bits import POSITION_TYPES
+
+# Campos estáticos que cada tipo de mensagem pode trazer
+CAMPOS_ESTATICOS = ('shipname', 'callsign', 'imo', 'shiptype', 'to_bow', 'to_stern',
+                    'to_port', 'to_starboard', 'draught', 'destination')
+
+
+class Embarcacao:
+    __slots__ = ('mmsi', 'visto', 't_posicao', 'msgtype', 'lat', 'lon', 'sog', 'cog',
+                 'heading', 'nav_status') + CAMPOS_ESTATICOS
+
+    def __init__(self, mmsi):
+        self.mmsi = mmsi
+        self.visto = 0.0
+        self.t_posicao = None
+        self.msgtype = None
+        self.lat = None
+        self.lon = None
+        self.sog = None
+        self.cog = None
+        self.heading = None
+        self.nav_status = None
+        for campo in CAMPOS_ESTATICOS:
+            setattr(self, campo, None)
+
+    def as_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return (f"Embarcacao(mmsi={self.mmsi}, lat={self.lat}, lon={self.lon}, "
+                f"sog={self.sog}, nome={self.shipname})")
+
+
+class TabelaEmbarcacoes:
+    def __init__(self, max_idade=600.0, capacidade=20000, relogio=time.monotonic):
+        self.max_idade = max_idade
+        self.capacidade = capacidade
+        self.relogio = relogio
+        # OrderedDict: do mais antigo (início) ao mais recente (fim)
+        self._registros = OrderedDict()
+        self.expirados = 0
+        self.descartados_capacidade = 0
+        self.ouvintes = []          # callbacks (registro, novo) chamados a cada upsert
+        self.ouvintes_remocao = []  # callbacks (registro) chamados na expiração/descarte
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __contains__(self, mmsi):
+        return mmsi in self._registros
+
+    def __iter__(self):
+        return iter(self._registros.values())
+
+    def get(self, mmsi):
+        return self._registros.get(mmsi)
+
+    def atualizar(self, decoded, agora=None):
+        """Upsert do dict decodificado; devolve o registro atualizado."""
+        if decoded is None:
+            return None
+        if agora is None:
+            agora = self.relogio()
+        mmsi = decoded['mmsi']
+
+        registros = self._registros
+        reg = registros.get(mmsi)
+        novo = reg is None
+        if novo:
+            if len(registros) >= self.capacidade:
+                self.expirar(agora)
+                if len(registros) >= self.capacidade:
+                    _, descartado = registros.popitem(last=False)
+                    self.descartados_capacidade += 1
+                    for ouvinte in self.ouvintes_remocao:
+                        ouvinte(descartado)
+            reg = Embarcacao(mmsi)
+            registros[mmsi] = reg
+        else:
+            registros.move_to_end(mmsi)
+        reg.visto = agora
+
+        msgtype = decoded.get('msgtype')
+        if msgtype in POSITION_TYPES:
+            lat = decoded.get('lat')
+            lon = decoded.get('lon')
+            if lat is not None and lon is not None:
+                reg.lat = lat
+                reg.lon = lon
+                reg.t_posicao = agora
+            reg.msgtype = msgtype
+            reg.sog = decoded.get('sog')
+            reg.cog = decoded.get('cog')
+            reg.heading = decoded.get('true_heading')
+            if 'nav_status' in decoded:
+                reg.nav_status = decoded['nav_status']
+
+        # dados estáticos (tipos 5, 19 e 24): só sobrescreve o que veio na mensagem
+        if msgtype in (5, 19, 24):
+            for campo in CAMPOS_ESTATICOS:
+                valor = decoded.get(campo)
+                if valor is not None:
+                    setattr(reg, campo, valor)
+
+        # expiração incremental: só olha a cabeça da fila
+        if registros:
+            cabeca = next(iter(registros.values()))
+            if agora - cabeca.visto > self.max_idade:
+                self.expirar(agora)
+
+        for ouvinte in self.ouvintes:
+            ouvinte(reg, novo)
+        return reg
+
+    def expirar(self, agora=None):
+        # Remove registros sem atualização há mais de max_idade; devolve os removidos.
+        if agora is None:
+            agora = self.relogio()
+        limite = agora - self.max_idade
+        registros = self._registros
+        removidos = []
+        while registros:
+            mmsi, reg = next(iter(registros.items()))
+            if reg.visto >= limite:
+                break
+            del registros[mmsi]
+            removidos.append(reg)
+            for ouvinte in self.ouvintes_remocao:
+                ouvinte(reg)
+        self.expirados += len(removidos)
+        return removidos
+
+    def com_posicao(self):
+        return [reg for reg in self._registros.values() if reg.lat is not None]
+
+
+if __name__ == "__main__":
+    # micro-benchmark de upsert
+    import random
+
+    tabela = TabelaEmbarcacoes(max_idade=600, capacidade=50000)
+    mensagens = [{'msgtype': 1, 'mmsi': 200000000 + random.randrange(20000),
+                  'lat': random.uniform(-60, 60), 'lon': random.uniform(-180, 180),
+                  'sog': 10.0, 'cog': 90.0, 'true_heading': 90, 'nav_status': 0}
+                 for _ in range(200000)]
+    t0 = time.perf_counter()
+    for i, m in enumerate(mensagens):
+        tabela.atualizar(m, agora=i * 0.001)
+    dt = time.perf_counter() - t0
+    print(f"Upserts: {len(mensagens)} em {dt:.3f} s ({len(mensagens) / dt:,.0f}/s), "
+          f"embarcações: {len(tabela)}")
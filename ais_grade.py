@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# ais_grade.py
+# Índice espacial em grade fixa lat/lon para as posições AIS: responde
+# "quais navios estão perto desta mancha" sem varrer todos os registros.
+# Consultas por caixa, por raio (km) e k vizinhos mais próximos; mantido
+# incrementalmente a partir da TabelaEmbarcacoes (ais_estado).
+#
+# Uso (benchmark com 100k embarcações sintéticas):
+#   python3 ais_grade.py [n_embarcacoes]
+
+import heapq
+import math
+import sys
+import time
+
+RAIO_TERRA_KM = 6371.0088
+KM_POR_GRAU = math.pi * RAIO_TERRA_KM / 180.0     # ~111.2 km
+
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    # Haversine
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GradeEspacial:
+    def __init__(self, celula_graus=0.1):
+        self.celula = celula_graus
+        self.n_lat = int(math.ceil(180.0 / celula_graus))
+        self.n_lon = int(math.ceil(360.0 / celula_graus))
+        self._celulas = {}      # (i, j) -> {mmsi: (lat, lon)}
+        self._posicoes = {}     # mmsi -> (lat, lon, (i, j))
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def _indice(self, lat, lon):
+        i = min(int((lat + 90.0) / self.celula), self.n_lat - 1)
+        j = int((lon + 180.0) / self.celula) % self.n_lon
+        return i, j
+
+    # === Manutenção incremental ===
+    def atualizar(self, mmsi, lat, lon):
+        chave = self._indice(lat, lon)
+        antigo = self._posicoes.get(mmsi)
+        if antigo is not None and antigo[2] != chave:
+            celula = self._celulas[antigo[2]]
+            del celula[mmsi]
+            if not celula:
+                del self._celulas[antigo[2]]
+        celula = self._celulas.get(chave)
+        if celula is None:
+            celula = self._celulas[chave] = {}
+        celula[mmsi] = (lat, lon)
+        self._posicoes[mmsi] = (lat, lon, chave)
+
+    def remover(self, mmsi):
+        antigo = self._posicoes.pop(mmsi, None)
+        if antigo is None:
+            return
+        celula = self._celulas[antigo[2]]
+        del celula[mmsi]
+        if not celula:
+            del self._celulas[antigo[2]]
+
+    def conectar(self, tabela):
+        # Mantém a grade sincronizada com uma ais_estado.TabelaEmbarcacoes.
+        def ao_atualizar(reg, novo):
+            if reg.lat is not None and reg.t_posicao == reg.visto:
+                self.atualizar(reg.mmsi, reg.lat, reg.lon)
+
+        def ao_remover(reg):
+            self.remover(reg.mmsi)
+
+        tabela.ouvintes.append(ao_atualizar)
+        tabela.ouvintes_remocao.append(ao_remover)
+        for reg in tabela.com_posicao():
+            self.atualizar(reg.mmsi, reg.lat, reg.lon)
+
+    # === Consultas ===
+    def _colunas(self, lon_min, lon_max):
+        # Faixa de colunas; trata caixas que cruzam o antimeridiano (lon_min > lon_max).
+        j0 = int((lon_min + 180.0) / self.celula)
+        j1 = int((lon_max + 180.0) / self.celula)
+        if lon_min > lon_max:
+            j1 += self.n_lon
+        if j1 - j0 + 1 >= self.n_lon:
+            return range(self.n_lon)
+        return [j % self.n_lon for j in range(j0, j1 + 1)]
+
+    def consultar_caixa(self, lat_min, lat_max, lon_min, lon_max):
+        """MMSIs dentro da caixa; lon_min > lon_max cruza o antimeridiano."""
+        i0, _ = self._indice(max(lat_min, -90.0), 0.0)
+        i1, _ = self._indice(min(lat_max, 90.0), 0.0)
+        cruza = lon_min > lon_max
+        resultado = []
+        celulas = self._celulas
+        for i in range(i0, i1 + 1):
+            for j in self._colunas(lon_min, lon_max):
+                celula = celulas.get((i, j))
+                if not celula:
+                    continue
+                for mmsi, (lat, lon) in celula.items():
+                    if not (lat_min <= lat <= lat_max):
+                        continue
+                    if cruza:
+                        if lon >= lon_min or lon <= lon_max:
+                            resultado.append(mmsi)
+                    elif lon_min <= lon <= lon_max:
+                        resultado.append(mmsi)
+        return resultado
+
+    def consultar_raio(self, lat, lon, raio_km):
+        """Lista de (distancia_km, mmsi) dentro do raio, da mais próxima à mais distante."""
+        dlat = raio_km / KM_POR_GRAU
+        lat_min = lat - dlat
+        lat_max = lat + dlat
+        cos_lat = math.cos(math.radians(min(89.9, max(abs(lat_min), abs(lat_max)))))
+        if lat_min <= -90.0 or lat_max >= 90.0 or raio_km >= KM_POR_GRAU * 180.0 * cos_lat:
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            dlon = raio_km / (KM_POR_GRAU * cos_lat)
+            lon_min = (lon - dlon + 180.0) % 360.0 - 180.0
+            lon_max = (lon + dlon + 180.0) % 360.0 - 180.0
+        resultado = []
+        for mmsi in self.consultar_caixa(lat_min, lat_max, lon_min, lon_max):
+            plat, plon, _ = self._posicoes[mmsi]
+            d = distancia_km(lat, lon, plat, plon)
+            if d <= raio_km:
+                resultado.append((d, mmsi))
+        resultado.sort()
+        return resultado
+
+    def k_mais_proximos(self, lat, lon, k):
+        """Os k navios mais próximos como (distancia_km, mmsi), em anéis crescentes de células."""
+        if k <= 0 or not self._posicoes:
+            return []
+        ci, cj = self._indice(lat, lon)
+        heap = []       # max-heap por distância: (-d, mmsi)
+        celulas = self._celulas
+        vistas = set()  # anéis grandes dão a volta em longitude: não repetir células
+
+        def visitar(celula):
+            for mmsi, (plat, plon) in celula.items():
+                d = distancia_km(lat, lon, plat, plon)
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d, mmsi))
+                elif d < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d, mmsi))
+
+        max_anel = max(self.n_lat, self.n_lon // 2 + 1)
+        anel = 0
+        while anel <= max_anel:
+            if (2 * anel + 1) ** 2 > len(celulas):
+                # frota pequena ou longe: os anéis já passam do número de células
+                # ocupadas; varrer só as ocupadas que faltam sai mais barato
+                for chave, celula in celulas.items():
+                    if chave not in vistas:
+                        visitar(celula)
+                break
+            for i in range(max(0, ci - anel), min(self.n_lat - 1, ci + anel) + 1):
+                if abs(i - ci) == anel:
+                    js = range(cj - anel, cj + anel + 1)
+                else:
+                    js = (cj - anel, cj + anel)
+                for j in js:
+                    chave = (i, j % self.n_lon)
+                    celula = celulas.get(chave)
+                    if not celula or chave in vistas:
+                        continue
+                    vistas.add(chave)
+                    visitar(celula)
+            # todos os navios já estão no heap (k >= frota): não há o que procurar
+            if len(heap) == len(self._posicoes):
+                break
+            # Tudo a menos de 'anel' células do ponto já foi visto; largura mínima de
+            # célula em km dentro do anel (longitude encolhe com a latitude).
+            if len(heap) == k:
+                lat_ext = min(89.9, abs(lat) + (anel + 1) * self.celula)
+                largura_km = self.celula * KM_POR_GRAU * math.cos(math.radians(lat_ext))
+                if -heap[0][0] <= anel * largura_km:
+                    break
+            anel += 1
+        return sorted((-d, mmsi) for d, mmsi in heap)
+
+
+# === Benchmark: grade x varredura linear ===
+def benchmark(n=100000, n_consultas=200, raio_km=50.0, k=10, celula=0.25):
+    import random
+    rnd = random.Random(42)
+
+    # frota concentrada em faixas costeiras, como num feed real
+    portos = [(rnd.uniform(-60, 60), rnd.uniform(-180, 180)) for _ in range(200)]
+    frota = []
+    for mmsi in range(200000000, 200000000 + n):
+        plat, plon = portos[rnd.randrange(len(portos))]
+        lat = max(-89.0, min(89.0, plat + rnd.gauss(0, 2.0)))
+        lon = (plon + rnd.gauss(0, 2.0) + 180.0) % 360.0 - 180.0
+        frota.append((mmsi, lat, lon))
+
+    grade = GradeEspacial(celula)
+    t0 = time.perf_counter()
+    for mmsi, lat, lon in frota:
+        grade.atualizar(mmsi, lat, lon)
+    t_carga = time.perf_counter() - t0
+
+    consultas = [portos[rnd.randrange(len(portos))] for _ in range(n_consultas)]
+
+    def linear_raio(lat, lon):
+        res = [(distancia_km(lat, lon, plat, plon), mmsi) for mmsi, plat, plon in frota]
+        return sorted(r for r in res if r[0] <= raio_km)
+
+    def linear_knn(lat, lon):
+        return heapq.nsmallest(k, ((distancia_km(lat, lon, plat, plon), mmsi)
+                                   for mmsi, plat, plon in frota))
+
+    n_lin = max(1, n_consultas // 20)   # a varredura linear é lenta: amostra menor
+
+    t0 = time.perf_counter()
+    for lat, lon in consultas:
+        grade.consultar_raio(lat, lon, raio_km)
+    t_grade_raio = (time.perf_counter() - t0) / n_consultas
+
+    t0 = time.perf_counter()
+    for lat, lon in consultas[:n_lin]:
+        linear_raio(lat, lon)
+    t_lin_raio = (time.perf_counter() - t0) / n_lin
+
+    t0 = time.perf_counter()
+    for lat, lon in consultas:
+        grade.k_mais_proximos(lat, lon, k)
+    t_grade_knn = (time.perf_counter() - t0) / n_consultas
+
+    t0 = time.perf_counter()
+    for lat, lon in consultas[:n_lin]:
+        linear_knn(lat, lon)
+    t_lin_knn = (time.perf_counter() - t0) / n_lin
+
+    # conferência de resultados
+    for lat, lon in consultas[:n_lin]:
+        assert [m for _, m in grade.consultar_raio(lat, lon, raio_km)] == [m for _, m in linear_raio(lat, lon)]
+        assert [m for _, m in grade.k_mais_proximos(lat, lon, k)] == [m for _, m in linear_knn(lat, lon)]
+
+    print(f"Embarcações: {n} | célula: {celula}° | carga da grade: {t_carga:.3f} s")
+    print(f"Raio {raio_km:.0f} km: grade {t_grade_raio * 1e3:.3f} ms | linear {t_lin_raio * 1e3:.1f} ms "
+          f"({t_lin_raio / t_grade_raio:.0f}x)")
+    print(f"{k}-NN:        grade {t_grade_knn * 1e3:.3f} ms | linear {t_lin_knn * 1e3:.1f} ms "
+          f"({t_lin_knn / t_grade_knn:.0f}x)")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) >= 2 else 100000)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# ais_lote.py
+# Decodificador AIS em lote (tipos 1/2/3) com NumPy: N payloads viram uma matriz
+# (N, 28) uint8 de valores 6-bit e todos os campos saem como colunas de uma vez.
+# Mesmas sentinelas de aisreal2.decode_position_report, com NaN no lugar de None.
+#
+# Uso (reprocessar um log de linhas !AIVDM):
+#   python3 ais_lote.py captura.nmea
+
+import sys
+import time
+
+import numpy as np
+
+from ais_bits import SIXBIT_TABLE, SOG_NOT_AVAILABLE, LON_NOT_AVAILABLE, \
+    LAT_NOT_AVAILABLE, COG_NOT_AVAILABLE, HEADING_NOT_AVAILABLE, ROT_NOT_AVAILABLE
+
+N_CHARS = 28            # 168 bits de uma posição tipo 1/2/3
+MIN_CHARS = 24          # 144 bits: cobre todos os campos até o timestamp (bit 143)
+
+_SIXBIT_LUT = np.frombuffer(SIXBIT_TABLE, dtype=np.uint8)
+
+# (nome, início, tamanho, com sinal)
+CAMPOS = [
+    ('msgtype', 0, 6, False),
+    ('repeat', 6, 2, False),
+    ('mmsi', 8, 30, False),
+    ('nav_status', 38, 4, False),
+    ('rot', 42, 8, True),
+    ('sog', 50, 10, False),
+    ('pos_acc', 60, 1, False),
+    ('lon', 61, 28, True),
+    ('lat', 89, 27, True),
+    ('cog', 116, 12, False),
+    ('heading', 128, 9, False),
+    ('timestamp', 137, 6, False),
+]
+
+
+def payloads_to_sixbit_matrix(payloads):
+    # Completa com '0' (valor 6-bit 0) até N_CHARS e corta o excesso.
+    n = len(payloads)
+    lens = np.fromiter((len(p) for p in payloads), dtype=np.int32, count=n)
+    texto = ''.join(p[:N_CHARS].ljust(N_CHARS, '0') for p in payloads)
+    brutos = np.frombuffer(texto.encode('ascii', 'replace'), dtype=np.uint8)
+    return _SIXBIT_LUT[brutos].reshape(n, N_CHARS), lens
+
+
+def _extrair(bits, inicio, tamanho, com_sinal):
+    pesos = np.left_shift(np.int64(1), np.arange(tamanho - 1, -1, -1, dtype=np.int64))
+    val = bits[:, inicio:inicio + tamanho].astype(np.int64) @ pesos
+    if com_sinal:
+        val = np.where(val >= (1 << (tamanho - 1)), val - (1 << tamanho), val)
+    return val
+
+
+def decode_position_reports_batch(payloads):
+    """Decodifica N payloads de uma vez; devolve dict de colunas NumPy."""
+    payloads = list(payloads)
+    n = len(payloads)
+    if n == 0:
+        matriz = np.zeros((0, N_CHARS), dtype=np.uint8)
+        lens = np.zeros(0, dtype=np.int32)
+    else:
+        matriz, lens = payloads_to_sixbit_matrix(payloads)
+
+    # (N, 28) -> (N, 168) bits, MSB primeiro
+    bits = np.unpackbits(matriz[:, :, None], axis=2)[:, :, 2:].reshape(n, N_CHARS * 6)
+    raw = {nome: _extrair(bits, ini, tam, sinal) for nome, ini, tam, sinal in CAMPOS}
+
+    out = {
+        'msgtype': raw['msgtype'].astype(np.uint8),
+        'repeat': raw['repeat'].astype(np.uint8),
+        'mmsi': raw['mmsi'].astype(np.uint32),
+        'nav_status': raw['nav_status'].astype(np.uint8),
+        'pos_acc': raw['pos_acc'].astype(np.uint8),
+        'timestamp': raw['timestamp'].astype(np.uint8),
+    }
+
+    # --- sentinelas -> NaN ---
+    rot = raw['rot'].astype(np.float64)
+    rot[raw['rot'] == ROT_NOT_AVAILABLE] = np.nan
+    out['rot'] = rot
+
+    sog = raw['sog'] / 10.0
+    sog[raw['sog'] == SOG_NOT_AVAILABLE] = np.nan
+    out['sog'] = sog
+
+    lon = raw['lon'] / 600000.0
+    lon[raw['lon'] == LON_NOT_AVAILABLE] = np.nan
+    out['lon'] = lon
+
+    lat = raw['lat'] / 600000.0
+    lat[raw['lat'] == LAT_NOT_AVAILABLE] = np.nan
+    out['lat'] = lat
+
+    cog = raw['cog'] / 10.0
+    cog[raw['cog'] >= COG_NOT_AVAILABLE] = np.nan
+    out['cog'] = cog
+
+    heading = raw['heading'].astype(np.float64)
+    heading[raw['heading'] == HEADING_NOT_AVAILABLE] = np.nan
+    out['heading'] = heading
+
+    # --- máscaras ---
+    # valido: tipo 1/2/3 e payload longo o bastante para todos os campos
+    out['valido'] = (out['msgtype'] >= 1) & (out['msgtype'] <= 3) & (lens >= MIN_CHARS)
+    out['realista'] = record_is_realistic_batch(out)
+    return out
+
+
+def record_is_realistic_batch(cols):
+    # Mesma regra de aisreal2.record_is_realistic (NaN falha nas comparações)
+    mmsi = cols['mmsi']
+    lat = cols['lat']
+    lon = cols['lon']
+    return ((mmsi >= 100000000) & (mmsi <= 999999999)
+            & (lat >= -90.0) & (lat <= 90.0)
+            & (lon >= -180.0) & (lon <= 180.0))
+
+
+def ler_payloads_arquivo(caminho):
+    # Extrai o campo de payload de cada linha !AIVDM/!AIVDO de fragmento único.
+    payloads = []
+    with open(caminho, 'r', errors='replace') as f:
+        for linha in f:
+            inicio = linha.find('!AIVD')
+            if inicio < 0:
+                continue
+            partes = linha[inicio:].split(',')
+            if len(partes) < 7 or partes[1] != '1':
+                continue
+            payloads.append(partes[5])
+    return payloads
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 ais_lote.py <arquivo_com_linhas_AIVDM>")
+        sys.exit(1)
+
+    payloads = ler_payloads_arquivo(sys.argv[1])
+    t0 = time.perf_counter()
+    cols = decode_position_reports_batch(payloads)
+    dt = time.perf_counter() - t0
+
+    validos = cols['valido']
+    realistas = validos & cols['realista']
+    print(f"Payloads lidos: {len(payloads)}")
+    print(f"Posições (tipos 1/2/3): {int(validos.sum())}")
+    print(f"Registros plausíveis: {int(realistas.sum())}")
+    print(f"MMSIs distintos: {len(np.unique(cols['mmsi'][realistas]))}")
+    print(f"Tempo de decodificação: {dt:.3f} s ({len(payloads) / dt if dt > 0 else 0:,.0f} msg/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# ais_nmea.py
+# Pipeline de sentenças NMEA AIS em geradores:
+#   leitor -> filtro de checksum -> remontagem de fragmentos -> decodificador
+# Pode ficar entre o stdout do AIS-catcher/rtl_ais e o decodificador.
+# Os contadores (checksums ruins, fragmentos órfãos, expirações) mostram quanto
+# lixo chega pelo enlace.
+#
+# Uso:
+#   AIS-catcher -v | python3 ais_nmea.py
+#   python3 ais_nmea.py captura.nmea
+
+import sys
+import time
+from collections import OrderedDict
+
+import ais_bits
+
+PREFIXOS = ('!AIVDM', '!AIVDO')
+
+
+def novas_estatisticas():
+    return {
+        'linhas': 0,
+        'nao_ais': 0,
+        'sem_checksum': 0,
+        'checksum_invalido': 0,
+        'malformadas': 0,
+        'fragmentos': 0,
+        'fragmentos_orfaos': 0,
+        'expirados': 0,
+        'mensagens': 0,
+        'decodificadas': 0,
+        'nao_suportadas': 0,
+    }
+
+
+def nmea_checksum(corpo):
+    # XOR de todos os caracteres entre '!' e '*'
+    cs = 0
+    for b in corpo.encode('ascii', 'replace'):
+        cs ^= b
+    return cs
+
+
+# === Estágio 1: leitor ===
+def ler_linhas(fonte, stats):
+    for linha in fonte:
+        if isinstance(linha, bytes):
+            linha = linha.decode('ascii', 'replace')
+        linha = linha.strip()
+        if not linha:
+            continue
+        stats['linhas'] += 1
+        # alguns feeders prefixam timestamp/tag blocks: procurar o início da sentença
+        inicio = linha.find('!AIVD')
+        if inicio < 0:
+            stats['nao_ais'] += 1
+            continue
+        yield linha[inicio:]
+
+
+# === Estágio 2: filtro de checksum ===
+def verificar_checksum(linha, stats):
+    # Devolve a sentença sem o '*hh' se o checksum bater; None caso contrário.
+    asterisco = linha.rfind('*')
+    if asterisco < 0 or len(linha) < asterisco + 3:
+        stats['sem_checksum'] += 1
+        return None
+    try:
+        esperado = int(linha[asterisco + 1:asterisco + 3], 16)
+    except ValueError:
+        stats['checksum_invalido'] += 1
+        return None
+    if nmea_checksum(linha[1:asterisco]) != esperado:
+        stats['checksum_invalido'] += 1
+        return None
+    return linha[:asterisco]
+
+
+def filtrar_checksum(linhas, stats):
+    for linha in linhas:
+        corpo = verificar_checksum(linha, stats)
+        if corpo is not None:
+            yield corpo
+
+
+# === Estágio 3: remontagem de fragmentos ===
+class Remontador:
+    """Junta fragmentos por (canal, seq_id) num buffer limitado e com expiração."""
+
+    def __init__(self, stats, max_pendentes=64, timeout=2.0, relogio=time.monotonic):
+        self.stats = stats
+        self.max_pendentes = max_pendentes
+        self.timeout = timeout
+        self.relogio = relogio
+        self.pendentes = OrderedDict()   # (canal, seq_id) -> [t0, total, proximo, partes]
+
+    def adicionar(self, s):
+        # Devolve (canal, payload, fill_bits) quando a mensagem fica completa.
+        stats = self.stats
+        campos = s.split(',')
+        if len(campos) < 7 or campos[0] not in PREFIXOS:
+            stats['malformadas'] += 1
+            return None
+        try:
+            total = int(campos[1])
+            numero = int(campos[2])
+            fill = int(campos[6] or 0)
+        except ValueError:
+            stats['malformadas'] += 1
+            return None
+        seq_id = campos[3]
+        canal = campos[4]
+        payload = campos[5]
+
+        # mensagem de fragmento único: caminho direto
+        if total == 1:
+            stats['mensagens'] += 1
+            return canal, payload, fill
+
+        stats['fragmentos'] += 1
+        agora = self.relogio()
+        pendentes = self.pendentes
+
+        # expirar mensagens incompletas antigas (OrderedDict em ordem de chegada)
+        while pendentes:
+            chave_antiga, item = next(iter(pendentes.items()))
+            if agora - item[0] <= self.timeout:
+                break
+            del pendentes[chave_antiga]
+            stats['expirados'] += 1
+
+        chave = (canal, seq_id)
+        item = pendentes.get(chave)
+
+        if numero == 1:
+            if item is not None:
+                # nova mensagem com a mesma chave: a anterior ficou órfã
+                stats['fragmentos_orfaos'] += len(item[3])
+                del pendentes[chave]
+            if len(pendentes) >= self.max_pendentes:
+                pendentes.popitem(last=False)
+                stats['expirados'] += 1
+            pendentes[chave] = [agora, total, 2, [payload]]
+            return None
+
+        if item is None or item[1] != total or item[2] != numero:
+            # fragmento sem início, fora de ordem ou de outra mensagem
+            stats['fragmentos_orfaos'] += 1
+            if item is not None:
+                stats['fragmentos_orfaos'] += len(item[3])
+                del pendentes[chave]
+            return None
+
+        item[3].append(payload)
+        item[2] += 1
+        if numero == total:
+            del pendentes[chave]
+            stats['mensagens'] += 1
+            return canal, ''.join(item[3]), fill
+        return None
+
+
+def remontar_fragmentos(sentencas, stats, max_pendentes=64, timeout=2.0, relogio=time.monotonic):
+    """Gera (canal, payload, fill_bits); mensagens multipartes saem já juntas."""
+    remontador = Remontador(stats, max_pendentes, timeout, relogio)
+    for s in sentencas:
+        mensagem = remontador.adicionar(s)
+        if mensagem is not None:
+            yield mensagem
+
+
+# === Estágio 4: decodificador ===
+def decodificar_mensagem(canal, payload, fill, stats):
+    v, nbits = ais_bits.payload_to_int(payload)
+    # fill bits são enchimento no fim do último caractere
+    if fill:
+        v >>= fill
+        nbits -= fill
+    decoded = ais_bits.decode_message(v, nbits)
+    if decoded is None:
+        stats['nao_suportadas'] += 1
+        return None
+    decoded['canal'] = canal
+    decoded['payload'] = payload
+    stats['decodificadas'] += 1
+    return decoded
+
+
+def decodificar(mensagens, stats):
+    for canal, payload, fill in mensagens:
+        decoded = decodificar_mensagem(canal, payload, fill, stats)
+        if decoded is not None:
+            yield decoded
+
+
+def remontar_linhas(linhas, remontador):
+    # Versão "push" dos estágios 2-3 para quem recebe lotes (UDP, asyncio):
+    # o Remontador guarda os fragmentos entre uma chamada e outra.
+    stats = remontador.stats
+    for linha in linhas:
+        if isinstance(linha, bytes):
+            linha = linha.decode('ascii', 'replace')
+        stats['linhas'] += 1
+        inicio = linha.find('!AIVD')
+        if inicio < 0:
+            stats['nao_ais'] += 1
+            continue
+        corpo = verificar_checksum(linha[inicio:], stats)
+        if corpo is None:
+            continue
+        mensagem = remontador.adicionar(corpo)
+        if mensagem is not None:
+            yield mensagem
+
+
+def processar_linhas(linhas, remontador):
+    # Estágios 2-4 de um lote: lista de mensagens decodificadas
+    stats = remontador.stats
+    saida = []
+    for mensagem in remontar_linhas(linhas, remontador):
+        decoded = decodificar_mensagem(*mensagem, stats)
+        if decoded is not None:
+            saida.append(decoded)
+    return saida
+
+
+def sentenca_unica(canal, payload, fill):
+    # Mensagem já remontada como uma sentença só, com checksum, para
+    # decodificadores que recebem a sentença inteira (pyais.decode)
+    corpo = f"AIVDM,1,1,,{canal},{payload},{fill}"
+    return f"!{corpo}*{nmea_checksum(corpo):02X}"
+
+
+def sentencas_completas(linhas, remontador):
+    """Uma sentença por mensagem completa: multipartes (tipo 5) remontadas pelo Remontador."""
+    for mensagem in remontar_linhas(linhas, remontador):
+        yield sentenca_unica(*mensagem)
+
+
+def pipeline(fonte, stats=None, max_pendentes=64, timeout=2.0):
+    # Encadeia os quatro estágios; 'stats' é atualizado enquanto o gerador roda.
+    if stats is None:
+        stats = novas_estatisticas()
+    linhas = ler_linhas(fonte, stats)
+    sentencas = filtrar_checksum(linhas, stats)
+    mensagens = remontar_fragmentos(sentencas, stats, max_pendentes, timeout)
+    return decodificar(mensagens, stats)
+
+
+def imprimir_estatisticas(stats):
+    print("📊 Estatísticas NMEA:")
+    for chave, valor in stats.items():
+        print(f"  {chave}: {valor}")
+
+
+def main():
+    stats = novas_estatisticas()
+    if len(sys.argv) >= 2:
+        fonte = open(sys.argv[1], 'r', errors='replace')
+    else:
+        fonte = sys.stdin
+
+    try:
+        for decoded in pipeline(fonte, stats):
+            # tipos 5/24 (estáticos) não têm posição: .get() em vez de indexar
+            print(f"MMSI: {decoded['mmsi']} | Tipo: {decoded['msgtype']} | "
+                  f"Lat: {decoded.get('lat')} | Lon: {decoded.get('lon')} | "
+                  f"SOG: {decoded.get('sog')} kn | COG: {decoded.get('cog')}° | "
+                  f"Nome: {decoded.get('shipname')}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if fonte is not sys.stdin:
+            fonte.close()
+    imprimir_estatisticas(stats)
+
+
+if __name__ == "__main__":
+    main()
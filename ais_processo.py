@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# ais_processo.py
+# Leitor não bloqueante do stdout do rtl_ais / AIS-catcher com asyncio: lê o
+# pipe em blocos binários, separa as linhas e manda as !AIVDM/!AIVDO direto
+# para a fila do decodificador (fila limitada; descarta e conta quando cheia,
+# sem nunca parar de esvaziar o pipe). Linhas de log do SDR vão para uma fila
+# à parte, classificadas (PLL, underrun, ...) e impressas com limite de taxa
+# por uma tarefa separada. O processo filho é supervisionado e reiniciado com
+# espera crescente se morrer.
+#
+# Uso:
+#   python3 ais_processo.py -- rtl_ais -n
+#   python3 ais_processo.py -- AIS-catcher -v
+#   python3 ais_processo.py --falso 20000 --duracao 10     # teste de carga com rtl_ais_falso.py
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+
+import ais_nmea
+from ais_estado import TabelaEmbarcacoes
+
+PREFIXOS = tuple(p.encode() for p in ais_nmea.PREFIXOS)
+TAMANHO_BLOCO = 64 * 1024
+
+# (contador, trecho procurado em minúsculas, aviso impresso na primeira vez de cada intervalo)
+DIAGNOSTICOS = (
+    ('pll_nao_travado', b'pll not locked',
+     "⚠️ Aviso: PLL not locked → o tuner não conseguiu travar na frequência. "
+     "Pode ser frequência fora da faixa (24 MHz a 1.7 GHz) ou problema de alimentação USB."),
+    ('underrun', b'underrun',
+     "⚠️ Aviso: Buffer underrun → o Raspberry não conseguiu salvar/processar dados a tempo. "
+     "Reduza taxa de amostragem, aumente intervalo (-i) ou grave em /tmp."),
+)
+
+
+class LogLimitado:
+    """Classifica linhas de log do SDR e imprime no máximo `max_por_intervalo` por intervalo."""
+
+    def __init__(self, max_por_intervalo=5, intervalo=10.0, relogio=time.monotonic, saida=print):
+        self.max_por_intervalo = max_por_intervalo
+        self.intervalo = intervalo
+        self.relogio = relogio
+        self.saida = saida
+        self.contadores = {nome: 0 for nome, _, _ in DIAGNOSTICOS}
+        self.contadores['outros'] = 0
+        self.contadores['suprimidas'] = 0
+        self._inicio = relogio()
+        self._impressas = 0
+        self._suprimidas_intervalo = 0
+        self._avisados = set()
+
+    def _virar_intervalo(self, agora):
+        if agora - self._inicio < self.intervalo:
+            return
+        if self._suprimidas_intervalo:
+            self.saida(f"🔎 Log SDR: {self._suprimidas_intervalo} linhas suprimidas nos últimos "
+                       f"{agora - self._inicio:.0f} s ({self.resumo()})")
+        self._inicio = agora
+        self._impressas = 0
+        self._suprimidas_intervalo = 0
+        self._avisados.clear()
+
+    def registrar(self, linha):
+        agora = self.relogio()
+        self._virar_intervalo(agora)
+        minusculas = linha.lower()
+        for nome, trecho, aviso in DIAGNOSTICOS:
+            if trecho in minusculas:
+                self.contadores[nome] += 1
+                # aviso explicativo só uma vez por intervalo; o resto vira contador
+                if nome not in self._avisados:
+                    self._avisados.add(nome)
+                    self.saida(aviso)
+                return
+        self.contadores['outros'] += 1
+        if self._impressas < self.max_por_intervalo:
+            self._impressas += 1
+            self.saida(f"🔎 Log SDR: {linha.decode('utf-8', 'replace').strip()}")
+        else:
+            self.contadores['suprimidas'] += 1
+            self._suprimidas_intervalo += 1
+
+    def resumo(self):
+        return ', '.join(f"{nome}: {valor}" for nome, valor in self.contadores.items())
+
+
+class ProcessoAIS:
+    def __init__(self, comando, max_fila=1000, tamanho_lote=64, tamanho_bloco=TAMANHO_BLOCO,
+                 tabela=None, ao_decodificar=None, log=None, reiniciar=True,
+                 espera_min=1.0, espera_max=30.0, max_log_pendente=1000):
+        self.comando = list(comando)
+        self.max_fila = max_fila            # em blocos lidos (cada item é uma lista de linhas AIS)
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_bloco = tamanho_bloco
+        self.tabela = tabela
+        self.ao_decodificar = ao_decodificar
+        self.log = log or LogLimitado()
+        self.reiniciar = reiniciar
+        self.espera_min = espera_min        # espera antes de reiniciar; dobra a cada queda rápida
+        self.espera_max = espera_max
+        self.fila = None
+        self.logs = deque(maxlen=max_log_pendente)  # linhas de log ainda não classificadas
+        self.processo = None
+        self.remontador = None
+        self.nmea_stats = ais_nmea.novas_estatisticas()
+        self.stats = {
+            'bytes': 0,
+            'blocos': 0,
+            'linhas_ais': 0,
+            'linhas_log': 0,
+            'logs_descartados': 0,
+            'descartadas': 0,
+            'backlog_max': 0,
+            'lotes': 0,
+            'inicios': 0,
+            'reinicios': 0,
+            'ultimo_codigo': None,
+        }
+        self._parar = False
+
+    # === Caminho quente: pipe -> filas ===
+    def _separar(self, linhas):
+        ais = []
+        for linha in linhas:
+            # maioria das linhas: prefixo direto; tag blocks (\s:...\!AIVDM) pela busca em C
+            if linha.startswith(PREFIXOS) or b'!AIVD' in linha:
+                ais.append(linha)
+            elif linha.strip():
+                if len(self.logs) == self.logs.maxlen:
+                    self.stats['logs_descartados'] += 1
+                self.logs.append(linha)
+                self.stats['linhas_log'] += 1
+        if ais:
+            self.stats['linhas_ais'] += len(ais)
+            try:
+                self.fila.put_nowait(ais)
+            except asyncio.QueueFull:
+                # decodificador atrasado: descarta o bloco mais novo, o pipe continua andando
+                self.stats['descartadas'] += len(ais)
+                return
+            backlog = self.fila.qsize()
+            if backlog > self.stats['backlog_max']:
+                self.stats['backlog_max'] = backlog
+
+    async def _ler(self, stdout):
+        resto = b''
+        while True:
+            bloco = await stdout.read(self.tamanho_bloco)
+            if not bloco:
+                break
+            self.stats['bytes'] += len(bloco)
+            self.stats['blocos'] += 1
+            linhas = (resto + bloco).split(b'\n')
+            resto = linhas.pop()
+            self._separar(linhas)
+        if resto:
+            self._separar([resto])
+
+    # === Supervisão do processo filho ===
+    async def supervisionar(self):
+        espera = self.espera_min
+        while not self._parar:
+            try:
+                self.processo = await asyncio.create_subprocess_exec(
+                    *self.comando, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            except FileNotFoundError:
+                print(f"❌ {self.comando[0]} não encontrado. Verifique o caminho ou instale corretamente.")
+                return
+            self.stats['inicios'] += 1
+            # seq_id dos fragmentos não sobrevive a um reinício do decodificador
+            self.remontador = ais_nmea.Remontador(self.nmea_stats)
+            inicio = time.monotonic()
+            await self._ler(self.processo.stdout)
+            codigo = await self.processo.wait()
+            self.stats['ultimo_codigo'] = codigo
+            if self._parar or not self.reiniciar:
+                break
+            if time.monotonic() - inicio > self.espera_max:
+                espera = self.espera_min                    # rodou bastante: queda isolada
+            elif self.stats['reinicios']:
+                espera = min(espera * 2, self.espera_max)   # caindo em sequência: dobra
+            print(f"⚠️ {os.path.basename(self.comando[0])} terminou (código {codigo}); "
+                  f"reiniciando em {espera:.1f} s")
+            self.stats['reinicios'] += 1
+            await asyncio.sleep(espera)
+
+    # === Fora do caminho quente: decodificação e log ===
+    def processar_lote(self, lote):
+        linhas = [linha.decode('ascii', 'replace') for bloco in lote for linha in bloco]
+        saida = ais_nmea.processar_linhas(linhas, self.remontador)
+        if self.tabela is not None:
+            for decoded in saida:
+                self.tabela.atualizar(decoded)
+        if self.ao_decodificar is not None:
+            for decoded in saida:
+                self.ao_decodificar(decoded)
+        return saida
+
+    async def consumir(self):
+        fila = self.fila
+        while True:
+            lote = [await fila.get()]
+            while len(lote) < self.tamanho_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+            self.stats['lotes'] += 1
+            self.processar_lote(lote)
+
+    def esvaziar_logs(self):
+        while self.logs:
+            self.log.registrar(self.logs.popleft())
+
+    async def registrar_logs(self, periodo=0.2):
+        while True:
+            await asyncio.sleep(periodo)
+            self.esvaziar_logs()
+
+    async def executar(self, duracao=None):
+        """Leitor supervisionado + consumidor + log até o processo parar de vez ou `duracao` (s)."""
+        self.fila = asyncio.Queue(self.max_fila)
+        tarefas = [asyncio.ensure_future(self.consumir()), asyncio.ensure_future(self.registrar_logs())]
+        supervisor = asyncio.ensure_future(self.supervisionar())
+        try:
+            if duracao is None:
+                await supervisor
+            else:
+                await asyncio.wait([supervisor], timeout=duracao)
+            # dá ao consumidor a chance de esvaziar a fila antes de medir
+            while self.backlog():
+                await asyncio.sleep(0.01)
+        finally:
+            self.parar()
+            if not supervisor.done():
+                await asyncio.wait([supervisor], timeout=5)
+            for tarefa in tarefas + [supervisor]:
+                tarefa.cancel()
+            self.esvaziar_logs()
+
+    def parar(self):
+        self._parar = True
+        if self.processo is not None and self.processo.returncode is None:
+            self.processo.terminate()
+
+    def backlog(self):
+        return self.fila.qsize() if self.fila is not None else 0
+
+    def imprimir_estatisticas(self):
+        print("📊 Processo AIS:")
+        for chave, valor in self.stats.items():
+            print(f"  {chave}: {valor}")
+        print(f"  backlog: {self.backlog()}")
+        print(f"  log SDR: {self.log.resumo()}")
+        ais_nmea.imprimir_estatisticas(self.nmea_stats)
+
+
+async def rodar(comando, duracao=None, **kwargs):
+    leitor = ProcessoAIS(comando, **kwargs)
+    await leitor.executar(duracao)
+    return leitor
+
+
+def imprimir(decoded):
+    lat, lon = decoded.get('lat'), decoded.get('lon')
+    if lat is not None and lon is not None:
+        print(f"🛳️ MMSI: {decoded['mmsi']}, Tipo: {decoded['msgtype']}, Posição: ({lat:.5f}, {lon:.5f})")
+    else:
+        print(f"🛳️ MMSI: {decoded['mmsi']}, Tipo: {decoded['msgtype']} (sem posição)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leitor supervisionado do stdout do rtl_ais / AIS-catcher")
+    parser.add_argument('comando', nargs=argparse.REMAINDER, help="comando do receptor (depois de --)")
+    parser.add_argument('--duracao', type=float, default=None)
+    parser.add_argument('--max-fila', type=int, default=1000)
+    parser.add_argument('--lote', type=int, default=64)
+    parser.add_argument('--sem-reiniciar', action='store_true')
+    parser.add_argument('--falso', type=float, default=None,
+                        help="linhas/s do rtl_ais_falso.py no lugar do receptor (0 = o mais rápido possível)")
+    parser.add_argument('--sair-apos', type=int, default=None, help="com --falso: o filho morre após N linhas")
+    args = parser.parse_args()
+
+    comando = [c for c in args.comando if c != '--']
+    ao_decodificar = imprimir
+    if args.falso is not None:
+        comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rtl_ais_falso.py'),
+                   '--taxa', str(args.falso)]
+        if args.sair_apos:
+            comando += ['--sair-apos', str(args.sair_apos)]
+        ao_decodificar = None
+        args.duracao = args.duracao or 10.0
+    if not comando:
+        parser.error("informe o comando do receptor (ex.: -- rtl_ais -n) ou --falso")
+
+    tabela = TabelaEmbarcacoes()
+    t0 = time.perf_counter()
+    try:
+        leitor = asyncio.run(rodar(comando, args.duracao, max_fila=args.max_fila, tamanho_lote=args.lote,
+                                   tabela=tabela, ao_decodificar=ao_decodificar,
+                                   reiniciar=not args.sem_reiniciar))
+    except KeyboardInterrupt:
+        print("\n🛑 Interrompido pelo usuário.")
+        return
+    dt = time.perf_counter() - t0
+
+    leitor.imprimir_estatisticas()
+    print(f"Taxa: {leitor.stats['linhas_ais'] / dt:,.0f} linhas AIS/s lidas | "
+          f"{leitor.nmea_stats['decodificadas'] / dt:,.0f} msg/s decodificadas | "
+          f"embarcações: {len(tabela)}")
+
+
+if __name__ == "__main__":
+    main()
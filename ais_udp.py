@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# ais_udp.py
+# Receptor AIS via UDP com asyncio: escuta várias portas/feeds ao mesmo tempo,
+# o DatagramProtocol só enfileira (fila limitada) e um consumidor decodifica em
+# lotes com ais_nmea. Contadores de descarte e backlog por receptor.
+# Também traz os utilitários de socket usados pelos receptores bloqueantes
+# (receptor_ais.py, decotificador_ais.py, decotificador_ficticio.py): SO_RCVBUF
+# maior, leitura em lote com recv_into num buffer pré-alocado e separação das
+# várias sentenças !AIVDM que um datagrama pode trazer.
+#
+# Uso:
+#   python3 ais_udp.py --portas 10110 10111
+#   python3 ais_udp.py --carga 5000 --duracao 10     # teste de carga local
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+import ais_nmea
+from ais_estado import TabelaEmbarcacoes
+
+
+TAMANHO_DATAGRAMA = 65535            # maior datagrama UDP possível
+RCVBUF_PADRAO = 4 * 1024 * 1024      # absorve rajadas enquanto o Python decodifica
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+# === Utilitários de socket ===
+def configurar_socket(sock, rcvbuf=RCVBUF_PADRAO):
+    # O kernel pode limitar (net.core.rmem_max); devolve o tamanho efetivo.
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    except OSError as e:
+        print(f"[receiver] SO_RCVBUF não ajustado: {e}")
+    return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+def dividir_sentencas(data):
+    # AIS-catcher/rtl_ais juntam várias linhas por datagrama (\r\n ou \n);
+    # sentenças NMEA não têm espaços, então split() sem argumento basta.
+    return data.split()
+
+
+def receber_lotes(sock, max_lote=64, tamanho_buffer=TAMANHO_DATAGRAMA):
+    """Gera listas de sentenças (bytes); espera o 1º datagrama e esvazia o socket sem bloquear.
+
+    Sem recvmmsg na biblioteca padrão: um recv_into bloqueante seguido de até
+    max_lote-1 recv_into com MSG_DONTWAIT, cada datagrama logo depois do
+    anterior no mesmo buffer pré-alocado; o trecho preenchido vira um bytes só
+    por lote (não um por datagrama) e é separado de uma vez.
+    """
+    # 2x: enquanto houver um datagrama máximo livre, nenhum chega truncado
+    buf = bytearray(2 * tamanho_buffer)
+    mv = memoryview(buf)
+    while True:
+        fim = sock.recv_into(buf)
+        if MSG_DONTWAIT:
+            for _ in range(max_lote - 1):
+                if len(buf) - fim < tamanho_buffer + 1:
+                    break
+                # separador: o fim de um datagrama não pode emendar no começo do próximo
+                buf[fim] = 0x0A
+                try:
+                    n = sock.recv_into(mv[fim + 1:], tamanho_buffer, MSG_DONTWAIT)
+                except (BlockingIOError, InterruptedError):
+                    break
+                fim += 1 + n
+        yield dividir_sentencas(mv[:fim].tobytes())
+
+
+class ProtocoloAIS(asyncio.DatagramProtocol):
+    def __init__(self, receptor, feed):
+        self.receptor = receptor
+        self.feed = feed
+
+    def datagram_received(self, data, addr):
+        # caminho quente: nada de decodificar ou imprimir aqui
+        self.receptor.enfileirar(self.feed, data)
+
+    def error_received(self, exc):
+        self.receptor.stats['erros_socket'] += 1
+
+
+class ReceptorAIS:
+    def __init__(self, max_fila=10000, tamanho_lote=256, tabela=None, ao_decodificar=None,
+                 rcvbuf=RCVBUF_PADRAO):
+        self.max_fila = max_fila
+        self.rcvbuf = rcvbuf
+        self.tamanho_lote = tamanho_lote
+        self.tabela = tabela
+        self.ao_decodificar = ao_decodificar
+        self.fila = None
+        self.transportes = []
+        self.remontadores = {}      # um por feed: seq_id só vale dentro do mesmo feed
+        self.nmea_stats = ais_nmea.novas_estatisticas()
+        self.stats = {
+            'datagramas': 0,
+            'descartados': 0,
+            'erros_socket': 0,
+            'lotes': 0,
+            'backlog_max': 0,
+        }
+
+    async def abrir(self, host='0.0.0.0', porta=10110):
+        loop = asyncio.get_running_loop()
+        if self.fila is None:
+            self.fila = asyncio.Queue(self.max_fila)
+        feed = f"{host}:{porta}"
+        self.remontadores[feed] = ais_nmea.Remontador(self.nmea_stats)
+        transporte, _ = await loop.create_datagram_endpoint(
+            lambda: ProtocoloAIS(self, feed), local_addr=(host, porta))
+        sock = transporte.get_extra_info('socket')
+        if sock is not None:
+            configurar_socket(sock, self.rcvbuf)
+        self.transportes.append(transporte)
+        print(f"[receiver] Aguardando dados AIS em {feed} ...")
+        return transporte
+
+    def enfileirar(self, feed, data):
+        self.stats['datagramas'] += 1
+        try:
+            self.fila.put_nowait((feed, data))
+        except asyncio.QueueFull:
+            # política: descartar o mais novo e contar, sem bloquear o loop
+            self.stats['descartados'] += 1
+            return
+        backlog = self.fila.qsize()
+        if backlog > self.stats['backlog_max']:
+            self.stats['backlog_max'] = backlog
+
+    def processar_lote(self, lote):
+        saida = []
+        for feed, data in lote:
+            linhas = data.decode('ascii', 'replace').splitlines()   # várias sentenças por datagrama
+            saida.extend(ais_nmea.processar_linhas(linhas, self.remontadores[feed]))
+        if self.tabela is not None:
+            for decoded in saida:
+                self.tabela.atualizar(decoded)
+        if self.ao_decodificar is not None:
+            for decoded in saida:
+                self.ao_decodificar(decoded)
+        return saida
+
+    async def consumir(self):
+        fila = self.fila
+        while True:
+            # espera o primeiro e pega o que mais já estiver na fila
+            lote = [await fila.get()]
+            while len(lote) < self.tamanho_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+            self.stats['lotes'] += 1
+            self.processar_lote(lote)
+
+    def fechar(self):
+        for transporte in self.transportes:
+            transporte.close()
+        self.transportes = []
+
+    def backlog(self):
+        return self.fila.qsize() if self.fila is not None else 0
+
+    def imprimir_estatisticas(self):
+        print("📊 Receptor UDP:")
+        for chave, valor in self.stats.items():
+            print(f"  {chave}: {valor}")
+        print(f"  backlog: {self.backlog()}")
+        ais_nmea.imprimir_estatisticas(self.nmea_stats)
+
+
+async def rodar(enderecos, duracao=None, **kwargs):
+    receptor = ReceptorAIS(**kwargs)
+    for host, porta in enderecos:
+        await receptor.abrir(host, porta)
+    consumidor = asyncio.ensure_future(receptor.consumir())
+    try:
+        if duracao is None:
+            await consumidor
+        else:
+            await asyncio.sleep(duracao)
+            # dá ao consumidor a chance de esvaziar a fila antes de medir
+            while receptor.backlog():
+                await asyncio.sleep(0.01)
+    finally:
+        consumidor.cancel()
+        receptor.fechar()
+    return receptor
+
+
+def imprimir(decoded):
+    print(f"[receiver] MMSI: {decoded['mmsi']} | Tipo: {decoded['msgtype']} | "
+          f"Lat: {decoded.get('lat')} | Lon: {decoded.get('lon')} | "
+          f"SOG: {decoded.get('sog')} kn | COG: {decoded.get('cog')}°")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receptor AIS UDP (asyncio)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--portas', type=int, nargs='+', default=[10110])
+    parser.add_argument('--max-fila', type=int, default=10000)
+    parser.add_argument('--lote', type=int, default=256)
+    parser.add_argument('--duracao', type=float, default=None)
+    parser.add_argument('--carga', type=float, default=None,
+                        help="datagramas/s do simulador local (decotificador_ficticio.sender_loop)")
+    parser.add_argument('--rajada', type=int, default=1, help="sentenças por datagrama no teste de carga")
+    args = parser.parse_args()
+
+    tabela = TabelaEmbarcacoes()
+    ao_decodificar = imprimir
+    enviados = []
+
+    if args.carga:
+        from decotificador_ficticio import sender_loop
+        ao_decodificar = None
+        duracao = args.duracao or 10.0
+        args.duracao = duracao
+        total = int(args.carga * duracao)
+
+        def enviar():
+            time.sleep(0.2)     # deixa o receptor abrir as portas
+            enviados.append(sender_loop('127.0.0.1', args.portas[0], 1.0 / args.carga,
+                                        verbose=False, total=total, rajada=args.rajada))
+
+        threading.Thread(target=enviar, daemon=True).start()
+
+    t0 = time.perf_counter()
+    try:
+        receptor = asyncio.run(rodar([(args.host, p) for p in args.portas], args.duracao,
+                                     max_fila=args.max_fila, tamanho_lote=args.lote,
+                                     tabela=tabela, ao_decodificar=ao_decodificar))
+    except KeyboardInterrupt:
+        print("\n[receiver] Interrompido pelo usuário.")
+        return
+    dt = time.perf_counter() - t0
+
+    receptor.imprimir_estatisticas()
+    if args.carga:
+        # sender_loop não alcança taxas muito altas só com sleep: conferir 'recebidos'
+        enviado = enviados[0] if enviados else "simulador ainda enviando"
+        print(f"Enviados: {enviado} | recebidos: {receptor.stats['datagramas']} datagramas | "
+              f"taxa decodificada: {receptor.nmea_stats['decodificadas'] / dt:,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # decode_ais_validating.py
-# Decodificador AIS (tipos 1/2/3) com detecção de sentinelas e validação de plausibilidade.
+# Decodificador AIS (tipos 1/2/3, 5, 18, 19 e 24) com detecção de sentinelas e validação de plausibilidade.
 
 import sys
 
+import ais_bits
+from ais_estado import TabelaEmbarcacoes
+
 def sixbit_from_char(c):
     v = ord(c) - 48
     if v > 40:
@@ -104,6 +107,21 @@ def pretty_print(decoded, raw_payload):
     print("True heading:", decoded.get('true_heading'))
     print("Timestamp (s):", decoded.get('timestamp'))
 
+def pretty_print_static(decoded, raw_payload):
+    print("Payload:", raw_payload)
+    print("Message type:", decoded.get('msgtype'))
+    print("MMSI:", decoded.get('mmsi'))
+    for key in ('imo', 'callsign', 'shipname', 'shiptype', 'to_bow', 'to_stern',
+                'to_port', 'to_starboard', 'draught', 'destination'):
+        if key in decoded:
+            print(f"{key}:", decoded[key])
+
+def print_decoded(decoded, raw_payload):
+    if decoded.get('msgtype') in ais_bits.POSITION_TYPES:
+        pretty_print(decoded, raw_payload)
+    else:
+        pretty_print_static(decoded, raw_payload)
+
 def record_is_realistic(decoded):
     # Para considerar "real/aceitavel" vamos exigir:
     # - MMSI plausível (9 dígitos, não zero)
@@ -114,6 +132,10 @@ def record_is_realistic(decoded):
     if not (100000000 <= mmsi <= 999999999):
         return False
 
+    # Mensagens estáticas (tipos 5/24) não trazem posição: basta o MMSI
+    if decoded.get('msgtype') not in ais_bits.POSITION_TYPES:
+        return True
+
     lat = decoded.get('lat')
     lon = decoded.get('lon')
     if not is_plausible_position(lat, lon):
@@ -127,25 +149,24 @@ def record_is_realistic(decoded):
 
     return True
 
-def process_payload(payload, require_realistic=False):
+def process_payload(payload, require_realistic=False, tabela=None):
+    # tabela: ais_estado.TabelaEmbarcacoes opcional, atualizada com cada registro aceito
     payload = payload.strip().strip('"').strip("'")
-    bitstr = payload_to_bitstring(payload)
-    if len(bitstr) < 6:
+    # núcleo por inteiros (ais_bits); payload_to_bitstring fica só para referência/benchmark
+    v, nbits = ais_bits.payload_to_int(payload)
+    if nbits < 6:
         print("Payload too short:", payload)
         return None
-    msgtype = bits_to_uint(bitstr[0:6])
-    if msgtype in (1,2,3):
-        decoded = decode_position_report(bitstr)
-        if require_realistic:
-            if record_is_realistic(decoded):
-                pretty_print(decoded, payload)
-                return decoded
-            else:
-                print("Mensagem descartada (não plausível):", payload)
-                return None
-        else:
-            pretty_print(decoded, payload)
-            return decoded
+    msgtype = ais_bits.get_uint(v, nbits, 0, 6)
+    if msgtype in ais_bits.DECODERS:
+        decoded = ais_bits.decode_message(v, nbits)
+        if require_realistic and not record_is_realistic(decoded):
+            print("Mensagem descartada (não plausível):", payload)
+            return None
+        if tabela is not None:
+            tabela.atualizar(decoded)
+        print_decoded(decoded, payload)
+        return decoded
     else:
         print("Mensagem tipo", msgtype, "não suportada pelo decodificador.")
         return None
@@ -154,11 +175,12 @@ def main():
     # Modo 1: receber payload na linha de comando
     # Modo 2: sem args -> ler linhas do stdin (ideal para pipe ou arquivo com vários payloads)
     require_realistic = True  # só imprime registros plausíveis (mude para False se não quiser filtrar)
+    tabela = TabelaEmbarcacoes()
 
     if len(sys.argv) >= 2:
         # aceitar múltiplos payloads passados na linha de comando
         for p in sys.argv[1:]:
-            process_payload(p, require_realistic=require_realistic)
+            process_payload(p, require_realistic=require_realistic, tabela=tabela)
     else:
         # ler do stdin linha a linha
         print("Lendo payloads do stdin (uma linha por payload). Ctrl+D para terminar.")
@@ -166,7 +188,9 @@ def main():
             line = line.strip()
             if not line:
                 continue
-            process_payload(line, require_realistic=require_realistic)
+            process_payload(line, require_realistic=require_realistic, tabela=tabela)
+
+    print("Embarcações distintas:", len(tabela))
 
 if __name__ == "__main__":
     main()
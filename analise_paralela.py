@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# analise_paralela.py
+# Análise offline (sem janela) de gravações longas da missão: divide o vídeo em
+# faixas de frames, analisa cada faixa num processo do ProcessPoolExecutor com o
+# mesmo detector do resto do projeto (perfil de contornos de perfis_deteccao.json,
+# padrão mar-hsv) e junta os resultados na ordem.
+# Opcionalmente grava o vídeo anotado com um único escritor, em ordem.
+#
+# Uso:
+#   python3 analise_paralela.py manchas_video_rastro.mp4 [--processos 8] [--saida anotado.mp4]
+#   python3 analise_paralela.py video.mp4 --benchmark      # 1 processo x todos os núcleos
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import perfis_deteccao
+
+# Um registro por frame, na ordem do vídeo
+RESULTADO = np.dtype([('frame', np.int32), ('area_percent', np.float32),
+                      ('n_contornos', np.int32), ('area_px', np.float32)])
+# tipos de perfil cujo detector devolve contornos do OpenCV
+TIPOS_CONTORNOS = ('hsv', 'cinza')
+
+
+def contar_frames(video_path):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return 0
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return n
+
+
+def dividir_faixas(n_frames, n_faixas):
+    # Faixas [inicio, fim) de tamanho quase igual; a última vai até o fim do arquivo
+    # (CAP_PROP_FRAME_COUNT é só uma estimativa em alguns contêineres).
+    n_faixas = max(1, min(n_faixas, n_frames))
+    limites = np.linspace(0, n_frames, n_faixas + 1).astype(int)
+    faixas = [(int(a), int(b)) for a, b in zip(limites[:-1], limites[1:])]
+    faixas[-1] = (faixas[-1][0], None)
+    return faixas
+
+
+def verificar_perfil(perfil):
+    # ValueError se o perfil não existir ou não for de contornos: o de linhas
+    # devolve o array LINHA (detector_manchas), não contornos do OpenCV
+    tipo = perfis_deteccao.perfil(perfil)['tipo']
+    if tipo not in TIPOS_CONTORNOS:
+        raise ValueError(f"perfil '{perfil}' é do tipo '{tipo}'; a análise paralela aceita "
+                         f"só perfis de contornos ({', '.join(TIPOS_CONTORNOS)})")
+
+
+def analisar_faixa(video_path, inicio, fim, niveis_piramide=0, guardar_contornos=False, perfil='mar-hsv'):
+    """Analisa os frames [inicio, fim) e devolve (array RESULTADO, lista de contornos ou None)."""
+    cv2.setNumThreads(1)    # paralelismo é por processo; evita disputa de threads do OpenCV
+    cap = cv2.VideoCapture(video_path)
+    posicao = inicio
+    if inicio:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, inicio)
+        # onde a busca caiu de fato (lido do decodificador, não o pedido); alguns
+        # contêineres param no quadro-chave anterior
+        posicao = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    largura = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    altura = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    detector = perfis_deteccao.detector_do_perfil(perfil, largura, altura, niveis_piramide=niveis_piramide)
+
+    n = (fim - inicio) if fim is not None else max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) - inicio)
+    resultado = np.empty(max(n, 1), RESULTADO)
+    contornos_faixa = [] if guardar_contornos else None
+    k = 0
+    while fim is None or inicio + k < fim:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        contornos, area_percent, _ = detector(frame)
+        if k == len(resultado):
+            resultado = np.resize(resultado, 2 * len(resultado))
+        resultado[k] = (posicao + k, area_percent, len(contornos),
+                        sum(cv2.contourArea(c) for c in contornos))
+        if guardar_contornos:
+            contornos_faixa.append(contornos)
+        k += 1
+    cap.release()
+    return resultado[:k].copy(), contornos_faixa
+
+
+def _analisar_faixa(args):
+    return analisar_faixa(*args)
+
+
+def _escrever_faixa(cap, out, resultado, contornos_faixa):
+    # Decodifica de novo os frames da faixa e desenha; só o processo principal escreve.
+    for r, contornos in zip(resultado, contornos_faixa):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cv2.drawContours(frame, contornos, -1, (0, 255, 0), 2)
+        cv2.putText(frame, f"Area: {r['area_percent']:.2f}%",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        out.write(frame)
+
+
+def analisar_video_paralelo(video_path, processos=None, faixas_por_processo=4,
+                            caminho_saida=None, niveis_piramide=0, perfil='mar-hsv'):
+    """Análise sem janela em vários processos; devolve o array RESULTADO de todos os frames, em ordem."""
+    verificar_perfil(perfil)
+    n_frames = contar_frames(video_path)
+    if n_frames <= 0:
+        print("❌ Erro ao abrir o vídeo.")
+        return None
+    processos = processos or os.cpu_count() or 1
+    # mais faixas que processos: equilibra a carga quando algumas faixas demoram mais
+    faixas = dividir_faixas(n_frames, processos * faixas_por_processo)
+    escrever = caminho_saida is not None
+    tarefas = [(video_path, inicio, fim, niveis_piramide, escrever, perfil) for inicio, fim in faixas]
+
+    cap = out = None
+    if escrever:
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        largura = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        altura = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        out = cv2.VideoWriter(caminho_saida, cv2.VideoWriter_fourcc(*'mp4v'), fps, (largura, altura))
+
+    print(f"🎥 Analisando {video_path}: {n_frames} frames em {len(faixas)} faixas, {processos} processos")
+    partes = []
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        # map devolve na ordem das faixas: o escritor trabalha enquanto as próximas são analisadas
+        for resultado, contornos_faixa in executor.map(_analisar_faixa, tarefas):
+            partes.append(resultado)
+            if escrever:
+                _escrever_faixa(cap, out, resultado, contornos_faixa)
+
+    if escrever:
+        cap.release()
+        out.release()
+        print(f"💾 Vídeo anotado salvo como '{caminho_saida}'")
+
+    resultado = np.concatenate(partes) if partes else np.empty(0, RESULTADO)
+    # a busca por frame (CAP_PROP_POS_FRAMES) precisa cair exatamente no início de cada faixa
+    if len(resultado) and not np.array_equal(resultado['frame'], np.arange(len(resultado))):
+        print("⚠️ Frames fora de sequência: a busca no contêiner não foi exata.")
+    print(f"✅ Análise concluída. Frames processados: {len(resultado)}")
+    return resultado
+
+
+def benchmark(video_path, processos=None, niveis_piramide=0, perfil='mar-hsv'):
+    processos = processos or os.cpu_count() or 1
+    tempos = {}
+    resultados = {}
+    for p in sorted({1, processos}):
+        t0 = time.perf_counter()
+        resultados[p] = analisar_video_paralelo(video_path, processos=p, niveis_piramide=niveis_piramide,
+                                                 perfil=perfil)
+        tempos[p] = time.perf_counter() - t0
+    n = len(resultados[1])
+    for p in sorted(tempos):
+        print(f"{p} processo(s): {tempos[p]:.2f} s ({n / tempos[p]:.1f} fps) | "
+              f"aceleração {tempos[1] / tempos[p]:.2f}x")
+    assert all(np.array_equal(resultados[1], r) for r in resultados.values()), "resultados divergentes"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise paralela de vídeo gravado (sem janela)")
+    parser.add_argument('video')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--saida', default=None, help="grava o vídeo anotado neste caminho")
+    parser.add_argument('--piramide', type=int, default=0, help="níveis do modo pirâmide (0 = desligado)")
+    parser.add_argument('--perfil', default='mar-hsv', help="perfil de contornos de perfis_deteccao.json")
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+    try:
+        verificar_perfil(args.perfil)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.benchmark:
+        benchmark(args.video, args.processos, args.piramide, args.perfil)
+        return
+
+    resultado = analisar_video_paralelo(args.video, args.processos, caminho_saida=args.saida,
+                                        niveis_piramide=args.piramide, perfil=args.perfil)
+    if resultado is not None and len(resultado):
+        print(f"📊 Área média {resultado['area_percent'].mean():.2f}% | máxima "
+              f"{resultado['area_percent'].max():.2f}% (quadro {resultado['frame'][resultado['area_percent'].argmax()]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# aquisicao_sdr.py
+# Aquisição contínua do RTL-SDR numa thread própria, separada do processamento:
+# a thread só lê do dongle e converte para um anel de buffers complex64
+# pré-alocados; o laço principal consome os blocos prontos sem copiar.
+# Com read_samples bloqueante no mesmo laço do demodulador, todo o tempo de
+# processamento vira buraco na recepção (uma rajada AIS dura ~26 ms).
+#
+# Cada buffer começa com as últimas `sobreposicao` amostras do bloco anterior
+# (por padrão um slot AIS), para quem processa blocos isolados não cortar uma
+# rajada na borda; DemodAIS guarda estado entre blocos e usa só `novas`.
+# Se o consumidor atrasa e o anel enche, a thread continua lendo (o dongle não
+# espera) e descarta o bloco: conta em 'overruns' / 'amostras_perdidas' e o
+# próximo bloco sai marcado como descontínuo. Com um GravadorIQ (gravacao_iq),
+# a mesma thread grava o IQ bruto de tudo que lê, inclusive blocos descartados.
+#
+# Uso:
+#   with AquisicaoSDR(sdr, 256 * 1024) as aquisicao:
+#       for bloco in aquisicao:           # vista no anel: vale até a próxima iteração
+#           demod.processar(bloco.novas)
+#
+#   python3 aquisicao_sdr.py captura.cf32 --processamento 0.15   # laço bloqueante x anel, sem dongle
+
+import argparse
+import queue
+import threading
+import time
+
+import numpy as np
+
+SLOT_AIS = 60 / 2250                # 26.67 ms
+
+
+class Bloco:
+    """Vista de um buffer do anel: `amostras` = sobreposição + `novas`."""
+
+    __slots__ = ('indice', 'inicio', 'amostras', 'novas', 'descontinuo', '_buffer')
+
+    def __init__(self, indice, inicio, amostras, novas, descontinuo, buffer):
+        self.indice = indice            # número do bloco lido do dongle
+        self.inicio = inicio            # índice absoluto da primeira amostra de `novas`
+        self.amostras = amostras
+        self.novas = novas
+        self.descontinuo = descontinuo  # houve perda entre o bloco anterior e este
+        self._buffer = buffer
+
+
+class AquisicaoSDR:
+    def __init__(self, sdr, amostras_bloco=256 * 1024, n_buffers=8, sobreposicao=None, gravador=None):
+        self.sdr = sdr
+        self.gravador = gravador        # gravacao_iq.GravadorIQ: IQ bruto de tudo que é lido
+        self.amostras_bloco = amostras_bloco
+        if sobreposicao is None:
+            sobreposicao = int(SLOT_AIS * sdr.sample_rate)
+        self.sobreposicao = min(sobreposicao, amostras_bloco)
+        self.buffers = [np.zeros(self.sobreposicao + amostras_bloco, np.complex64) for _ in range(n_buffers)]
+        # buffer de descarte: a leitura continua mesmo com o anel cheio
+        self.descarte = np.zeros(self.sobreposicao + amostras_bloco, np.complex64)
+        self.livres = queue.Queue()
+        for i in range(n_buffers):
+            self.livres.put(i)
+        self.prontos = queue.Queue()
+        self._parar = threading.Event()
+        self._thread = None
+        self._em_uso = None
+        # leitura em bytes (uint8 do dongle) direto para o buffer, sem o complex128 de read_samples
+        self._bytes = hasattr(sdr, 'read_bytes')
+        self.stats = {'blocos': 0, 'entregues': 0, 'overruns': 0, 'amostras_perdidas': 0,
+                      'fila_max': 0, 'tempo_leitura': 0.0}
+
+    # === Thread de leitura ===
+    def _preencher(self, destino):
+        if self._bytes:
+            bruto = np.frombuffer(self.sdr.read_bytes(2 * self.amostras_bloco), np.uint8)
+            if self.gravador is not None:
+                self.gravador.escrever(bruto)
+            n = len(bruto) // 2
+            reais = destino.view(np.float32)[2 * self.sobreposicao:2 * (self.sobreposicao + n)]
+            np.subtract(bruto[:2 * n], np.float32(127.5), out=reais, dtype=np.float32)
+            reais *= np.float32(1 / 127.5)
+        else:
+            amostras = self.sdr.read_samples(self.amostras_bloco)
+            if self.gravador is not None:
+                self.gravador.escrever_complexo(amostras)
+            n = len(amostras)
+            destino[self.sobreposicao:self.sobreposicao + n] = amostras
+        return n
+
+    def _ler(self):
+        anterior = None
+        inicio = 0
+        descontinuo = False
+        while not self._parar.is_set():
+            try:
+                i = self.livres.get_nowait()
+                destino = self.buffers[i]
+            except queue.Empty:
+                i, destino = None, self.descarte
+            if anterior is not None and self.sobreposicao:
+                destino[:self.sobreposicao] = anterior[-self.sobreposicao:]
+            t0 = time.perf_counter()
+            n = self._preencher(destino)
+            self.stats['tempo_leitura'] += time.perf_counter() - t0
+            if n == 0:
+                break
+            self.stats['blocos'] += 1
+            fim = self.sobreposicao + n
+            if i is None:
+                # anel cheio: o consumidor não acompanha; bloco perdido
+                self.stats['overruns'] += 1
+                self.stats['amostras_perdidas'] += n
+                descontinuo = True
+            else:
+                self.prontos.put(Bloco(self.stats['blocos'], inicio, destino[:fim],
+                                       destino[self.sobreposicao:fim], descontinuo, i))
+                self.stats['fila_max'] = max(self.stats['fila_max'], self.prontos.qsize())
+                descontinuo = False
+            anterior = destino[:fim]
+            inicio += n
+        self.prontos.put(None)
+
+    # === Consumo ===
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._ler, name='aquisicao_sdr', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._liberar()
+
+    def _liberar(self):
+        if self._em_uso is not None:
+            self.livres.put(self._em_uso._buffer)
+            self._em_uso = None
+
+    def __iter__(self):
+        while True:
+            bloco = self.prontos.get()
+            # o buffer entregue antes volta para o anel só agora: o consumidor já terminou com ele
+            self._liberar()
+            if bloco is None:
+                return
+            self._em_uso = bloco
+            self.stats['entregues'] += 1
+            yield bloco
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    def imprimir_estatisticas(self):
+        print("📊 Aquisição SDR:")
+        for chave, valor in self.stats.items():
+            print(f"  {chave}: {valor:.2f}" if isinstance(valor, float) else f"  {chave}: {valor}")
+
+
+# === Comparação: laço bloqueante x anel ===
+def _comparar(caminho, processamento, duracao, amostras_bloco):
+    from demod_ais import DemodAIS
+    from gerador_iq import RtlSdrFalso, ler_metadados
+
+    meta = ler_metadados(caminho)
+    blocos = int(duracao * meta.get('taxa', 2.4e6) / amostras_bloco)
+
+    def consumir(demod, iq):
+        mensagens = demod.processar(iq)
+        # processamento extra do laço (câmera, gravação, ...) simulado
+        time.sleep(processamento)
+        return len(mensagens)
+
+    # laço antigo: ler e processar no mesmo laço
+    sdr = RtlSdrFalso(caminho, tempo_real=True)
+    demod = DemodAIS(sdr.sample_rate, sdr.center_freq)
+    recebidas = 0
+    for _ in range(blocos):
+        recebidas += consumir(demod, sdr.read_samples(amostras_bloco))
+    print(f"Bloqueante: {recebidas} mensagens | amostras perdidas {sdr.perdidas} "
+          f"({100 * sdr.perdidas / sdr.entregues:.1f}%)")
+
+    # thread de leitura + anel
+    sdr = RtlSdrFalso(caminho, tempo_real=True)
+    demod = DemodAIS(sdr.sample_rate, sdr.center_freq)
+    recebidas = 0
+    with AquisicaoSDR(sdr, amostras_bloco) as aquisicao:
+        for bloco in aquisicao:
+            recebidas += consumir(demod, bloco.novas)
+            if bloco.indice >= blocos:
+                break
+    perdidas = sdr.perdidas + aquisicao.stats['amostras_perdidas']
+    print(f"Anel:       {recebidas} mensagens | amostras perdidas {perdidas} "
+          f"({100 * perdidas / sdr.entregues:.1f}%) | overruns {aquisicao.stats['overruns']} | "
+          f"fila máx {aquisicao.stats['fila_max']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laço bloqueante x aquisição em thread (RtlSdr falso)")
+    parser.add_argument('arquivo', help="IQ gerado por gerador_iq.py")
+    parser.add_argument('--processamento', type=float, default=0.1, help="s extras de processamento por bloco")
+    parser.add_argument('--duracao', type=float, default=10.0)
+    parser.add_argument('--bloco', type=int, default=256 * 1024)
+    args = parser.parse_args()
+    _comparar(args.arquivo, args.processamento, args.duracao, args.bloco)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,28 @@
+import argparse
 import cv2
-import numpy as np
 import time
 from picamera2 import Picamera2
 
+import perfis_deteccao
+import pipeline_camera
+from portao_mudanca import PortaoMudanca
+from saida_resultados import abrir_saida
+
 # === Inicializar Picamera2 ===
 picam2 = Picamera2()
 picam2.start()
 
 # === Função de detecção de manchas ===
 def detectar_manchas_final(frame_bgr):
-    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
-
-    # --- fundo azul ---
-    azul_min = np.array([85, 50, 50])
-    azul_max = np.array([135, 255, 255])
-    mask_azul = cv2.inRange(hsv, azul_min, azul_max)
-
-    # --- manchas pretas / escuras ---
-    lower_black = np.array([0, 0, 0])
-    upper_black = np.array([180, 255, 80])
-    mask_preto = cv2.inRange(hsv, lower_black, upper_black)
-
-    # --- combinar azul + preto ---
-    mask_manchas = cv2.bitwise_and(mask_azul, mask_preto)
-
-    # --- limpeza morfológica ---
-    kernel = np.ones((5,5), np.uint8)
-    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_OPEN, kernel)
-    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_CLOSE, kernel)
-
-    # --- contornos ---
-    contornos, _ = cv2.findContours(mask_manchas, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    # --- porcentagem ---
-    area_total = np.count_nonzero(mask_azul)
-    area_manchas = sum(cv2.contourArea(c) for c in contornos)
-    area_percent = round((area_manchas / area_total) * 100, 2) if area_total>0 else 0
-
-    return contornos, area_percent, mask_manchas
+    # perfil "mar-hsv" de perfis_deteccao (limiares em perfis_deteccao.json);
+    # a máscara devolvida é o buffer do detector: copie se for guardar
+    return perfis_deteccao.detector('mar-hsv')(frame_bgr)
 
 
 # === Função principal para análise em tempo real ===
-def analisar_camera_rpi_real_time(salvar_saida=False, duracao=60):
+def analisar_camera_rpi_real_time(salvar_saida=False, duracao=60, niveis_piramide=0, mostrar=True,
+                                  caminho_resultados=None, limiar_mudanca=0, intervalo_refresh=30,
+                                  perfil=None, caminho_perfis=None):
     largura, altura = 640, 480
     fps = 30
 
@@ -54,41 +35,127 @@ def analisar_camera_rpi_real_time(salvar_saida=False, duracao=60):
     print("🎥 Captura da câmera iniciada. Pressione Ctrl+C ou 'q' para sair.")
 
     start_time = time.time()
+    # todos os perfis montados uma vez (buffers do tamanho do stream); teclas 1-9 ou
+    # edição do JSON trocam de perfil sem parar a captura
+    motor = perfis_deteccao.MotorDeteccao(caminho_perfis, perfil, largura, altura,
+                                          niveis_piramide=niveis_piramide)
+    nomes_perfis = list(motor.detectores)
+    print(f"🧪 Perfil ativo: {motor.nome} (perfis: {', '.join(nomes_perfis)})")
+    # mar parado: só roda o detector quando o frame muda (limiar_mudanca=0 desliga)
+    portao = PortaoMudanca(limiar_mudanca, intervalo_refresh) if limiar_mudanca else None
+
+    # anotação só quando alguém vai ver: janela ou vídeo gravado
+    desenhar = mostrar or out is not None
+    saida = abrir_saida(caminho_resultados)
+    n_frame = 0
 
     try:
         while True:
             frame = picam2.capture_array()  # captura frame como NumPy array
 
-            contornos, area_percent, _ = detectar_manchas_final(frame)
-
-            # desenhar resultados
-            frame_resultado = frame.copy()
-            cv2.drawContours(frame_resultado, contornos, -1, (0, 255, 0), 2)
-            cv2.putText(frame_resultado, f"Área: {area_percent:.2f}%",
-                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-            cv2.imshow("Manchas - Camera RPi", frame_resultado)
-            if out:
-                out.write(frame_resultado)
-
-            # sair
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            t0 = time.perf_counter()
+            if portao:
+                resultado = portao(frame, motor)
+            else:
+                resultado = motor(frame)
+            contornos, area_percent, _ = resultado
+            t_deteccao = time.perf_counter() - t0
+            saida.escrever({'frame': n_frame, 't': round(time.time() - start_time, 3),
+                            'perfil': motor.nome,
+                            'area_percent': area_percent, 'n_contornos': len(contornos),
+                            'reaproveitado': bool(portao and portao.reaproveitado),
+                            't_deteccao_ms': round(t_deteccao * 1e3, 3)})
+            n_frame += 1
+
+            if desenhar:
+                # desenhar resultados (contornos ou linhas, conforme o perfil)
+                frame_resultado = motor.desenhar(frame, resultado)
+                if out:
+                    out.write(frame_resultado)
+
+            perfil_anterior = motor.nome
+            recarregou = n_frame % 30 == 0 and motor.recarregar_se_mudou()
+            if mostrar:
+                cv2.imshow("Manchas - Camera RPi", frame_resultado)
+                tecla = cv2.waitKey(1) & 0xFF
+                # sair
+                if tecla == ord('q'):
+                    break
+                # 1-9: troca de perfil
+                if ord('1') <= tecla < ord('1') + len(nomes_perfis):
+                    motor.trocar(nomes_perfis[tecla - ord('1')])
+            if recarregou:
+                nomes_perfis = list(motor.detectores)
+            if recarregou or motor.nome != perfil_anterior:
+                print(f"🧪 Perfil ativo: {motor.nome}")
+                if portao:
+                    portao.resultado = None     # resultado guardado era do perfil anterior
             if time.time() - start_time > duracao:
                 break
 
     except KeyboardInterrupt:
         print("🛑 Interrompido pelo usuário.")
 
+    saida.fechar()
     if out:
         out.release()
         print("💾 Vídeo salvo como 'manchas_camera.mp4'")
+    if portao:
+        portao.imprimir_resumo(n_frame / max(time.time() - start_time, 1e-9))
 
     picam2.stop()
-    cv2.destroyAllWindows()
+    if mostrar:
+        cv2.destroyAllWindows()
+
+
+# === Modo em pipeline (captura / detecção / escrita em threads separadas) ===
+def analisar_camera_pipeline(salvar_saida=False, duracao=60, n_detectores=2,
+                             politica=pipeline_camera.DESCARTAR_ANTIGO, mostrar=True,
+                             caminho_resultados=None, niveis_piramide=0,
+                             perfil=None, caminho_perfis=None):
+    print("🎥 Captura da câmera iniciada (pipeline). Pressione Ctrl+C ou 'q' para sair.")
+    fonte = pipeline_camera.FontePicamera(picam2)
+
+    def fabrica_detector():
+        # um detector por thread, do mesmo perfil/JSON do modo normal
+        return perfis_deteccao.detector_do_perfil(perfil, 640, 480, caminho_perfis,
+                                                  niveis_piramide=niveis_piramide)
+
+    return pipeline_camera.executar(
+        fonte, duracao=duracao, mostrar=mostrar,
+        caminho_saida="manchas_camera.mp4" if salvar_saida else None,
+        caminho_resultados=caminho_resultados, n_detectores=n_detectores, politica=politica,
+        fabrica_detector=fabrica_detector, perfil=perfil, caminho_perfis=caminho_perfis)
 
 
 # === Execução ===
 if __name__ == "__main__":
-    analisar_camera_rpi_real_time(salvar_saida=True, duracao=60)
+    parser = argparse.ArgumentParser(description="Detecção de manchas com a câmera do RPi")
+    parser.add_argument('--sem-janela', action='store_true', help="sem imshow/waitKey (sem monitor)")
+    parser.add_argument('--sem-gravar', action='store_true', help="não grava manchas_camera.mp4")
+    parser.add_argument('--resultados', default=None, help="registro por frame (.jsonl ou .csv)")
+    parser.add_argument('--duracao', type=float, default=60)
+    parser.add_argument('--limiar-mudanca', type=float, default=0,
+                        help="pula frames sem mudança acima deste limiar (0 = desligado)")
+    parser.add_argument('--refresh', type=int, default=30, help="com o portão: analisa pelo menos a cada N frames")
+    parser.add_argument('--perfil', default=None, help="perfil inicial (padrão: 'ativo' do JSON)")
+    parser.add_argument('--perfis', default=None, help="arquivo de perfis (padrão: perfis_deteccao.json)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="captura / detecção / escrita em threads separadas (pipeline_camera)")
+    parser.add_argument('--detectores', type=int, default=2, help="com --pipeline: threads de detecção")
+    parser.add_argument('--politica', choices=(pipeline_camera.DESCARTAR_ANTIGO, pipeline_camera.BLOQUEAR),
+                        default=pipeline_camera.DESCARTAR_ANTIGO, help="com --pipeline: fila cheia")
+    args = parser.parse_args()
+
+    if args.pipeline:
+        # sem portão de mudança nem troca de perfil: o perfil fica fixo na execução
+        analisar_camera_pipeline(salvar_saida=not args.sem_gravar, duracao=args.duracao,
+                                 n_detectores=args.detectores, politica=args.politica,
+                                 mostrar=not args.sem_janela, caminho_resultados=args.resultados,
+                                 perfil=args.perfil, caminho_perfis=args.perfis)
+    else:
+        analisar_camera_rpi_real_time(salvar_saida=not args.sem_gravar, duracao=args.duracao,
+                                      mostrar=not args.sem_janela, caminho_resultados=args.resultados,
+                                      limiar_mudanca=args.limiar_mudanca, intervalo_refresh=args.refresh,
+                                      perfil=args.perfil, caminho_perfis=args.perfis)
 
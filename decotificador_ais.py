@@ -1,5 +1,7 @@
 from pyais import decode
 import socket
+import ais_nmea
+from ais_udp import configurar_socket, receber_lotes
 
 
 def processar_mensagem(msg_bytes):
@@ -21,11 +23,15 @@ def processar_mensagem(msg_bytes):
 def receber_udp(host='0.0.0.0', port=10110):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind((host, port))
+    configurar_socket(sock)
     print(f"Aguardando dados AIS em {host}:{port}...")
 
-    while True:
-        data, addr = sock.recvfrom(1024)  
-        processar_mensagem(data)
+    # lê em lote num buffer pré-alocado e separa as sentenças de cada datagrama;
+    # mensagens multipartes (tipo 5) saem remontadas numa sentença só
+    remontador = ais_nmea.Remontador(ais_nmea.novas_estatisticas())
+    for sentencas in receber_lotes(sock):
+        for data in ais_nmea.sentencas_completas(sentencas, remontador):
+            processar_mensagem(data)
 
 
 if __name__ == "__main__":
@@ -3,35 +3,54 @@ import socket
 import threading
 import time
 from pyais import decode
+import ais_nmea
+from ais_udp import configurar_socket, receber_lotes
 
 HOST = "127.0.0.1"   
 PORT = 10110         
 
 
 AIS_EXAMPLES = [
-    b"!AIVDM,1,1,,A,13aG;P0P01G?tR;E`R2Dwwv028G,0*3F",
-    b"!AIVDM,1,1,,A,15N?;P001oG?tR;E`R2Dwwv028G,0*5C",
-    b"!AIVDM,1,1,,B,402OiTP001G?tR;E`R2Dwwv028G,0*1D",
+    b"!AIVDM,1,1,,A,13aG;P0P01G?tR;E`R2Dwwv028G,0*67",
+    b"!AIVDM,1,1,,A,15N?;P001oG?tR;E`R2Dwwv028G,0*09",
+    b"!AIVDM,1,1,,B,402OiTP001G?tR;E`R2Dwwv028G,0*6F",
     # Mensagem de tipo estática (exemplo sem posição)
-    b"!AIVDM,1,1,,A,55NB1r02>t0a;88MD5Jp?w?02@E:,0*1C",
+    b"!AIVDM,1,1,,A,55NB1r02>t0a;88MD5Jp?w?02@E:,0*07",
 ]
 
-def sender_loop(host=HOST, port=PORT, interval=1.0):
-    """Envia mensagens AIS de AIS_EXAMPLES para host:port periodicamente."""
+def sender_loop(host=HOST, port=PORT, interval=1.0, verbose=True, total=None, rajada=1):
+    """Envia mensagens AIS de AIS_EXAMPLES para host:port periodicamente.
+
+    Para teste de carga: interval pequeno (ex. 1/5000), verbose=False,
+    total limita o número de datagramas e rajada junta várias sentenças
+    por datagrama. Devolve quantos datagramas foram enviados.
+    """
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     i = 0
+    enviados = 0
+    proximo = time.perf_counter()
     try:
-        while True:
-            msg = AIS_EXAMPLES[i % len(AIS_EXAMPLES)]
+        while total is None or enviados < total:
+            if rajada > 1:
+                msg = b"\r\n".join(AIS_EXAMPLES[(i + k) % len(AIS_EXAMPLES)] for k in range(rajada))
+            else:
+                msg = AIS_EXAMPLES[i % len(AIS_EXAMPLES)]
             sock.sendto(msg, (host, port))
             # imprime no console do simulador (opcional)
-            print(f"[simulador] enviou: {msg.decode(errors='ignore')}")
-            i += 1
-            time.sleep(interval)
+            if verbose:
+                print(f"[simulador] enviou: {msg.decode(errors='ignore')}")
+            i += rajada
+            enviados += 1
+            # agenda pelo relógio: taxas altas não acumulam o atraso de cada sleep
+            proximo += interval
+            atraso = proximo - time.perf_counter()
+            if atraso > 0:
+                time.sleep(atraso)
     except Exception as e:
         print(f"[simulador] erro: {e}")
     finally:
         sock.close()
+    return enviados
 
 def processar_mensagem(msg_bytes):
     try:
@@ -55,11 +74,14 @@ def processar_mensagem(msg_bytes):
 def receiver_loop(host="0.0.0.0", port=PORT):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind((host, port))
+    configurar_socket(sock)
     print(f"[receiver] Aguardando dados AIS em {host}:{port} ... (Ctrl+C para encerrar)")
+    # fragmentos (tipo 5 vem em duas sentenças) podem cair em datagramas diferentes
+    remontador = ais_nmea.Remontador(ais_nmea.novas_estatisticas())
     try:
-        while True:
-            data, addr = sock.recvfrom(4096)
-            processar_mensagem(data)
+        for sentencas in receber_lotes(sock):
+            for data in ais_nmea.sentencas_completas(sentencas, remontador):
+                processar_mensagem(data)
     except KeyboardInterrupt:
         print("\n[receiver] Interrompido pelo usuário.")
     except Exception as e:
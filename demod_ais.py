@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# demod_ais.py
+# Cadeia de recepção AIS em NumPy, das amostras IQ do RTL-SDR até !AIVDM:
+#   2.4 Msps -> FIR decimador comum (240 ks/s, cobre os dois canais)
+#            -> mistura para 0 Hz + FIR decimador por canal (48 ks/s = 5 amostras/símbolo)
+#            -> discriminador FM -> remoção de DC -> filtro casado (integra 1 símbolo)
+#            -> decisão nas 5 fases de amostragem -> NRZI -> flags HDLC
+#            -> destuffing -> CRC-16 (X.25) -> payload 6-bit -> sentenças NMEA
+# AIS 1 (161.975 MHz, canal A) e AIS 2 (162.025 MHz, canal B) saem da mesma
+# captura centrada em 162.0 MHz.
+#
+# Recuperação de relógio: com 5 amostras por símbolo, cada fase de amostragem
+# vira uma sequência de bits e todas passam pelo HDLC; o CRC escolhe a fase boa
+# de cada rajada (a deriva de relógio numa rajada de ~256 bits é < 0.05 símbolo).
+# A decisão é pelo sinal do discriminador e o NRZI não depende da polaridade.
+#
+# O estado (históricos dos filtros, fase dos osciladores, cauda de símbolos)
+# passa de um bloco para o outro: rajadas cortadas entre dois read_samples são
+# decodificadas no bloco seguinte.
+#
+# Uso:
+#   demod = DemodAIS(taxa=2.4e6, centro=162.0e6)
+#   for sentencas in demod.processar(samples):    # uma lista por mensagem (1 ou 2 fragmentos)
+#       processar_mensagem(*sentencas)
+#
+#   python3 demod_ais.py captura.cf32 [--taxa 2.4e6] [--centro 162e6]   # arquivo IQ, sem dongle
+#       .cf32/.c64/.raw = complex64 intercalado, .cu8/.bin = uint8 do rtl_sdr, .npy = array complexo,
+#       .msiq = gravação de gravacao_iq (taxa e centro vêm do cabeçalho)
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from ais_nmea import nmea_checksum
+
+TAXA_SIMBOLOS = 9600
+AMOSTRAS_SIMBOLO = 5
+TAXA_CANAL = TAXA_SIMBOLOS * AMOSTRAS_SIMBOLO      # 48 ks/s
+CANAIS = (('A', 161.975e6), ('B', 162.025e6))
+
+FLAG = 0x7E
+BITS_MIN = 72 + 16          # menor mensagem (ACK, 72 bits) + CRC
+BITS_MAX = 5 * 256          # 5 slots, antes do destuffing
+RESIDUO_CRC = 0xF0B8        # CRC-16/X.25 sobre dados + FCS
+CARACTERES_SENTENCA = 60    # payload máximo por sentença NMEA
+
+# 6-bit -> caractere do payload armorado (inverso de ais_bits.SIXBIT_TABLE)
+ARMADURA = bytes(v + 48 if v < 40 else v + 56 for v in range(64)).ljust(256, b'?')
+
+
+def _tabela_crc():
+    tabela = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x8408 if crc & 1 else crc >> 1
+        tabela.append(crc)
+    return tabela
+
+TABELA_CRC = _tabela_crc()
+
+
+def crc16(dados, crc=0xFFFF):
+    """CRC-16/X.25 (HDLC) refletido, sem o XOR final; FCS = crc16(dados) ^ 0xFFFF."""
+    for byte in dados:
+        crc = (crc >> 8) ^ TABELA_CRC[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def fir_kaiser(n_taps, corte, taxa, beta=6.0):
+    # Passa-baixas por janela (sinc * Kaiser), ganho DC 1
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    h = np.sinc(2 * corte / taxa * n) * np.kaiser(n_taps, beta)
+    return (h / h.sum()).astype(np.float32)
+
+
+def armar(dados):
+    """(payload 6-bit armorado, bits de preenchimento) dos bytes da mensagem."""
+    bits = np.unpackbits(np.frombuffer(dados, np.uint8))
+    preenchimento = -len(bits) % 6
+    bits = np.concatenate((bits, np.zeros(preenchimento, np.uint8)))
+    valores = bits.reshape(-1, 6) @ np.array([32, 16, 8, 4, 2, 1], np.uint8)
+    return bytes(valores.astype(np.uint8)).translate(ARMADURA).decode('ascii'), preenchimento
+
+
+class DecimadorFIR:
+    """FIR real + decimação por D em forma polifásica, com histórico entre blocos.
+
+    A entrada vira uma matriz de linhas de D amostras (vista float32, re/im
+    intercalados) e um único produto de matrizes aplica as K fases do filtro;
+    a saída é a soma de K colunas deslocadas. Nenhuma amostra descartada pela
+    decimação é filtrada.
+    """
+
+    def __init__(self, taps, fator):
+        k = -(-len(taps) // fator)
+        h = np.zeros(k * fator, np.float32)
+        h[:len(taps)] = taps
+        # coeficientes invertidos, um vetor de D por atraso; re e im com os mesmos taps
+        fases = h[::-1].reshape(k, fator)
+        self.pesos = np.zeros((2 * fator, 2 * k), np.float32)
+        self.pesos[0::2, 0::2] = fases.T
+        self.pesos[1::2, 1::2] = fases.T
+        self.fator = fator
+        self.k = k
+        self.resto = np.zeros((k - 1) * fator, np.complex64)
+
+    def __call__(self, x):
+        z = np.concatenate((self.resto, x))
+        m = (len(z) - self.k * self.fator) // self.fator + 1
+        if m <= 0:
+            self.resto = z
+            return np.empty(0, np.complex64)
+        linhas = z[:(m + self.k - 1) * self.fator].view(np.float32).reshape(-1, 2 * self.fator)
+        parciais = (linhas @ self.pesos).view(np.complex64)
+        y = parciais[:m, 0].copy()
+        for i in range(1, self.k):
+            y += parciais[i:i + m, i]
+        self.resto = z[m * self.fator:]
+        return y
+
+
+class Canal:
+    """Um canal AIS: mistura para 0 Hz, decimação para 48 ks/s, discriminador e HDLC."""
+
+    def __init__(self, nome, deslocamento, taxa_entrada, fator, cauda_simbolos):
+        self.nome = nome
+        self.passo = -2 * np.pi * deslocamento / taxa_entrada
+        self.fase = 0.0
+        self.oscilador = np.empty(0, np.complex64)
+        self.decimador = DecimadorFIR(fir_kaiser(10 * fator, 12e3, taxa_entrada), fator)
+        self.cauda_max = cauda_simbolos * AMOSTRAS_SIMBOLO
+        # blocos pequenos se acumulam: a cauda só é reprocessada a cada 1/4 dela de amostras novas
+        self.minimo_novas = self.cauda_max // 4
+        self.novas = 0
+        self.cauda = np.zeros(0, np.complex64)
+        self.inicio = 0             # índice absoluto (48 ks/s) da primeira amostra da cauda
+        self.aceito_ate = 0         # quadros terminados antes disso já foram entregues
+        self.recentes = {}          # quadro -> fins já vistos (dedup entre fases e blocos)
+
+    def misturar(self, x):
+        # tabela do oscilador calculada uma vez; a fase contínua entre blocos é um escalar
+        n = len(x)
+        if len(self.oscilador) < n:
+            self.oscilador = np.exp(1j * self.passo * np.arange(n)).astype(np.complex64)
+        y = x * np.complex64(np.exp(1j * self.fase))
+        y *= self.oscilador[:n]
+        self.fase = (self.fase + self.passo * n) % (2 * np.pi)
+        return y
+
+    def processar(self, x, demod, forcar=False):
+        novas = self.decimador(self.misturar(x))
+        y = np.concatenate((self.cauda, novas))
+        self.novas += len(novas)
+        if self.novas < self.minimo_novas and not forcar:
+            self.cauda = y
+            return []
+        self.novas = 0
+        quadros = []
+        if len(y) > 2 * AMOSTRAS_SIMBOLO:
+            freq = demod.discriminar(y)
+            # só entrega quadros que terminam longe da borda (transitório dos filtros)
+            limite = self.inicio + len(freq) - demod.guarda
+            for fim, dados in demod.quadros(freq, self.inicio):
+                if not self.aceito_ate < fim <= limite:
+                    continue
+                # o mesmo quadro sai em várias fases de amostragem (fins a poucas amostras)
+                fins = self.recentes.setdefault(dados, [])
+                if all(abs(fim - f) > 2 * demod.guarda for f in fins):
+                    quadros.append((fim, dados))
+                fins.append(fim)
+            self.aceito_ate = max(self.aceito_ate, limite)
+            antigo = limite - self.cauda_max
+            self.recentes = {d: [f for f in fins if f > antigo] for d, fins in self.recentes.items()
+                             if fins[-1] > antigo}
+        quadros.sort()
+        corte = max(0, len(y) - self.cauda_max)
+        self.inicio += corte
+        self.cauda = y[corte:]
+        return quadros
+
+
+class DemodAIS:
+    def __init__(self, taxa=2.4e6, centro=162.0e6, canais=CANAIS, cauda_simbolos=BITS_MAX + 64):
+        fator = taxa / TAXA_CANAL
+        if abs(fator - round(fator)) > 1e-9:
+            raise ValueError(f"taxa {taxa:g} não é múltipla de {TAXA_CANAL} amostras/s")
+        fator = int(round(fator))
+        # 2º estágio decima por pelo menos 4: o 1º estágio (comum) ainda tem banda para os dois canais
+        fator2 = next(d for d in range(4, fator + 1) if fator % d == 0)
+        fator1 = fator // fator2
+        taxa1 = taxa / fator1
+        for _, freq in canais:
+            if abs(freq - centro) + 12.5e3 > 0.3 * taxa1:
+                raise ValueError(f"canal {freq / 1e6:.3f} MHz fora da banda útil em torno de {centro / 1e6:.3f} MHz")
+        self.taxa = taxa
+        self.centro = centro
+        self.decimador = (DecimadorFIR(fir_kaiser(8 * fator1, taxa1 / 2, taxa), fator1)
+                          if fator1 > 1 else None)
+        self.canais = [Canal(nome, freq - centro, taxa1, fator2, cauda_simbolos) for nome, freq in canais]
+        # integra-e-descarta de 1 símbolo: nos testes com gerador_iq rendeu ~4 dB a mais
+        # que o pulso gaussiano do GMSK (BT 0.4), que soma ISI à já deixada pelo filtro do canal
+        self.filtro_casado = np.full(AMOSTRAS_SIMBOLO, 1 / AMOSTRAS_SIMBOLO, np.float32)
+        self.media_dc = 128 * AMOSTRAS_SIMBOLO
+        self.guarda = 4 * AMOSTRAS_SIMBOLO
+        self.sequencia = 0
+        self.stats = {'amostras': 0, 'candidatos': 0, 'crc_invalido': 0, 'quadros': 0, 'sentencas': 0}
+
+    # === Camada física ===
+    def discriminar(self, y):
+        # discriminador FM: ângulo entre amostras consecutivas
+        produto = np.empty(len(y), np.complex64)
+        produto[0] = 0
+        np.multiply(y[1:], np.conj(y[:-1]), out=produto[1:])
+        freq = np.angle(produto).astype(np.float32)
+        # erro de frequência (ppm do dongle / transmissor) vira DC: estimado pelo ângulo da
+        # soma móvel dos produtos (128 símbolos), que pondera pela potência e ignora o ruído
+        # entre rajadas (a média do próprio ângulo seria dominada por ele)
+        n = self.media_dc
+        if len(y) > n:
+            acumulado = np.concatenate(([0], np.cumsum(produto, dtype=np.complex128)))
+            dc = np.empty(len(y), np.float32)
+            meio = n // 2
+            dc[meio:meio + len(y) - n + 1] = np.angle(acumulado[n:] - acumulado[:-n])
+            dc[:meio] = dc[meio]
+            dc[meio + len(y) - n + 1:] = dc[meio + len(y) - n]
+            freq -= dc
+        return np.convolve(freq, self.filtro_casado, 'same')
+
+    # === Enlace: NRZI + HDLC ===
+    def quadros(self, freq, inicio):
+        """(fim absoluto, bytes com CRC válido) de cada quadro nas 5 fases de amostragem."""
+        for fase in range(AMOSTRAS_SIMBOLO):
+            deslocamento = (fase - inicio) % AMOSTRAS_SIMBOLO
+            nivel = freq[deslocamento::AMOSTRAS_SIMBOLO] > 0
+            if len(nivel) < 16:
+                continue
+            # NRZI: sem transição = 1
+            bits = np.empty(len(nivel), np.uint8)
+            bits[0] = 0
+            np.equal(nivel[1:], nivel[:-1], out=bits[1:].view(bool))
+            # flags: janela de 8 bits (primeiro bit no LSB, ordem de transmissão)
+            janelas = np.lib.stride_tricks.sliding_window_view(bits, 8) @ (1 << np.arange(8, dtype=np.uint16))
+            flags = np.flatnonzero(janelas == FLAG)
+            for a, b in zip(flags[:-1], flags[1:]):
+                n = b - a - 8
+                if n < BITS_MIN or n > BITS_MAX:
+                    continue
+                self.stats['candidatos'] += 1
+                dados = self.destuffing(bits[a + 8:b])
+                if dados is None:
+                    continue
+                if crc16(dados) != RESIDUO_CRC:
+                    self.stats['crc_invalido'] += 1
+                    continue
+                yield inicio + deslocamento + (b + 8) * AMOSTRAS_SIMBOLO, dados[:-2]
+
+    @staticmethod
+    def destuffing(bits):
+        # remove o 0 inserido depois de cinco 1s; seis 1s seguidos = abort/lixo
+        uns = np.convolve(bits, np.ones(5, np.uint8))[:len(bits)]
+        apos_cinco = np.zeros(len(bits), bool)
+        apos_cinco[1:] = uns[:-1] == 5
+        if np.any(apos_cinco & (bits == 1)):
+            return None
+        bits = bits[~apos_cinco]
+        if len(bits) % 8 or len(bits) < BITS_MIN:
+            return None
+        return np.packbits(bits, bitorder='little').tobytes()
+
+    # === Apresentação: payload 6-bit -> NMEA ===
+    def sentencas(self, canal, dados):
+        payload, preenchimento = armar(dados)
+        partes = [payload[i:i + CARACTERES_SENTENCA] for i in range(0, len(payload), CARACTERES_SENTENCA)]
+        seq = ''
+        if len(partes) > 1:
+            seq = str(self.sequencia)
+            self.sequencia = (self.sequencia + 1) % 10
+        saida = []
+        for i, parte in enumerate(partes, 1):
+            fill = preenchimento if i == len(partes) else 0
+            corpo = f"AIVDM,{len(partes)},{i},{seq},{canal},{parte},{fill}"
+            saida.append(f"!{corpo}*{nmea_checksum(corpo):02X}".encode('ascii'))
+        self.stats['sentencas'] += len(saida)
+        return saida
+
+    def processar(self, iq, forcar=False):
+        """Lista de mensagens (cada uma, lista de sentenças !AIVDM em bytes) do bloco IQ."""
+        iq = np.asarray(iq)
+        if iq.dtype != np.complex64:
+            iq = iq.astype(np.complex64)
+        self.stats['amostras'] += len(iq)
+        x = self.decimador(iq) if self.decimador is not None else iq
+        mensagens = []
+        for canal in self.canais:
+            for _, dados in canal.processar(x, self, forcar):
+                self.stats['quadros'] += 1
+                mensagens.append(self.sentencas(canal.nome, dados))
+        return mensagens
+
+    def esvaziar(self):
+        """Fim da captura: decodifica o que ainda espera amostras novas acumularem."""
+        return self.processar(np.empty(0, np.complex64), forcar=True)
+
+    def imprimir_estatisticas(self):
+        print("📊 Demodulador AIS:")
+        for chave, valor in self.stats.items():
+            print(f"  {chave}: {valor}")
+
+
+# === Arquivos IQ ===
+def ler_iq(caminho, bloco=256 * 1024):
+    """Blocos complex64 de um arquivo IQ (formato pela extensão)."""
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == '.msiq':
+        from gravacao_iq import ReproducaoIQ
+        yield from ReproducaoIQ(caminho).blocos(bloco)
+    elif ext == '.npy':
+        dados = np.load(caminho, mmap_mode='r')
+        for i in range(0, len(dados), bloco):
+            yield np.asarray(dados[i:i + bloco], np.complex64)
+    elif ext in ('.cu8', '.bin'):
+        dados = np.memmap(caminho, np.uint8, 'r')
+        for i in range(0, len(dados) - 1, 2 * bloco):
+            bruto = dados[i:i + 2 * bloco].astype(np.float32)
+            bruto -= 127.5
+            bruto *= 1 / 127.5
+            yield bruto[:len(bruto) // 2 * 2].view(np.complex64)
+    else:
+        dados = np.memmap(caminho, np.complex64, 'r')
+        for i in range(0, len(dados), bloco):
+            yield np.array(dados[i:i + bloco])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demodulador AIS (GMSK/HDLC) para arquivos IQ")
+    parser.add_argument('arquivo')
+    parser.add_argument('--taxa', type=float, default=2.4e6)
+    parser.add_argument('--centro', type=float, default=162.0e6)
+    parser.add_argument('--bloco', type=int, default=256 * 1024)
+    parser.add_argument('--silencioso', action='store_true', help="não imprime as sentenças")
+    args = parser.parse_args()
+
+    if args.arquivo.lower().endswith('.msiq'):
+        from gravacao_iq import ler_cabecalho
+        meta = ler_cabecalho(args.arquivo)
+        args.taxa, args.centro = meta['taxa'], meta['centro']
+    demod = DemodAIS(args.taxa, args.centro)
+    t0 = time.perf_counter()
+
+    def mostrar(mensagens):
+        if not args.silencioso:
+            for sentencas in mensagens:
+                for s in sentencas:
+                    print(s.decode())
+
+    for iq in ler_iq(args.arquivo, args.bloco):
+        mostrar(demod.processar(iq))
+    mostrar(demod.esvaziar())
+    dt = time.perf_counter() - t0
+    demod.imprimir_estatisticas()
+    amostras = demod.stats['amostras']
+    print(f"Taxa: {amostras / dt / 1e6:.2f} Msps ({amostras / args.taxa / dt:.1f}x tempo real) | "
+          f"{demod.stats['quadros'] / dt:.1f} msg/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,24 @@
+import argparse
+import time
+
 import cv2
-import numpy as np
+
+import perfis_deteccao
+from rastreador_manchas import RastreadorManchas, desenhar_ids
+from saida_resultados import abrir_saida
 
 # === Função para detecção de manchas ===
 def detectar_manchas_final(frame_bgr):
-    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
-
-    # --- fundo azul ---
-    azul_min = np.array([85, 50, 50])
-    azul_max = np.array([135, 255, 255])
-    mask_azul = cv2.inRange(hsv, azul_min, azul_max)
-
-    # --- manchas pretas / escuras ---
-    lower_black = np.array([0, 0, 0])
-    upper_black = np.array([180, 255, 80])  # aumenta V para pegar cinza escuro
-    mask_preto = cv2.inRange(hsv, lower_black, upper_black)
-
-    # --- combinar azul + preto ---
-    mask_manchas = cv2.bitwise_and(mask_azul, mask_preto)
-
-    # --- limpeza morfológica ---
-    kernel = np.ones((5,5), np.uint8)
-    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_OPEN, kernel)
-    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_CLOSE, kernel)
-
-    # --- contornos ---
-    contornos, _ = cv2.findContours(mask_manchas, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    # --- porcentagem ---
-    area_total = np.count_nonzero(mask_azul)
-    area_manchas = sum(cv2.contourArea(c) for c in contornos)
-    area_percent = round((area_manchas / area_total) * 100, 2) if area_total>0 else 0
-
-    return contornos, area_percent, mask_manchas
+    # perfil "mar-hsv" de perfis_deteccao (limiares em perfis_deteccao.json);
+    # a máscara devolvida é o buffer do detector: copie se for guardar
+    return perfis_deteccao.detector('mar-hsv')(frame_bgr)
 
 
 
 
 # === Função principal para analisar vídeo ===
-def analisar_video(video_path, salvar_saida=True):
+def analisar_video(video_path, salvar_saida=True, niveis_piramide=0, rastreador=None,
+                   mostrar=True, caminho_resultados=None):
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print("❌ Erro ao abrir o vídeo.")
@@ -56,42 +37,77 @@ def analisar_video(video_path, salvar_saida=True):
         out = None
 
     print("🎥 Analisando vídeo:", video_path)
-    print("Pressione 'q' para sair da visualização.")
+    if mostrar:
+        print("Pressione 'q' para sair da visualização.")
 
     frame_count = 0
+    # perfil "mar-hsv"; modo pirâmide: candidatos no nível reduzido, refino só nas caixas
+    detector = perfis_deteccao.detector_do_perfil('mar-hsv', largura, altura,
+                                                  niveis_piramide=niveis_piramide)
+    # sem janela e sem gravação: nada de desenhar (sem monitor, imshow/waitKey custam ms por frame)
+    desenhar = mostrar or out is not None
+    saida = abrir_saida(caminho_resultados)
     while True:
         ret, frame_bgr = cap.read()
         if not ret:
             break
 
-        contornos, area_percent, mascara = detectar_manchas_final(frame_bgr)
-
-
-
-        # desenha os resultados
-        frame_resultado = frame_bgr.copy()
-        cv2.drawContours(frame_resultado, contornos, -1, (0, 255, 0), 2)
-        cv2.putText(frame_resultado, f"Area: {area_percent:.2f}%",
-                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX,
-                    1, (0, 0, 255), 2)
-
-        cv2.imshow("Analise de Manchas - Video", frame_resultado)
-        if out:
-            out.write(frame_resultado)
+        t0 = time.perf_counter()
+        if rastreador is None:
+            contornos, area_percent, mascara = detector(frame_bgr)
+        elif rastreador.precisa_detectar(frame_count):
+            contornos, area_percent, mascara = detector(frame_bgr)
+            associados = rastreador.atualizar(contornos, frame_count, detector.area_total)
+        # senão: trilhas estáveis, reaproveita contornos/área do último frame detectado
+        t_deteccao = time.perf_counter() - t0
+
+        saida.escrever({'frame': frame_count, 'area_percent': area_percent,
+                        'n_contornos': len(contornos), 't_deteccao_ms': round(t_deteccao * 1e3, 3)})
+
+        if desenhar:
+            # desenha os resultados
+            frame_resultado = frame_bgr.copy()
+            cv2.drawContours(frame_resultado, contornos, -1, (0, 255, 0), 2)
+            if rastreador is not None:
+                desenhar_ids(frame_resultado, associados)
+            cv2.putText(frame_resultado, f"Area: {area_percent:.2f}%",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX,
+                        1, (0, 0, 255), 2)
+
+            if out:
+                out.write(frame_resultado)
 
         frame_count += 1
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+        if mostrar:
+            cv2.imshow("Analise de Manchas - Video", frame_resultado)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
 
     print(f"✅ Análise concluída. Frames processados: {frame_count}")
     cap.release()
+    saida.fechar()
+    if caminho_resultados:
+        print(f"📝 Resultados por frame em '{caminho_resultados}'")
     if out:
         out.release()
         print("💾 Vídeo salvo como 'analise_manchas_saida.mp4'")
-    cv2.destroyAllWindows()
+    if mostrar:
+        cv2.destroyAllWindows()
+    if rastreador is not None:
+        return rastreador.series()
 
 
 # === Execução ===
 if __name__ == "__main__":
-    analisar_video("manchas_video_rastro.mp4", salvar_saida=True)
+    parser = argparse.ArgumentParser(description="Análise de manchas em vídeo gravado")
+    parser.add_argument('video', nargs='?', default="manchas_video_rastro.mp4")
+    parser.add_argument('--sem-janela', action='store_true', help="sem imshow/waitKey (sem monitor)")
+    parser.add_argument('--sem-gravar', action='store_true', help="não grava o vídeo anotado")
+    parser.add_argument('--resultados', default=None, help="registro por frame (.jsonl ou .csv)")
+    args = parser.parse_args()
+
+    rastreador = RastreadorManchas()
+    analisar_video(args.video, salvar_saida=not args.sem_gravar, rastreador=rastreador,
+                   mostrar=not args.sem_janela, caminho_resultados=args.resultados)
+    rastreador.imprimir_resumo()
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+# detector_manchas.py
+# Versão sem alocações por frame de detectar_manchas_final: o detector guarda
+# buffers pré-alocados do tamanho do stream (HSV, máscaras, temporário da
+# morfologia), o kernel e os limiares, e usa dst= do OpenCV em todas as etapas.
+# Mesmos contornos / porcentagem / máscara que a função original.
+#
+# Atenção: a máscara devolvida é o buffer interno e é sobrescrita no próximo
+# frame; use mask.copy() se precisar guardá-la.
+#
+# Também traz o perfil cinza (detectar_manchas_ampliado) e o modo pirâmide
+# (detecção no nível reduzido, refinamento só nas caixas candidatas).
+#
+# Uso (benchmark contra o detectar_manchas_final original):
+#   python3 detector_manchas.py [video.mp4]
+#   python3 detector_manchas.py --piramide manchas_video_rastro.mp4
+#   python3 detector_manchas.py --linhas       # DetectorLinhas x laço original de missao_v1
+
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+class DetectorManchas:
+    # Perfil HSV "mar azul + manchas pretas" (detectar_manchas_final); limiares
+    # sem padrão aqui: vêm do perfil em perfis_deteccao.json (detector_do_perfil)
+    def __init__(self, largura=640, altura=480, *, azul_min, azul_max, preto_min, preto_max,
+                 tamanho_kernel):
+        # --- artefatos fixos: criados uma vez ---
+        self.azul_min = np.array(azul_min, np.uint8)
+        self.azul_max = np.array(azul_max, np.uint8)
+        self.preto_min = np.array(preto_min, np.uint8)
+        self.preto_max = np.array(preto_max, np.uint8)
+        self.kernel = np.ones((tamanho_kernel, tamanho_kernel), np.uint8)
+        self.area_total = 0     # área de referência (px) da última detecção
+        self._alocar(altura, largura)
+
+    def _alocar(self, altura, largura):
+        self.forma = (altura, largura)
+        self.hsv = np.empty((altura, largura, 3), np.uint8)
+        self.mask_azul = np.empty((altura, largura), np.uint8)
+        self.mask_preto = np.empty((altura, largura), np.uint8)
+        self.mask_manchas = np.empty((altura, largura), np.uint8)
+        self._tmp = np.empty((altura, largura), np.uint8)
+
+    def _classificar(self, frame_bgr, r):
+        # r: fatia (linhas, colunas) dos buffers; recortes de ndarray viram Mat com step
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV, dst=self.hsv[r])
+
+        # --- fundo azul / manchas pretas ---
+        cv2.inRange(self.hsv[r], self.azul_min, self.azul_max, dst=self.mask_azul[r])
+        cv2.inRange(self.hsv[r], self.preto_min, self.preto_max, dst=self.mask_preto[r])
+
+        # --- combinar azul + preto ---
+        cv2.bitwise_and(self.mask_azul[r], self.mask_preto[r], dst=self.mask_manchas[r])
+
+    def _limpar(self, r):
+        # --- limpeza morfológica (ida e volta pelo temporário) ---
+        cv2.morphologyEx(self.mask_manchas[r], cv2.MORPH_OPEN, self.kernel, dst=self._tmp[r])
+        cv2.morphologyEx(self._tmp[r], cv2.MORPH_CLOSE, self.kernel, dst=self.mask_manchas[r])
+
+    def _verificar_forma(self, frame_bgr):
+        if frame_bgr.shape[:2] != self.forma:
+            # resolução mudou: realoca uma vez e segue
+            self._alocar(*frame_bgr.shape[:2])
+
+    def mascara_bruta(self, frame_bgr):
+        # Só a classificação, sem morfologia (candidatos no nível grosso da pirâmide)
+        self._verificar_forma(frame_bgr)
+        self._classificar(frame_bgr, TUDO)
+        return self.mask_manchas
+
+    def mascara_regiao(self, frame_bgr, y0, y1, x0, x1):
+        # Classificação + morfologia só dentro da caixa, escrevendo em mask_manchas
+        r = (slice(y0, y1), slice(x0, x1))
+        self._classificar(frame_bgr[r], r)
+        self._limpar(r)
+
+    def fracao_referencia(self):
+        # Fração do frame que conta como "área total" (pixels de mar azul)
+        return cv2.countNonZero(self.mask_azul) / float(self.forma[0] * self.forma[1])
+
+    def detectar(self, frame_bgr):
+        self._verificar_forma(frame_bgr)
+        self._classificar(frame_bgr, TUDO)
+        self._limpar(TUDO)
+
+        # --- contornos ---
+        contornos, _ = cv2.findContours(self.mask_manchas, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        # --- porcentagem ---
+        area_total = self.area_total = cv2.countNonZero(self.mask_azul)
+        area_manchas = sum(cv2.contourArea(c) for c in contornos)
+        area_percent = round((area_manchas / area_total) * 100, 2) if area_total > 0 else 0
+
+        return contornos, area_percent, self.mask_manchas
+
+    __call__ = detectar
+
+
+class DetectorAmpliado:
+    # Perfil cinza + limiar (detectar_manchas_ampliado), também sem alocações
+    def __init__(self, largura=640, altura=480, *, limiar, valor, tamanho_blur, tamanho_kernel):
+        self.limiar = limiar
+        self.valor = valor
+        self.tamanho_blur = (tamanho_blur, tamanho_blur)
+        self.kernel = np.ones((tamanho_kernel, tamanho_kernel), np.uint8)
+        self.area_total = 0     # área de referência (px) da última detecção
+        self._alocar(altura, largura)
+
+    def _alocar(self, altura, largura):
+        self.forma = (altura, largura)
+        self.gray = np.empty((altura, largura), np.uint8)
+        self.blur = np.empty((altura, largura), np.uint8)
+        self.mascara = np.empty((altura, largura), np.uint8)
+        self._tmp = np.empty((altura, largura), np.uint8)
+
+    @property
+    def mask_manchas(self):
+        return self.mascara
+
+    def _classificar(self, frame_bgr, r):
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY, dst=self.gray[r])
+        cv2.GaussianBlur(self.gray[r], self.tamanho_blur, 0, dst=self.blur[r])
+        cv2.threshold(self.blur[r], self.limiar, self.valor, cv2.THRESH_BINARY_INV, dst=self.mascara[r])
+
+    def _limpar(self, r):
+        cv2.morphologyEx(self.mascara[r], cv2.MORPH_CLOSE, self.kernel, dst=self._tmp[r])
+        cv2.morphologyEx(self._tmp[r], cv2.MORPH_OPEN, self.kernel, dst=self.mascara[r])
+
+    def _verificar_forma(self, frame_bgr):
+        if frame_bgr.shape[:2] != self.forma:
+            self._alocar(*frame_bgr.shape[:2])
+
+    def mascara_bruta(self, frame_bgr):
+        self._verificar_forma(frame_bgr)
+        self._classificar(frame_bgr, TUDO)
+        return self.mascara
+
+    def mascara_regiao(self, frame_bgr, y0, y1, x0, x1):
+        r = (slice(y0, y1), slice(x0, x1))
+        self._classificar(frame_bgr[r], r)
+        self._limpar(r)
+
+    def fracao_referencia(self):
+        return 1.0
+
+    def _resultado(self):
+        contornos, _ = cv2.findContours(self.mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        area_total = self.area_total = self.mascara.shape[0] * self.mascara.shape[1]
+        area_manchas = sum(cv2.contourArea(c) for c in contornos)
+        area_percent = round((area_manchas / area_total) * 100, 2)
+        return contornos, area_percent, self.mascara
+
+    def detectar(self, frame_bgr):
+        self._verificar_forma(frame_bgr)
+        self._classificar(frame_bgr, TUDO)
+        self._limpar(TUDO)
+        return self._resultado()
+
+    __call__ = detectar
+
+    # === Entrada indexada (GIF com paleta) ===
+    def _tabela_paleta(self, paleta_bgr):
+        # Cinza de cada entrada da paleta pelo próprio cvtColor (mesmo arredondamento
+        # do caminho BGR) e se alguma entrada pode passar no limiar; refeito só quando
+        # a paleta muda.
+        chave = paleta_bgr.tobytes()
+        if chave != getattr(self, '_chave_paleta', None):
+            self._chave_paleta = chave
+            self._lut_cinza = cv2.cvtColor(paleta_bgr.reshape(1, -1, 3), cv2.COLOR_BGR2GRAY).ravel()
+            # o blur é média ponderada: nunca fica abaixo do menor cinza presente
+            self._paleta_tem_escuro = bool((self._lut_cinza <= self.limiar).any())
+        return self._lut_cinza
+
+    def detectar_indexado(self, indices, paleta_bgr):
+        """Mesma máscara e area_percent do caminho BGR, a partir do plano de índices + paleta (256, 3) BGR."""
+        self._verificar_forma(indices)
+        lut_cinza = self._tabela_paleta(paleta_bgr)
+        if not self._paleta_tem_escuro:
+            # nenhuma cor da paleta é escura o bastante: máscara vazia sem tocar nos pixels
+            self.mascara.fill(0)
+            self.area_total = self.forma[0] * self.forma[1]
+            return [], 0.0, self.mascara
+        cv2.LUT(indices, lut_cinza, dst=self.gray)
+        cv2.GaussianBlur(self.gray, self.tamanho_blur, 0, dst=self.blur)
+        cv2.threshold(self.blur, self.limiar, self.valor, cv2.THRESH_BINARY_INV, dst=self.mascara)
+        self._limpar(TUDO)
+        return self._resultado()
+
+
+TUDO = (slice(None), slice(None))
+
+
+# === Linhas pretas alongadas (missao_v1) ===
+# Uma linha por contorno aceito; desenho e registro usam isto direto, sem
+# recalcular minAreaRect/moments por contorno.
+LINHA = np.dtype([('contorno', object), ('area', np.float64), ('cx', np.float32), ('cy', np.float32),
+                  ('angulo', np.float32), ('aspecto', np.float32), ('comprimento', np.float32),
+                  ('largura', np.float32), ('caixa', np.float32, (4, 2))])
+
+
+def angulo_linha(rect):
+    # Ângulo da linha (graus) a partir do retângulo rotacionado
+    angle = rect[2]
+    width, height = rect[1]
+    if width < height:
+        angle = 90 - angle
+    else:
+        angle = -angle
+    return angle
+
+
+class DetectorLinhas:
+    """Preto/cinza escuro em HSV + filtro de linhas alongadas (mesmo resultado de missao_v1).
+
+    A área (a mesma do contourArea) e o centroide de todos os contornos saem
+    de uma vez em NumPy (fórmula do laço de Gauss sobre os pontos
+    concatenados); minAreaRect roda uma vez só, e só nos que passam da área
+    mínima. O array LINHA devolvido já traz contorno, ângulo e caixa.
+    """
+
+    def __init__(self, largura=640, altura=480, *, preto_min, preto_max, area_min, aspecto_min):
+        self.preto_min = np.array(preto_min, np.uint8)
+        self.preto_max = np.array(preto_max, np.uint8)
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.area_min = area_min
+        self.aspecto_min = aspecto_min
+        self.area_total = 0
+        self._alocar(altura, largura)
+
+    def _alocar(self, altura, largura):
+        self.forma = (altura, largura)
+        self.hsv = np.empty((altura, largura, 3), np.uint8)
+        self.mask_preto = np.empty((altura, largura), np.uint8)
+        self._tmp = np.empty((altura, largura), np.uint8)
+
+    def detectar(self, frame_bgr):
+        if frame_bgr.shape[:2] != self.forma:
+            self._alocar(*frame_bgr.shape[:2])
+
+        # --- Detecção de PRETO/MUITO ESCURO ---
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV, dst=self.hsv)
+        cv2.inRange(self.hsv, self.preto_min, self.preto_max, dst=self.mask_preto)
+
+        # --- Limpeza morfológica ---
+        cv2.morphologyEx(self.mask_preto, cv2.MORPH_OPEN, self.kernel, dst=self._tmp, iterations=1)
+        cv2.morphologyEx(self._tmp, cv2.MORPH_CLOSE, self.kernel, dst=self.mask_preto, iterations=2)
+
+        # --- Encontrar contornos ---
+        contornos, _ = cv2.findContours(self.mask_preto, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        linhas = np.empty(0, LINHA)
+        if contornos:
+            # --- Área e centroide de todos os contornos em bloco ---
+            n_pontos = np.fromiter(map(len, contornos), np.intp, len(contornos))
+            inicio = np.cumsum(n_pontos) - n_pontos
+            pontos = np.concatenate(contornos).reshape(-1, 2).astype(np.float64)
+            x, y = pontos[:, 0], pontos[:, 1]
+            # ponto seguinte de cada ponto, fechando cada contorno no seu primeiro
+            seguinte = np.arange(1, len(pontos) + 1)
+            seguinte[inicio + n_pontos - 1] = inicio
+            xs, ys = x[seguinte], y[seguinte]
+            cruz = x * ys - xs * y
+            # coordenadas inteiras: somas exatas, a área é a mesma do contourArea e
+            # o centroide o mesmo de cv2.moments
+            m00 = np.add.reduceat(cruz, inicio) / 2
+            area = np.abs(m00)
+
+            # --- Só os que passam da área: um minAreaRect cada ---
+            aceitos = []
+            for i in np.flatnonzero(area >= self.area_min):
+                rect = cv2.minAreaRect(contornos[i])
+                width, height = rect[1]
+                if width == 0 or height == 0:
+                    continue
+                # Aspect ratio (proporção) - linhas têm proporção alta
+                aspecto = max(width, height) / min(width, height)
+                if aspecto > self.aspecto_min:
+                    aceitos.append((i, rect, aspecto))
+
+            linhas = np.empty(len(aceitos), LINHA)
+            if aceitos:
+                idx = np.array([i for i, _, _ in aceitos])
+                m10 = np.add.reduceat((x + xs) * cruz, inicio)[idx] / 6
+                m01 = np.add.reduceat((y + ys) * cruz, inicio)[idx] / 6
+                for k, (i, rect, aspecto) in enumerate(aceitos):
+                    linhas['contorno'][k] = contornos[i]
+                    linhas['angulo'][k] = angulo_linha(rect)
+                    linhas['aspecto'][k] = aspecto
+                    linhas['comprimento'][k] = max(rect[1])
+                    linhas['largura'][k] = min(rect[1])
+                    linhas['caixa'][k] = cv2.boxPoints(rect)
+                linhas['area'] = area[idx]
+                linhas['cx'] = m10 / m00[idx]
+                linhas['cy'] = m01 / m00[idx]
+
+        # --- Porcentagem ---
+        area_total = self.area_total = self.forma[0] * self.forma[1]
+        area_percent = round((float(linhas['area'].sum()) / area_total) * 100, 4) if area_total > 0 else 0
+        return linhas, area_percent, self.mask_preto
+
+    __call__ = detectar
+
+
+def desenhar_linhas(frame_bgr, linhas, area_percent):
+    """Anota uma cópia do frame com o array LINHA (sem recalcular nada por contorno)."""
+    frame_resultado = frame_bgr.copy()
+    if len(linhas):
+        cv2.drawContours(frame_resultado, list(linhas['contorno']), -1, (0, 255, 0), 2)
+        cv2.polylines(frame_resultado, list(np.intp(linhas['caixa'])), True, (255, 0, 0), 2)
+    for i, l in enumerate(linhas):
+        cv2.putText(frame_resultado, f"L{i+1}: {l['angulo']:.1f}deg",
+                    (int(l['cx']) - 30, int(l['cy'])), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+    cv2.putText(frame_resultado, f"Area: {area_percent:.4f}%",
+                (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    cv2.putText(frame_resultado, f"Linhas: {len(linhas)}",
+                (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    return frame_resultado
+
+
+# === Modo pirâmide (grosso -> fino) ===
+def _unir_caixas(caixas):
+    # Junta caixas que se sobrepõem até não sobrar sobreposição (evita processar pixels duas vezes)
+    caixas = list(caixas)
+    mudou = True
+    while mudou:
+        mudou = False
+        saida = []
+        while caixas:
+            y0, y1, x0, x1 = caixas.pop()
+            k = 0
+            while k < len(caixas):
+                a0, a1, b0, b1 = caixas[k]
+                if a0 < y1 and y0 < a1 and b0 < x1 and x0 < b1:
+                    y0, y1, x0, x1 = min(y0, a0), max(y1, a1), min(x0, b0), max(x1, b1)
+                    caixas.pop(k)
+                    mudou = True
+                else:
+                    k += 1
+            saida.append((y0, y1, x0, x1))
+        caixas = saida
+    return caixas
+
+
+class DetectorPiramide:
+    """Classifica num nível reduzido da pirâmide e refina só as caixas candidatas em resolução cheia.
+
+    Os contornos saem em coordenadas do frame original. A área de referência
+    (mar azul) vem do nível grosso, escalada; por isso area_percent pode diferir
+    um pouco da detecção em resolução cheia (ver comparar_piramide).
+    """
+
+    def __init__(self, fabrica=DetectorManchas, largura=640, altura=480, niveis=2,
+                 margem=8, limite_roi=0.5, max_caixas=64, interpolacao=cv2.INTER_LINEAR,
+                 **parametros):
+        self.fabrica = fabrica
+        self.parametros = parametros
+        self.niveis = niveis
+        self.margem = margem            # >= raio de blur + morfologia em resolução cheia
+        self.limite_roi = limite_roi    # acima disso, detecção completa sai mais barata
+        self.max_caixas = max_caixas
+        # INTER_AREA é mais fiel, mas custa quase o mesmo que a detecção cheia no Pi;
+        # para achar candidatos (com dilatação depois) a bilinear basta
+        self.interpolacao = interpolacao
+        self.kernel_candidatos = np.ones((3, 3), np.uint8)
+        self.frames_completos = 0       # quantas vezes caiu no caminho de resolução cheia
+        self.area_total = 0
+        self._alocar(altura, largura)
+
+    def _alocar(self, altura, largura):
+        escala = 2 ** self.niveis
+        self.forma = (altura, largura)
+        self.forma_grossa = (max(1, -(-altura // escala)), max(1, -(-largura // escala)))
+        self.fino = self.fabrica(largura, altura, **self.parametros)
+        self.grosso = self.fabrica(self.forma_grossa[1], self.forma_grossa[0], **self.parametros)
+        self.reduzido = np.empty(self.forma_grossa + (3,), np.uint8)
+        self.candidatos = np.empty(self.forma_grossa, np.uint8)
+
+    def caixas_candidatas(self, frame_bgr):
+        altura, largura = self.forma
+        hc, wc = self.forma_grossa
+        cv2.resize(frame_bgr, (wc, hc), dst=self.reduzido, interpolation=self.interpolacao)
+        bruta = self.grosso.mascara_bruta(self.reduzido)
+        # sem abertura no nível grosso: manchas pequenas ainda viram candidatas;
+        # a dilatação cobre a mistura de cores na borda causada pela redução
+        cv2.dilate(bruta, self.kernel_candidatos, dst=self.candidatos)
+        contornos, _ = cv2.findContours(self.candidatos, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        sy = altura / hc
+        sx = largura / wc
+        m = self.margem
+        caixas = []
+        for c in contornos:
+            x, y, w, h = cv2.boundingRect(c)
+            caixas.append((max(0, int(y * sy) - m), min(altura, int((y + h) * sy + 0.999) + m),
+                           max(0, int(x * sx) - m), min(largura, int((x + w) * sx + 0.999) + m)))
+        return _unir_caixas(caixas)
+
+    def detectar(self, frame_bgr):
+        if frame_bgr.shape[:2] != self.forma:
+            self._alocar(*frame_bgr.shape[:2])
+        altura, largura = self.forma
+
+        caixas = self.caixas_candidatas(frame_bgr)
+        area_caixas = sum((y1 - y0) * (x1 - x0) for y0, y1, x0, x1 in caixas)
+        if len(caixas) > self.max_caixas or area_caixas > self.limite_roi * altura * largura:
+            # candidatos demais: pirâmide não compensa neste frame
+            self.frames_completos += 1
+            resultado = self.fino.detectar(frame_bgr)
+            self.area_total = self.fino.area_total
+            return resultado
+
+        mascara = self.fino.mask_manchas
+        mascara.fill(0)
+        for y0, y1, x0, x1 in caixas:
+            self.fino.mascara_regiao(frame_bgr, y0, y1, x0, x1)
+
+        contornos, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        area_total = self.area_total = self.grosso.fracao_referencia() * altura * largura
+        area_manchas = sum(cv2.contourArea(c) for c in contornos)
+        area_percent = round((area_manchas / area_total) * 100, 2) if area_total > 0 else 0
+        return contornos, area_percent, mascara
+
+    __call__ = detectar
+
+
+def comparar_piramide(video_path=None, niveis=2, perfil='mar-hsv', n=300):
+    # Diferença de precisão e ganho de tempo da pirâmide contra a resolução cheia
+    import perfis_deteccao
+
+    fabrica, parametros = _do_perfil(perfil)
+    # perfil cinza: o mar azul sintético (cinza ~97) fica todo abaixo do limiar e
+    # vira candidato, e a pirâmide nunca sai do caminho completo; mar claro no lugar
+    fundo = FUNDO_CLARO if perfis_deteccao.perfil(perfil)['tipo'] == 'cinza' else None
+    frames = _frames_benchmark(video_path, n, fundo)
+    altura, largura = frames[0].shape[:2]
+    cheio = fabrica(largura, altura, **parametros)
+    piramide = DetectorPiramide(fabrica, largura, altura, niveis=niveis, **parametros)
+
+    deltas = []
+    ious = []
+    contagem_diferente = 0
+    for f in frames:
+        c1, p1, m1 = cheio(f)
+        m1 = m1.copy()
+        c2, p2, m2 = piramide(f)
+        deltas.append(abs(p1 - p2))
+        uniao = cv2.countNonZero(cv2.bitwise_or(m1, m2))
+        inter = cv2.countNonZero(cv2.bitwise_and(m1, m2))
+        ious.append(inter / uniao if uniao else 1.0)
+        contagem_diferente += len(c1) != len(c2)
+
+    fps_cheio = _medir(cheio, frames)[0]
+    piramide.frames_completos = 0
+    fps_piramide = _medir(piramide, frames)[0]
+
+    print(f"Pirâmide ({fabrica.__name__}, {niveis} níveis) em {len(frames)} frames {largura}x{altura}:")
+    print(f"  |Δ area_percent| médio {np.mean(deltas):.3f} p.p. | máximo {np.max(deltas):.3f} p.p.")
+    print(f"  IoU médio das máscaras {np.mean(ious):.4f} | mínimo {np.min(ious):.4f}")
+    print(f"  Frames com nº de contornos diferente: {contagem_diferente}")
+    print(f"  Resolução cheia {fps_cheio:.1f} fps | pirâmide {fps_piramide:.1f} fps "
+          f"({fps_piramide / fps_cheio:.2f}x) | caíram no caminho completo: {piramide.frames_completos}")
+    if piramide.frames_completos > len(frames) // 2:
+        print("  ⚠️ A maioria dos frames caiu no caminho completo: a pirâmide não foi exercitada nesta entrada.")
+    return np.mean(deltas), np.mean(ious), fps_piramide / fps_cheio
+
+
+# === Benchmark ===
+def _do_perfil(nome):
+    # (classe, parâmetros) do perfil em perfis_deteccao.json, sem pirâmide
+    import perfis_deteccao
+
+    parametros = dict(perfis_deteccao.perfil(nome))
+    fabrica = perfis_deteccao.TIPOS[parametros.pop('tipo')]
+    parametros.pop('niveis_piramide', None)
+    return fabrica, parametros
+
+
+FUNDO_CLARO = (200, 170, 140)   # BGR, cinza ~165: acima do limiar do perfil cinza
+
+
+def _frames_benchmark(video_path=None, n=300, fundo=None):
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        frames = []
+        while len(frames) < n:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+        print(f"⚠️ Não foi possível ler {video_path}; usando frames sintéticos.")
+    from pipeline_camera import FonteSintetica
+    fonte = FonteSintetica(fps=0, n_frames=n)
+    if fundo is not None:
+        fonte.fundo[:] = fundo
+    return [fonte.ler() for _ in range(n)]
+
+
+def _medir(funcao, frames):
+    # frames/s e pico de memória transitória por frame (tracemalloc vê os buffers NumPy)
+    for f in frames[:5]:
+        funcao(f)
+    melhor = float('inf')
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for f in frames:
+            funcao(f)
+        melhor = min(melhor, time.perf_counter() - t0)
+    fps = len(frames) / melhor
+
+    tracemalloc.start()
+    picos = []
+    for f in frames[:50]:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        funcao(f)
+        picos.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return fps, sum(picos) / len(picos)
+
+
+def _manchas_referencia(frame_bgr):
+    # detectar_manchas_final original (alocando a cada frame), referência do benchmark
+    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    mask_azul = cv2.inRange(hsv, np.array([85, 50, 50]), np.array([135, 255, 255]))
+    mask_preto = cv2.inRange(hsv, np.array([0, 0, 0]), np.array([180, 255, 80]))
+    mask_manchas = cv2.bitwise_and(mask_azul, mask_preto)
+    kernel = np.ones((5, 5), np.uint8)
+    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_OPEN, kernel)
+    mask_manchas = cv2.morphologyEx(mask_manchas, cv2.MORPH_CLOSE, kernel)
+    contornos, _ = cv2.findContours(mask_manchas, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    area_total = np.count_nonzero(mask_azul)
+    area_manchas = sum(cv2.contourArea(c) for c in contornos)
+    area_percent = round((area_manchas / area_total) * 100, 2) if area_total > 0 else 0
+    return contornos, area_percent, mask_manchas
+
+
+def benchmark(video_path=None):
+    detectar_manchas_final = _manchas_referencia
+    frames = _frames_benchmark(video_path)
+    altura, largura = frames[0].shape[:2]
+    # a conferência com a referência supõe os limiares originais no JSON
+    fabrica, parametros = _do_perfil('mar-hsv')
+    detector = fabrica(largura, altura, **parametros)
+
+    # conferência: mesmos resultados
+    for f in frames[:20]:
+        c1, p1, m1 = detectar_manchas_final(f)
+        c2, p2, m2 = detector(f)
+        assert p1 == p2 and len(c1) == len(c2) and np.array_equal(m1, m2)
+
+    fps_antigo, mem_antigo = _medir(detectar_manchas_final, frames)
+    fps_novo, mem_novo = _medir(detector, frames)
+
+    print(f"Frames: {len(frames)} ({largura}x{altura})")
+    print(f"detectar_manchas_final: {fps_antigo:7.1f} fps | pico de alocação {mem_antigo / 1e6:6.2f} MB/frame")
+    print(f"DetectorManchas:        {fps_novo:7.1f} fps | pico de alocação {mem_novo / 1e6:6.2f} MB/frame")
+    print(f"Alocação evitada a 30 fps (pelo pico, limite inferior): {(mem_antigo - mem_novo) * 30 / 1e6:.0f} MB/s")
+
+
+# === Benchmark das linhas (missao_v1) ===
+def _linhas_por_contorno(frame_bgr):
+    # Caminho antigo de missao_v1: laço Python por contorno + recálculo no desenho
+    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    mask_preto = cv2.inRange(hsv, np.array([0, 0, 0]), np.array([151, 151, 151]))
+    kernel = np.ones((3, 3), np.uint8)
+    mask_preto = cv2.morphologyEx(mask_preto, cv2.MORPH_OPEN, kernel, iterations=1)
+    mask_preto = cv2.morphologyEx(mask_preto, cv2.MORPH_CLOSE, kernel, iterations=2)
+    contornos, _ = cv2.findContours(mask_preto, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    linhas = []
+    for c in contornos:
+        if cv2.contourArea(c) < 50:
+            continue
+        rect = cv2.minAreaRect(c)
+        width, height = rect[1]
+        if width == 0 or height == 0:
+            continue
+        if max(width, height) / min(width, height) > 3.0:
+            linhas.append(c)
+    info = []
+    for c in linhas:
+        rect = cv2.minAreaRect(c)
+        box = np.intp(cv2.boxPoints(rect))
+        M = cv2.moments(c)
+        info.append((rect, box, M))
+    return linhas, info
+
+
+def _frames_linhas(n=60, largura=640, altura=480, n_linhas=6, semente=0):
+    # Água texturizada (milhares de manchinhas escuras) + barras pretas inclinadas
+    rnd = np.random.default_rng(semente)
+    angulos = rnd.uniform(-90, 90, n_linhas)
+    frames = []
+    for _ in range(n):
+        ruido = rnd.integers(0, 256, (altura // 4, largura // 4), dtype=np.uint8)
+        textura = cv2.resize(ruido, (largura, altura), interpolation=cv2.INTER_NEAREST)
+        frame = np.empty((altura, largura, 3), np.uint8)
+        frame[:] = (200, 160, 120)
+        frame[textura < 20] = (60, 60, 60)
+        for k, ang in enumerate(angulos):
+            cx, cy = 80 + (k % 3) * 220, 120 + (k // 3) * 240
+            t = np.radians(ang)
+            dx, dy = 70 * np.cos(t), -70 * np.sin(t)
+            cv2.line(frame, (int(cx - dx), int(cy - dy)), (int(cx + dx), int(cy + dy)), (0, 0, 0), 6)
+        frames.append(frame)
+    return frames, angulos
+
+
+def benchmark_linhas(n=60):
+    frames, angulos = _frames_linhas(n)
+    fabrica, parametros = _do_perfil('linhas-escuras')
+    detector = fabrica(**parametros)
+
+    def medir(funcao):
+        melhor = float('inf')
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for f in frames:
+                funcao(f)
+            melhor = min(melhor, time.perf_counter() - t0)
+        return len(frames) / melhor
+
+    # conferência: as mesmas linhas, na mesma ordem, com a mesma caixa e ângulo
+    for f in frames[:10]:
+        antigas, info = _linhas_por_contorno(f)
+        linhas, _, _ = detector(f)
+        assert len(antigas) == len(linhas)
+        for (rect, box, _), l in zip(info, linhas):
+            assert np.array_equal(box, np.intp(l['caixa'])) and abs(angulo_linha(rect) - l['angulo']) < 1e-3
+    contornos, _ = cv2.findContours(detector.mask_preto, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    fps_antigo = medir(_linhas_por_contorno)
+    fps_novo = medir(detector)
+    print(f"Linhas em {len(frames)} frames 640x480 com água texturizada "
+          f"({len(contornos)} contornos no último frame, {len(linhas)} linhas aceitas, iguais às do laço):")
+    print(f"  laço por contorno + recálculo no desenho: {fps_antigo:.1f} fps")
+    print(f"  área em bloco + um minAreaRect por linha: {fps_novo:.1f} fps ({fps_novo / fps_antigo:.2f}x)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == '--linhas':
+        benchmark_linhas()
+    elif len(sys.argv) >= 2 and sys.argv[1] == '--piramide':
+        video = sys.argv[2] if len(sys.argv) >= 3 else None
+        comparar_piramide(video, perfil='mar-hsv')
+        comparar_piramide(video, perfil='cinza-limiar')
+    else:
+        benchmark(sys.argv[1] if len(sys.argv) >= 2 else None)
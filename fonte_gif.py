@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# fonte_gif.py
+# Fonte de frames GIF em streaming para gif_para_video: percorre o arquivo uma
+# única vez, em ordem, e entrega cada quadro já em BGR num buffer reutilizado.
+# Quadros com paleta (modo P) viram BGR por tabelas paleta->B/G/R em cache
+# (cv2.LUT no plano de índices + merge), sem convert("RGB") + np.array + cvtColor.
+#
+# Uso:
+#   fonte = FonteGif("1.gif")
+#   for frame_bgr in fonte:         # mesmo buffer a cada quadro: copie se for guardar
+#       contornos, area_percent, _ = detectar_manchas_ampliado(frame_bgr)
+#
+#   # quadros com paleta: detecção direto no plano de índices (sem cvtColor)
+#   if fonte.indices is not None:
+#       detector.detectar_indexado(fonte.indices, fonte.lut_bgr())
+#
+#   python3 fonte_gif.py [arquivo.gif]     # benchmark contra o caminho antigo
+
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+# Pillow converte para RGB todo quadro depois do primeiro (RGB_AFTER_FIRST);
+# com esta estratégia os quadros continuam em P enquanto a paleta não muda.
+_ESTRATEGIA = getattr(GifImagePlugin, 'LoadingStrategy', None)
+
+
+class _EstrategiaPaleta:
+    # Troca LOADING_STRATEGY só durante o seek/load deste arquivo (é global no Pillow)
+    def __enter__(self):
+        if _ESTRATEGIA is not None:
+            self.anterior = GifImagePlugin.LOADING_STRATEGY
+            GifImagePlugin.LOADING_STRATEGY = _ESTRATEGIA.RGB_AFTER_DIFFERENT_PALETTE_ONLY
+
+    def __exit__(self, *exc):
+        if _ESTRATEGIA is not None:
+            GifImagePlugin.LOADING_STRATEGY = self.anterior
+
+
+def paleta_para_lut_bgr(paleta_rgb):
+    # paleta [r0, g0, b0, r1, ...] -> tabela (256, 3) BGR; entradas ausentes ficam pretas
+    lut = np.zeros((256, 3), np.uint8)
+    cores = np.frombuffer(bytes(paleta_rgb), np.uint8)[:768].reshape(-1, 3)
+    lut[:len(cores)] = cores[:, ::-1]
+    return lut
+
+
+def _luts_por_canal(lut_bgr):
+    # cv2.LUT em 1 canal é bem mais rápido que np.take com axis=0 numa tabela (256, 3)
+    return [np.ascontiguousarray(lut_bgr[:, c]) for c in range(3)]
+
+
+class FonteGif:
+    """Quadros de um GIF em ordem, como BGR, num buffer pré-alocado (ler() devolve None no fim)."""
+
+    def __init__(self, caminho, copiar=False):
+        self.caminho = caminho
+        self.copiar = copiar        # True: devolve cópia (para filas como pipeline_camera)
+        self.gif = Image.open(caminho)
+        self.n_frames = getattr(self.gif, 'n_frames', 1)
+        self._alocar(*self.gif.size)
+        self._lut = None
+        self._luts_canal = None
+        self.indices = None         # plano de índices do quadro atual (None se não for modo P)
+        self._chave_paleta = None
+        self._i = 0
+        self.trocas_paleta = 0
+
+    def _alocar(self, largura, altura):
+        self.largura, self.altura = largura, altura
+        self.bgr = np.empty((altura, largura, 3), np.uint8)
+        self._canais = [np.empty((altura, largura), np.uint8) for _ in range(3)]
+
+    def __len__(self):
+        return self.n_frames
+
+    def _carregar(self):
+        # Posiciona e decodifica o quadro self._i; None no fim do arquivo
+        if self._i >= self.n_frames:
+            return None
+        with _EstrategiaPaleta():
+            if self._i:
+                # seek para o quadro seguinte é incremental (não relê do início)
+                self.gif.seek(self._i)
+            self.gif.load()
+        self._i += 1
+        return self.gif
+
+    def lut_bgr(self):
+        # Tabela paleta->BGR do quadro atual, refeita só quando a paleta muda
+        paleta = self.gif.getpalette('RGB')
+        chave = bytes(paleta) if paleta else b''
+        if chave != self._chave_paleta:
+            self._chave_paleta = chave
+            self._lut = paleta_para_lut_bgr(paleta or [])
+            self._luts_canal = _luts_por_canal(self._lut)
+            self.trocas_paleta += 1
+        return self._lut
+
+    def ler(self):
+        im = self._carregar()
+        if im is None:
+            return None
+        if im.size != (self.largura, self.altura):
+            # quadro maior que a tela lógica: o Pillow amplia a imagem, realoca junto
+            self._alocar(*im.size)
+        modo = im.mode
+        self.indices = None
+        if modo == 'P':
+            indices = self.indices = np.asarray(im)
+            self.lut_bgr()
+            for lut, canal in zip(self._luts_canal, self._canais):
+                cv2.LUT(indices, lut, dst=canal)
+            cv2.merge(self._canais, dst=self.bgr)
+        elif modo == 'RGB':
+            cv2.cvtColor(np.asarray(im), cv2.COLOR_RGB2BGR, dst=self.bgr)
+        elif modo == 'RGBA':
+            # como convert("RGB"): descarta o alfa
+            cv2.cvtColor(np.asarray(im), cv2.COLOR_RGBA2BGR, dst=self.bgr)
+        elif modo == 'L':
+            cv2.cvtColor(np.asarray(im), cv2.COLOR_GRAY2BGR, dst=self.bgr)
+        else:
+            cv2.cvtColor(np.asarray(im.convert('RGB')), cv2.COLOR_RGB2BGR, dst=self.bgr)
+        return self.bgr.copy() if self.copiar else self.bgr
+
+    def __iter__(self):
+        while True:
+            frame = self.ler()
+            if frame is None:
+                return
+            yield frame
+
+    def fechar(self):
+        self.gif.close()
+
+
+def ler_quadros_gif(caminho):
+    """Gerador de quadros BGR (buffer reutilizado) de um GIF."""
+    fonte = FonteGif(caminho)
+    try:
+        yield from fonte
+    finally:
+        fonte.fechar()
+
+
+# === Benchmark contra o caminho antigo (seek + convert + np.array + cvtColor) ===
+def _quadros_antigo(caminho):
+    gif = Image.open(caminho)
+    for i in range(gif.n_frames):
+        gif.seek(i)
+        frame_pil = gif.convert("RGB")
+        frame_np = np.array(frame_pil)
+        yield cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
+
+
+def gerar_gif_teste(caminho, largura=1280, altura=960, n=60):
+    # GIF grande sintético: mar com manchas escuras se deslocando, paleta global
+    from pipeline_camera import FonteSintetica
+    fonte = FonteSintetica(largura, altura, fps=0, n_frames=n)
+    quadros = []
+    while True:
+        frame = fonte.ler()
+        if frame is None:
+            break
+        ruido = np.random.default_rng(len(quadros)).integers(0, 40, frame.shape, dtype=np.uint8)
+        rgb = cv2.cvtColor(cv2.add(frame, ruido), cv2.COLOR_BGR2RGB)
+        im = Image.fromarray(rgb)
+        if quadros:
+            # mesma paleta em todos os quadros (paleta global, como nas animações de satélite)
+            quadros.append(im.quantize(palette=quadros[0], dither=Image.Dither.NONE))
+        else:
+            quadros.append(im.quantize(64, dither=Image.Dither.NONE))
+    quadros[0].save(caminho, save_all=True, append_images=quadros[1:], duration=100, loop=0,
+                    optimize=False)
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    with open(caminho, 'wb') as f:
+        f.write(_so_paleta_global(dados))
+
+
+def _pular_subblocos(dados, k):
+    while dados[k]:
+        k += dados[k] + 1
+    return k + 1
+
+
+def _so_paleta_global(dados):
+    # O Pillow grava uma paleta local em cada quadro; encoders como o das animações
+    # de satélite usam só a global. Remove as tabelas locais (idênticas à global aqui).
+    saida = bytearray(dados[:13])
+    k = 13
+    if dados[10] & 128:
+        k += 3 << ((dados[10] & 7) + 1)
+        saida += dados[13:k]
+    while k < len(dados):
+        marca = dados[k]
+        if marca == 0x21:                   # extensão
+            fim = _pular_subblocos(dados, k + 2)
+            saida += dados[k:fim]
+            k = fim
+        elif marca == 0x2C:                 # descritor de imagem
+            flags = dados[k + 9]
+            saida += dados[k:k + 9] + bytes([flags & 0x78])
+            k += 10
+            if flags & 128:
+                k += 3 << ((flags & 7) + 1)
+            fim = _pular_subblocos(dados, k + 1)
+            saida += dados[k:fim]
+            k = fim
+        else:                               # 0x3B: fim do arquivo
+            saida += dados[k:]
+            break
+    return bytes(saida)
+
+
+def benchmark(caminho=None):
+    if caminho is None:
+        caminho = "/tmp/manchas_teste.gif"
+        gerar_gif_teste(caminho)
+
+    # equivalência quadro a quadro
+    n = 0
+    for a, b in zip(_quadros_antigo(caminho), ler_quadros_gif(caminho)):
+        assert np.array_equal(a, b), f"quadro {n} diferente"
+        n += 1
+
+    def medir(gerador):
+        melhor = float('inf')
+        for _ in range(3):
+            t0 = time.perf_counter()
+            for _ in gerador(caminho):
+                pass
+            melhor = min(melhor, time.perf_counter() - t0)
+        return melhor
+
+    def so_decodificar(caminho):
+        # limite inferior: só o LZW do Pillow, sem nenhuma conversão
+        fonte = FonteGif(caminho)
+        while fonte._carregar() is not None:
+            yield None
+
+    t_antigo = medir(_quadros_antigo)
+    t_novo = medir(ler_quadros_gif)
+    t_lzw = medir(so_decodificar)
+    fonte = FonteGif(caminho)
+    print(f"GIF: {caminho} ({fonte.largura}x{fonte.altura}, {n} quadros, idênticos ao caminho antigo)")
+    print(f"seek+convert+np.array+cvtColor: {n / t_antigo:7.1f} quadros/s")
+    print(f"FonteGif (paleta->BGR em cache): {n / t_novo:7.1f} quadros/s ({t_antigo / t_novo:.2f}x)")
+    print(f"só decodificação LZW (Pillow):   {n / t_lzw:7.1f} quadros/s "
+          f"(conversão: {(t_antigo - t_lzw) / n * 1e3:.1f} -> {(t_novo - t_lzw) / n * 1e3:.1f} ms/quadro)")
+
+
+def benchmark_indexado(caminho):
+    # Perfil cinza (DetectorAmpliado): quadro BGR x plano de índices + paleta
+    from detector_manchas import _do_perfil
+
+    fonte = FonteGif(caminho, copiar=True)
+    quadros = []
+    for frame in fonte:
+        quadros.append((frame, None if fonte.indices is None else fonte.indices.copy(), fonte.lut_bgr()))
+    if any(indices is None for _, indices, _ in quadros):
+        print("GIF sem paleta em todos os quadros: modo indexado não se aplica")
+        return
+    fabrica, parametros = _do_perfil('cinza-limiar')
+    detector = fabrica(fonte.largura, fonte.altura, **parametros)
+    for frame, indices, paleta in quadros:
+        _, p1, m1 = detector(frame)
+        m1 = m1.copy()
+        _, p2, m2 = detector.detectar_indexado(indices, paleta)
+        assert p1 == p2 and np.array_equal(m1, m2)
+
+    def medir(funcao):
+        melhor = float('inf')
+        for _ in range(3):
+            t0 = time.perf_counter()
+            for q in quadros:
+                funcao(q)
+            melhor = min(melhor, time.perf_counter() - t0)
+        return len(quadros) / melhor
+
+    fps_bgr = medir(lambda q: detector(q[0]))
+    fps_idx = medir(lambda q: detector.detectar_indexado(q[1], q[2]))
+    clara = np.maximum(quadros[0][2], 200)     # paleta sem cor escura: atalho da máscara vazia
+    fps_claro = medir(lambda q: detector.detectar_indexado(q[1], clara))
+    print(f"Detecção (perfil cinza), mesma máscara e area_percent nos {len(quadros)} quadros:")
+    print(f"  BGR {fps_bgr:.1f} fps | indexado {fps_idx:.1f} fps ({fps_idx / fps_bgr:.2f}x) | "
+          f"paleta sem escuros {fps_claro:.0f} fps")
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) >= 2 else None
+    benchmark(caminho)
+    benchmark_indexado(caminho or "/tmp/manchas_teste.gif")
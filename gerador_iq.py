@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# gerador_iq.py
+# IQ sintético de AIS para medir o demodulador (demod_ais) sem antena:
+#   payload !AIVDM -> quadro HDLC (treinamento, flags, bit stuffing, CRC-16)
+#   -> NRZI -> GMSK (BT 0.4, 9600 bd) no canal A ou B -> ruído com a SNR pedida
+# Cada rajada ocupa um slot TDMA (26.67 ms) com erro de frequência e fase
+# aleatórios; com --colisoes, uma fração delas divide o slot com outra rajada
+# do mesmo canal (atraso de alguns bits, potência até 10 dB menor).
+# Saída: complex64 intercalado (.cf32) + .json ao lado com taxa, centro e as
+# mensagens esperadas, que o benchmark compara com o que o demodulador entrega.
+#
+# Também tem um RtlSdr falso que lê esses arquivos (ou .cu8 / .msiq), para
+# rodar missao_radio_v1 sem dongle.
+#
+# Uso:
+#   python3 gerador_iq.py teste.cf32 --duracao 10 --snr 15 --colisoes 0.1
+#   python3 gerador_iq.py teste.cf32 --benchmark            # gera e mede
+#   python3 gerador_iq.py teste.cf32 --so-benchmark         # mede um arquivo já gerado
+#   python3 gerador_iq.py --varredura 6 8 10 12 15 20       # taxa de erro de pacote x SNR
+#
+#   sdr = RtlSdrFalso('teste.cf32')                         # no lugar de RtlSdr()
+#   samples = sdr.read_samples(256 * 1024)
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from ais_bits import SIXBIT_TABLE
+from decotificador_ficticio import AIS_EXAMPLES
+from demod_ais import CANAIS, DemodAIS, TAXA_SIMBOLOS, armar, crc16, ler_iq
+from gravacao_iq import ler_cabecalho
+
+BT = 0.4
+TREINAMENTO = [0, 1] * 12
+FLAG_BITS = [0, 1, 1, 1, 1, 1, 1, 0]
+SLOT = 60 / 2250                # 26.67 ms
+BANDA_CANAL = 25e3              # SNR medida na banda do canal
+
+
+# === Quadro HDLC ===
+def mensagem_de_payload(payload, fill=0):
+    """Bytes da mensagem AIS (alinhada em byte, como é transmitida) de um payload armorado."""
+    valores = np.frombuffer(payload.encode('ascii').translate(SIXBIT_TABLE), np.uint8)
+    bits = np.unpackbits(valores[:, None], axis=1)[:, 2:].ravel()
+    if fill:
+        bits = bits[:-fill]
+    return np.packbits(bits).tobytes()
+
+
+def quadro_hdlc(dados):
+    """Bits na ordem de transmissão: treinamento, flag, dados + FCS com stuffing, flag, buffer."""
+    fcs = crc16(dados) ^ 0xFFFF
+    corpo = np.unpackbits(np.frombuffer(dados + bytes((fcs & 0xFF, fcs >> 8)), np.uint8),
+                          bitorder='little')
+    com_stuffing = []
+    uns = 0
+    for b in corpo.tolist():
+        com_stuffing.append(b)
+        uns = uns + 1 if b else 0
+        if uns == 5:
+            com_stuffing.append(0)
+            uns = 0
+    return np.array(TREINAMENTO + FLAG_BITS + com_stuffing + FLAG_BITS + [0] * 8, np.uint8)
+
+
+# === Modulação ===
+def _tabela_pulso(sps, bt=BT):
+    # pulso de frequência do GMSK (retângulo de 1 símbolo * gaussiana) em 3 símbolos,
+    # por intervalo de símbolo: linha 0 = cauda esquerda (vem do símbolo seguinte),
+    # 1 = centro (símbolo atual), 2 = cauda direita (vem do símbolo anterior)
+    sigma = math.sqrt(math.log(2)) / (2 * math.pi * bt)
+    t = (np.arange(3 * sps) + 0.5) / sps - 1.5
+    cdf = np.vectorize(lambda x: 0.5 * math.erfc(-x / (sigma * math.sqrt(2))))
+    pulso = cdf(t + 0.5) - cdf(t - 0.5)
+    return pulso.reshape(3, sps)
+
+
+class Modulador:
+    def __init__(self, taxa):
+        sps = taxa / TAXA_SIMBOLOS
+        if abs(sps - round(sps)) > 1e-9:
+            raise ValueError(f"taxa {taxa:g} não é múltipla de {TAXA_SIMBOLOS} bd")
+        self.taxa = taxa
+        self.sps = int(round(sps))
+        self.pulso = _tabela_pulso(self.sps)
+
+    def __call__(self, bits, deslocamento=0.0, fase=0.0):
+        """Rajada GMSK complexa (amplitude 1) dos bits, deslocada `deslocamento` Hz."""
+        # NRZI: 0 = transição
+        niveis = (np.cumsum(bits == 0) % 2) * 2.0 - 1
+        a = np.concatenate(([niveis[0]], niveis, [niveis[-1]]))
+        # frequência em cada amostra: cada símbolo soma seu pulso nos 3 intervalos vizinhos
+        simbolos = np.stack((a[2:], a[1:-1], a[:-2]), axis=1)
+        freq = (simbolos @ self.pulso).ravel()
+        # índice de modulação 0.5: pi/2 por símbolo
+        passo = freq * (np.pi / 2 / self.sps) + 2 * np.pi * deslocamento / self.taxa
+        return np.exp(1j * (fase + np.cumsum(passo))).astype(np.complex64)
+
+
+# === Gerador ===
+def _payloads(linhas=AIS_EXAMPLES):
+    saida = []
+    for linha in linhas:
+        campos = linha.decode('ascii').split(',')
+        saida.append((campos[5], int(campos[6].split('*')[0])))
+    return saida
+
+
+class GeradorIQ:
+    def __init__(self, taxa=2.4e6, centro=162.0e6, snr_db=15.0, deslocamento_max=1000.0,
+                 colisoes=0.0, msgs_por_s=20.0, semente=0, payloads=None):
+        self.taxa = taxa
+        self.centro = centro
+        self.snr_db = snr_db
+        self.deslocamento_max = deslocamento_max
+        self.colisoes = colisoes
+        self.msgs_por_s = msgs_por_s
+        self.rnd = np.random.default_rng(semente)
+        self.payloads = payloads or _payloads()
+        self.modulador = Modulador(taxa)
+        # ruído: potência total que dá a SNR pedida nos 25 kHz do canal (sinal com potência 1)
+        self.sigma = math.sqrt(taxa / BANDA_CANAL * 10 ** (-snr_db / 10) / 2)
+
+    def agendar(self, duracao):
+        """Rajadas (dicts) em slots TDMA aleatórios, ordenadas pelo início."""
+        amostras_slot = int(SLOT * self.taxa)
+        n_slots = int(duracao / SLOT) - 1
+        n = min(int(self.msgs_por_s * duracao), len(CANAIS) * n_slots)
+        ocupados = self.rnd.choice(len(CANAIS) * n_slots, n, replace=False)
+        rajadas = []
+        for ocupado in ocupados.tolist():
+            slot, c = divmod(ocupado, len(CANAIS))
+            rajadas.append(self._rajada(slot * amostras_slot, c, 0.0))
+            if self.rnd.random() < self.colisoes:
+                # outra estação no mesmo slot: alguns bits depois, até 10 dB mais fraca
+                atraso = int(self.rnd.integers(0, 12) * self.modulador.sps)
+                rajadas[-1]['colisao'] = True
+                rajadas.append(self._rajada(slot * amostras_slot + atraso, c, self.rnd.uniform(-10, 0)))
+                rajadas[-1]['colisao'] = True
+        rajadas.sort(key=lambda r: r['inicio'])
+        return rajadas
+
+    def _rajada(self, inicio, c, ganho_db):
+        payload, fill = self.payloads[self.rnd.integers(len(self.payloads))]
+        dados = mensagem_de_payload(payload, fill)
+        nome, freq = CANAIS[c]
+        return {
+            'inicio': int(inicio),
+            'canal': nome,
+            'frequencia': freq - self.centro + float(self.rnd.uniform(-1, 1) * self.deslocamento_max),
+            'fase': float(self.rnd.uniform(0, 2 * np.pi)),
+            'ganho_db': float(ganho_db),
+            'colisao': False,
+            'dados': dados,
+            'esperado': armar(dados)[0],
+        }
+
+    def escrever(self, caminho, duracao, bloco=1 << 20):
+        """Grava `duracao` s de IQ em complex64 e o .json com as mensagens esperadas."""
+        total = int(duracao * self.taxa)
+        rajadas = self.agendar(duracao)
+        pendentes = list(rajadas)
+        ativas = []
+        with open(caminho, 'wb') as f:
+            for inicio in range(0, total, bloco):
+                n = min(bloco, total - inicio)
+                x = np.empty(n, np.complex64)
+                ruido = x.view(np.float32)
+                ruido[:] = self.rnd.standard_normal(2 * n, np.float32)
+                ruido *= self.sigma
+                while pendentes and pendentes[0]['inicio'] < inicio + n:
+                    r = pendentes.pop(0)
+                    sinal = self.modulador(quadro_hdlc(r['dados']), r['frequencia'], r['fase'])
+                    sinal *= np.float32(10 ** (r['ganho_db'] / 20))
+                    ativas.append((r['inicio'], sinal))
+                restantes = []
+                for comeco, sinal in ativas:
+                    a, b = max(comeco, inicio), min(comeco + len(sinal), inicio + n)
+                    if a < b:
+                        x[a - inicio:b - inicio] += sinal[a - comeco:b - comeco]
+                    if comeco + len(sinal) > inicio + n:
+                        restantes.append((comeco, sinal))
+                ativas = restantes
+                x.tofile(f)
+        metadados = {
+            'taxa': self.taxa, 'centro': self.centro, 'amostras': total, 'snr_db': self.snr_db,
+            'deslocamento_max': self.deslocamento_max, 'colisoes': self.colisoes,
+            'mensagens': [{k: v for k, v in r.items() if k != 'dados'} for r in rajadas],
+        }
+        with open(_caminho_json(caminho), 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, indent=1)
+        return metadados
+
+
+def _caminho_json(caminho):
+    return os.path.splitext(caminho)[0] + '.json'
+
+
+def ler_metadados(caminho):
+    caminho_json = _caminho_json(caminho)
+    if not os.path.exists(caminho_json):
+        return {}
+    with open(caminho_json, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# === RtlSdr falso ===
+class RtlSdrFalso:
+    """Mesma interface usada de rtlsdr.RtlSdr, lendo amostras de um arquivo IQ.
+
+    .cf32 (complex64, com o .json do gerador), .cu8/.bin (uint8 do rtl_sdr) ou
+    .msiq (gravacao_iq, metadados do cabeçalho).
+    Com repetir=True volta ao início no fim do arquivo. Com tempo_real=True as
+    amostras "chegam" no ritmo da taxa de amostragem, como no dongle: quem lê
+    espera por elas, e quem se atrasa mais que o FIFO do dispositivo
+    (fifo amostras) perde o excesso, contado em `perdidas`.
+    """
+
+    def __init__(self, caminho, repetir=True, tempo_real=False, fifo=1 << 16):
+        self.caminho = caminho
+        self.repetir = repetir
+        self.tempo_real = tempo_real
+        self.fifo = fifo
+        ext = os.path.splitext(caminho)[1].lower()
+        offset = 0
+        if ext == '.msiq':
+            meta = ler_cabecalho(caminho)
+            offset = meta['tamanho_cabecalho']
+        else:
+            meta = ler_metadados(caminho)
+        self._taxa_arquivo = meta.get('taxa', 2.4e6)
+        self._sample_rate = self._taxa_arquivo
+        self.center_freq = meta.get('centro', 162.0e6)
+        self.gain = meta.get('ganho', 'auto')
+        self.freq_correction = meta.get('correcao_ppm', 0)
+        self.escala = meta.get('escala', 1.0)      # .msiq convertido de .cf32: amplitude do byte 255
+        self.cu8 = ext in ('.cu8', '.bin', '.msiq')
+        self.dados = np.memmap(caminho, np.uint8 if self.cu8 else np.complex64, 'r', offset=offset)
+        self.n_amostras = len(self.dados) // 2 if self.cu8 else len(self.dados)
+        self.posicao = 0
+        self.entregues = 0          # amostras do "ar" já passadas (lidas + perdidas)
+        self.perdidas = 0
+        self._inicio = None
+
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, taxa):
+        if taxa != self._taxa_arquivo:
+            print(f"⚠️ {self.caminho} foi gravado a {self._taxa_arquivo:g} amostras/s, não {taxa:g}")
+        self._sample_rate = taxa
+
+    def _trecho(self, a, b):
+        if self.cu8:
+            bruto = self.dados[2 * a:2 * b].astype(np.float32)
+            bruto -= 127.5
+            bruto *= self.escala / 127.5
+            return bruto.view(np.complex64)
+        return np.asarray(self.dados[a:b])
+
+    def _ler(self, n, guardar=True):
+        partes = []
+        while n:
+            if self.posicao >= self.n_amostras:
+                if not self.repetir or not self.n_amostras:
+                    break
+                self.posicao = 0
+            fim = min(self.posicao + n, self.n_amostras)
+            if guardar:
+                partes.append(self._trecho(self.posicao, fim))
+            n -= fim - self.posicao
+            self.entregues += fim - self.posicao
+            self.posicao = fim
+        return partes
+
+    def read_samples(self, num_samples=256 * 1024):
+        if self.tempo_real:
+            agora = time.perf_counter()
+            if self._inicio is None:
+                self._inicio = agora - self.entregues / self._sample_rate
+            no_ar = (agora - self._inicio) * self._sample_rate
+            # o que passou do FIFO enquanto ninguém lia se perdeu
+            excesso = int(no_ar - self.entregues) - self.fifo
+            if excesso > 0:
+                self.perdidas += excesso
+                self._ler(excesso, guardar=False)
+            # espera as amostras pedidas "chegarem"
+            pronto = self._inicio + (self.entregues + num_samples) / self._sample_rate
+            if pronto > agora:
+                time.sleep(pronto - agora)
+        partes = self._ler(num_samples)
+        if not partes:
+            return np.empty(0, np.complex64)
+        return np.concatenate(partes) if len(partes) > 1 else np.array(partes[0])
+
+    def close(self):
+        self.dados = None
+
+
+# === Benchmark ===
+def benchmark(caminho, bloco=256 * 1024, silencioso=False):
+    """Reproduz o arquivo no demodulador; amostras/s, mensagens/s e taxa de erro de pacote."""
+    meta = ler_metadados(caminho)
+    taxa = meta.get('taxa', 2.4e6)
+    demod = DemodAIS(taxa, meta.get('centro', 162.0e6))
+    recebidas = []
+    t0 = time.perf_counter()
+    for iq in ler_iq(caminho, bloco):
+        recebidas += demod.processar(iq)
+    recebidas += demod.esvaziar()
+    dt = time.perf_counter() - t0
+
+    # compara por (canal, payload): o mesmo payload pode aparecer várias vezes
+    def chave(sentencas):
+        campos = [s.decode('ascii').split(',') for s in sentencas]
+        return campos[0][4], ''.join(c[5] for c in campos)
+
+    obtidas = Counter(chave(s) for s in recebidas)
+    mensagens = meta.get('mensagens', [])
+    resultado = {
+        'amostras_s': demod.stats['amostras'] / dt,
+        'tempo_real': demod.stats['amostras'] / taxa / dt,
+        'mensagens_s': len(recebidas) / dt,
+        'recebidas': len(recebidas),
+    }
+    for nome, grupo in (('todas', mensagens), ('sem_colisao', [m for m in mensagens if not m['colisao']])):
+        esperadas = Counter((m['canal'], m['esperado']) for m in grupo)
+        # mensagens em colisão podem ter o mesmo payload de uma sem colisão: o
+        # total recebido de cada chave é repartido pelo grupo
+        certas = sum(min(n, obtidas[k]) for k, n in esperadas.items())
+        resultado[f'per_{nome}'] = 1 - certas / len(grupo) if grupo else float('nan')
+        resultado[f'enviadas_{nome}'] = len(grupo)
+    esperadas = Counter((m['canal'], m['esperado']) for m in mensagens)
+    resultado['espurias'] = sum(max(0, n - esperadas[k]) for k, n in obtidas.items())
+    if not silencioso:
+        print(f"📈 {caminho}: {meta.get('amostras', demod.stats['amostras']) / taxa:.1f} s de IQ, "
+              f"SNR {meta.get('snr_db', '?')} dB, colisões {meta.get('colisoes', '?')}")
+        print(f"  {resultado['amostras_s'] / 1e6:.2f} Msps ({resultado['tempo_real']:.1f}x tempo real) | "
+              f"{resultado['mensagens_s']:.1f} msg/s")
+        print(f"  enviadas {resultado['enviadas_todas']} | recebidas {resultado['recebidas']} | "
+              f"PER {resultado['per_todas']:.3f} (sem colisão: {resultado['per_sem_colisao']:.3f}) | "
+              f"espúrias {resultado['espurias']}")
+    return resultado
+
+
+def varredura(snrs, duracao=10.0, **kwargs):
+    pasta = tempfile.mkdtemp(prefix='gerador_iq_')
+    try:
+        print(f"{'SNR dB':>7s} {'PER':>6s} {'PER s/ col.':>11s} {'Msps':>6s} {'x t.real':>8s}")
+        for snr in snrs:
+            caminho = os.path.join(pasta, f"snr_{snr:g}.cf32")
+            GeradorIQ(snr_db=snr, **kwargs).escrever(caminho, duracao)
+            r = benchmark(caminho, silencioso=True)
+            print(f"{snr:7g} {r['per_todas']:6.3f} {r['per_sem_colisao']:11.3f} "
+                  f"{r['amostras_s'] / 1e6:6.2f} {r['tempo_real']:8.1f}")
+            os.remove(caminho)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de IQ AIS sintético + benchmark do demodulador")
+    parser.add_argument('arquivo', nargs='?', default='ais_sintetico.cf32')
+    parser.add_argument('--duracao', type=float, default=10.0, help="segundos de IQ")
+    parser.add_argument('--taxa', type=float, default=2.4e6)
+    parser.add_argument('--centro', type=float, default=162.0e6)
+    parser.add_argument('--snr', type=float, default=15.0, help="dB na banda de 25 kHz do canal")
+    parser.add_argument('--deslocamento', type=float, default=1000.0, help="erro de frequência máximo (Hz)")
+    parser.add_argument('--colisoes', type=float, default=0.0, help="fração de rajadas com colisão")
+    parser.add_argument('--msgs', type=float, default=20.0, help="mensagens por segundo (somando os canais)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--benchmark', action='store_true', help="mede o demodulador depois de gerar")
+    parser.add_argument('--so-benchmark', action='store_true', help="só mede um arquivo já gerado")
+    parser.add_argument('--varredura', type=float, nargs='+', metavar='SNR')
+    args = parser.parse_args()
+
+    opcoes = dict(taxa=args.taxa, centro=args.centro, deslocamento_max=args.deslocamento,
+                  colisoes=args.colisoes, msgs_por_s=args.msgs, semente=args.semente)
+    if args.varredura:
+        varredura(args.varredura, args.duracao, **opcoes)
+        return
+    if not args.so_benchmark:
+        t0 = time.perf_counter()
+        meta = GeradorIQ(snr_db=args.snr, **opcoes).escrever(args.arquivo, args.duracao)
+        print(f"💾 {args.arquivo}: {meta['amostras']} amostras, {len(meta['mensagens'])} rajadas "
+              f"em {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    if args.benchmark or args.so_benchmark:
+        benchmark(args.arquivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# gravacao_iq.py
+# Gravação de passagens em IQ bruto para re-demodular depois, e reprodução
+# sem carregar o arquivo na memória.
+#
+# Formato .msiq: cabeçalho fixo de 64 bytes (little-endian) seguido dos bytes
+# uint8 intercalados I,Q exatamente como o dongle entrega (2 bytes/amostra,
+# 4x menos que complex64). O número de amostras sai do tamanho do arquivo, então
+# uma gravação interrompida continua legível.
+#   0  4s  'MSIQ'
+#   4  H   versão
+#   6  H   tamanho do cabeçalho
+#   8  d   taxa de amostragem (amostras/s)
+#   16 d   frequência central (Hz)
+#   24 d   ganho (dB; NaN = automático)
+#   32 d   início da gravação (epoch, s)
+#   40 i   correção de frequência (ppm)
+#   44 f   escala: amplitude que o byte 255 representa (versão 2; 1.0 na versão 1)
+#
+# O dongle entrega [-1, 1] (escala 1.0). Na conversão de .cf32 (gerador_iq,
+# outros SDRs) a amplitude passa de 1 e a escala vem do pico da origem, para o
+# uint8 não saturar.
+#
+# A reprodução usa np.memmap: cada bloco é uma vista dos bytes no arquivo,
+# convertida para complex64 num buffer reaproveitado só quando pedida; um
+# arquivo de vários GB é processado com memória de um bloco.
+#
+# Uso:
+#   with GravadorIQ.do_sdr('passe.msiq', sdr) as gravador:
+#       gravador.escrever(sdr.read_bytes(2 * n))
+#   for iq in ReproducaoIQ('passe.msiq').blocos(256 * 1024):
+#       demod.processar(iq)
+#
+#   python3 gravacao_iq.py info passe.msiq
+#   python3 gravacao_iq.py converter captura.cf32 passe.msiq     # .cf32/.cu8 -> .msiq (2 passadas)
+#   python3 gravacao_iq.py benchmark passe.msiq                  # memmap x carregar tudo
+
+import argparse
+import math
+import os
+import struct
+import time
+import tracemalloc
+
+import numpy as np
+
+MAGICO = b'MSIQ'
+VERSAO = 2
+CABECALHO = struct.Struct('<4sHHddddif')
+TAMANHO_CABECALHO = 64
+
+
+def _ganho_db(ganho):
+    return float('nan') if ganho in (None, 'auto') else float(ganho)
+
+
+def ler_cabecalho(caminho):
+    """Metadados do .msiq (dict); ValueError se não for um."""
+    with open(caminho, 'rb') as f:
+        dados = f.read(TAMANHO_CABECALHO)
+    if len(dados) < CABECALHO.size or dados[:4] != MAGICO:
+        raise ValueError(f"{caminho} não é uma gravação .msiq")
+    _, versao, tamanho, taxa, centro, ganho, inicio, ppm, escala = CABECALHO.unpack_from(dados)
+    if versao > VERSAO:
+        raise ValueError(f"{caminho}: versão {versao} do formato não suportada")
+    if versao < 2:
+        escala = 1.0        # bytes reservados (zero) na versão 1
+    return {
+        'versao': versao, 'tamanho_cabecalho': tamanho, 'taxa': taxa, 'centro': centro,
+        'ganho': 'auto' if math.isnan(ganho) else ganho, 'inicio': inicio, 'correcao_ppm': ppm,
+        'escala': escala,
+    }
+
+
+def para_complexo(bruto, saida=None, escala=1.0):
+    """uint8 I,Q intercalados -> complex64 em [-escala, escala] (em `saida`, se dada)."""
+    n = len(bruto) // 2
+    if saida is None:
+        saida = np.empty(n, np.complex64)
+    reais = saida[:n].view(np.float32)
+    np.subtract(bruto[:2 * n], np.float32(127.5), out=reais, dtype=np.float32)
+    reais *= np.float32(escala / 127.5)
+    return saida[:n]
+
+
+def para_bytes(iq, escala=1.0):
+    """complex64 -> uint8 I,Q intercalados (o inverso de para_complexo; satura fora de ±escala)."""
+    reais = np.asarray(iq, np.complex64).view(np.float32) * np.float32(127.5 / escala) + np.float32(127.5)
+    return np.clip(np.rint(reais), 0, 255).astype(np.uint8)
+
+
+class GravadorIQ:
+    def __init__(self, caminho, taxa, centro, ganho='auto', correcao_ppm=0, inicio=None, escala=1.0):
+        self.caminho = caminho
+        self.escala = float(escala)
+        self.f = open(caminho, 'wb')
+        cabecalho = CABECALHO.pack(MAGICO, VERSAO, TAMANHO_CABECALHO, float(taxa), float(centro),
+                                   _ganho_db(ganho), time.time() if inicio is None else inicio,
+                                   int(correcao_ppm), self.escala)
+        self.f.write(cabecalho.ljust(TAMANHO_CABECALHO, b'\0'))
+        self.bytes = 0
+
+    @classmethod
+    def do_sdr(cls, caminho, sdr):
+        """Gravador com taxa, frequência, ganho e correção lidos do RtlSdr."""
+        return cls(caminho, sdr.sample_rate, sdr.center_freq, getattr(sdr, 'gain', 'auto'),
+                   getattr(sdr, 'freq_correction', 0))
+
+    def escrever(self, bruto):
+        # bytes do dongle direto para o disco, sem conversão
+        self.f.write(bruto)
+        self.bytes += len(bruto)
+
+    def escrever_complexo(self, iq):
+        # fontes que só entregam complexo (read_samples, RtlSdrFalso)
+        self.escrever(para_bytes(iq, self.escala))
+
+    @property
+    def amostras(self):
+        return self.bytes // 2
+
+    def fechar(self):
+        if not self.f.closed:
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class ReproducaoIQ:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        meta = ler_cabecalho(caminho)
+        self.__dict__.update(meta)
+        self.bruto = np.memmap(caminho, np.uint8, 'r', offset=meta['tamanho_cabecalho'])
+        self.n_amostras = len(self.bruto) // 2
+
+    @property
+    def duracao(self):
+        return self.n_amostras / self.taxa
+
+    def trecho_bruto(self, a, b):
+        """Vista (sem cópia) dos bytes das amostras [a, b) no arquivo."""
+        return self.bruto[2 * a:2 * b]
+
+    def blocos(self, amostras_bloco=256 * 1024, sobreposicao=0, inicio=0, fim=None):
+        """complex64 de cada bloco, convertido sob demanda num buffer reaproveitado.
+
+        Cada bloco começa `sobreposicao` amostras antes do anterior terminar. O
+        array entregue vale até a próxima iteração (copie se for guardar).
+        """
+        fim = self.n_amostras if fim is None else min(fim, self.n_amostras)
+        buffer = np.empty(sobreposicao + amostras_bloco, np.complex64)
+        for a in range(inicio, fim, amostras_bloco):
+            b = min(a + amostras_bloco, fim)
+            yield para_complexo(self.trecho_bruto(max(inicio, a - sobreposicao), b), buffer, self.escala)
+
+    def fechar(self):
+        self.bruto = None
+
+
+# === Linha de comando ===
+def info(caminho):
+    r = ReproducaoIQ(caminho)
+    ganho = r.ganho if r.ganho == 'auto' else f"{r.ganho:g} dB"
+    print(f"{caminho}: {r.n_amostras} amostras ({r.duracao:.1f} s) a {r.taxa:g} amostras/s")
+    print(f"  centro {r.centro / 1e6:.3f} MHz | ganho {ganho} | correção {r.correcao_ppm} ppm | "
+          f"escala {r.escala:g} | início {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r.inicio))}")
+
+
+def converter(origem, destino, bloco=1 << 20):
+    from demod_ais import ler_iq
+    from gerador_iq import ler_metadados
+
+    meta = ler_metadados(origem)
+    t0 = time.perf_counter()
+    # 1ª passada: pico de I/Q na origem, para o uint8 cobrir a faixa toda sem saturar
+    pico = 0.0
+    for iq in ler_iq(origem, bloco):
+        if len(iq):
+            pico = max(pico, float(np.abs(iq.view(np.float32)).max()))
+    escala = pico or 1.0
+    with GravadorIQ(destino, meta.get('taxa', 2.4e6), meta.get('centro', 162.0e6), escala=escala) as gravador:
+        for iq in ler_iq(origem, bloco):
+            gravador.escrever_complexo(iq)
+    print(f"💾 {destino}: {gravador.amostras} amostras (escala {escala:g}) em {time.perf_counter() - t0:.1f} s")
+
+
+def benchmark(caminho, amostras_bloco=256 * 1024):
+    from demod_ais import DemodAIS
+
+    r = ReproducaoIQ(caminho)
+
+    def medir(blocos):
+        demod = DemodAIS(r.taxa, r.centro)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        for iq in blocos():
+            demod.processar(iq)
+        demod.esvaziar()
+        dt = time.perf_counter() - t0
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return dt, pico, demod.stats['quadros']
+
+    def carregado():
+        # como antes: tudo em memória como complex64
+        iq = para_complexo(np.fromfile(caminho, np.uint8, offset=r.tamanho_cabecalho), escala=r.escala)
+        for a in range(0, len(iq), amostras_bloco):
+            yield iq[a:a + amostras_bloco]
+
+    print(f"{caminho}: {r.duracao:.1f} s de IQ, {os.path.getsize(caminho) / 1e6:.0f} MB em disco "
+          f"({r.n_amostras * 8 / 1e6:.0f} MB como complex64)")
+    for nome, blocos in (("memmap + conversão por bloco", lambda: r.blocos(amostras_bloco)),
+                         ("carregar tudo (complex64)", carregado)):
+        dt, pico, quadros = medir(blocos)
+        print(f"  {nome:30s} {r.n_amostras / dt / 1e6:6.2f} Msps | pico de memória {pico / 1e6:7.1f} MB | "
+              f"{quadros} mensagens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gravações IQ .msiq")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p = sub.add_parser('info')
+    p.add_argument('arquivo')
+    p = sub.add_parser('converter')
+    p.add_argument('origem', help=".cf32/.cu8/.npy")
+    p.add_argument('destino')
+    p = sub.add_parser('benchmark')
+    p.add_argument('arquivo')
+    p.add_argument('--bloco', type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    if args.comando == 'info':
+        info(args.arquivo)
+    elif args.comando == 'converter':
+        converter(args.origem, args.destino)
+    else:
+        benchmark(args.arquivo, args.bloco)
+
+
+if __name__ == "__main__":
+    main()
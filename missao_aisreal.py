@@ -1,31 +1,35 @@
 #!/usr/bin/env python3
-import sys, subprocess, re
+import asyncio
 
 # Import your existing functions
-from missao_ais import payload_to_bitstring, bits_to_uint, decode_position_report, pretty_print
+from aisreal2 import print_decoded
+import ais_processo
+from ais_estado import TabelaEmbarcacoes
+from ais_grade import GradeEspacial
 
-# Regex para extrair o payload do formato !AIVDM
-pattern = re.compile(r'!AIVDM,\d+,\d+,[^,]*,[^,]*,([^,]*),')
+print("🔎 Lendo dados AIS em tempo real... (CTRL+C para sair)\n")
 
-# Inicia AIS-catcher
-proc = subprocess.Popen(["AIS-catcher", "-v"], stdout=subprocess.PIPE, text=True)
+# estado atual de cada embarcação (última posição + dados estáticos)
+tabela = TabelaEmbarcacoes(max_idade=600)
+# índice espacial para correlacionar manchas com navios próximos
+grade = GradeEspacial(celula_graus=0.1)
+grade.conectar(tabela)
 
-print("🔎 Lendo dados AIS em tempo real... (CTRL+C para sair)\n")
 
-for line in proc.stdout:
-    match = pattern.search(line)
-    if not match:
-        continue
-    payload = match.group(1).strip()
+def mostrar(decoded):
+    print_decoded(decoded, decoded['payload'])
+    print("-" * 40)
 
-    try:
-        bitstr = payload_to_bitstring(payload)
-        msgtype = bits_to_uint(bitstr[0:6])
 
-        if msgtype in (1,2,3):
-            decoded = decode_position_report(bitstr)
-            pretty_print(decoded, payload)
-            print("-" * 40)
+# AIS-catcher supervisionado: stdout lido em blocos sem bloquear, checksum,
+# remontagem e decodificação (ais_nmea) fora do caminho de leitura, log do SDR
+# com limite de taxa e contadores
+leitor = ais_processo.ProcessoAIS(["AIS-catcher", "-v"], tabela=tabela, ao_decodificar=mostrar)
 
-    except Exception as e:
-        print("Erro ao decodificar:", e)
+try:
+    asyncio.run(leitor.executar())
+except KeyboardInterrupt:
+    pass
+finally:
+    leitor.imprimir_estatisticas()
+    print("Embarcações na tabela:", len(tabela))
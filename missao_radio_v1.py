@@ -1,9 +1,24 @@
-from rtlsdr import RtlSdr
+import argparse
+
 from pyais import decode
-import numpy as np
+
+from aquisicao_sdr import AquisicaoSDR
+from demod_ais import DemodAIS
+from gravacao_iq import GravadorIQ
+
+# python3 missao_radio_v1.py [captura.cf32|.cu8|.msiq] [--gravar passe.msiq]
+parser = argparse.ArgumentParser(description="Recepção AIS com RTL-SDR")
+parser.add_argument('arquivo', nargs='?', help="IQ gravado no lugar do dongle (gerador_iq.RtlSdrFalso)")
+parser.add_argument('--gravar', metavar='ARQUIVO', help="grava o IQ bruto da passagem (.msiq, gravacao_iq)")
+args = parser.parse_args()
 
 # --- Configuração do RTL-SDR ---
-sdr = RtlSdr()
+if args.arquivo:
+    from gerador_iq import RtlSdrFalso
+    sdr = RtlSdrFalso(args.arquivo, tempo_real=True)
+else:
+    from rtlsdr import RtlSdr
+    sdr = RtlSdr()
 sdr.sample_rate = 2.4e6         # taxa de amostragem
 sdr.center_freq = 162.0e6       # frequência central AIS
 sdr.gain = 'auto'
@@ -11,9 +26,10 @@ sdr.gain = 'auto'
 SAMPLES = 256*1024              # número de amostras por captura
 
 # --- Função para processar mensagens AIS ---
-def processar_mensagem(msg_bytes):
+def processar_mensagem(*msg_bytes):
+    # uma sentença, ou os fragmentos de uma mensagem longa (tipo 5) em ordem
     try:
-        decoded = decode(msg_bytes)
+        decoded = decode(*msg_bytes)
         mmsi = getattr(decoded, "mmsi", "N/A")
         lat = getattr(decoded, "y", "N/A")
         lon = getattr(decoded, "x", "N/A")
@@ -27,24 +43,34 @@ def processar_mensagem(msg_bytes):
 
 # --- Função principal ---
 def main():
+    # AIS 1 (161.975 MHz) e AIS 2 (162.025 MHz) da mesma captura; o estado do
+    # demodulador passa entre as leituras, rajadas cortadas no meio não se perdem
+    demod = DemodAIS(taxa=sdr.sample_rate, centro=sdr.center_freq)
+    # leitura do dongle numa thread (anel de buffers): o tempo de processamento
+    # não abre buracos na recepção
+    gravador = GravadorIQ.do_sdr(args.gravar, sdr) if args.gravar else None
+    aquisicao = AquisicaoSDR(sdr, SAMPLES, gravador=gravador)
+    print(f"Capturando blocos de {SAMPLES} amostras em {sdr.center_freq/1e6:.2f} MHz...")
     try:
-        while True:
-            print(f"Capturando {SAMPLES} amostras em {sdr.center_freq/1e6:.2f} MHz...")
-            samples = sdr.read_samples(SAMPLES)
-
-            # --- DEMODULAÇÃO GMSK necessária aqui ---
-            # Por enquanto, simulamos algumas mensagens AIS de teste
-            mensagens_ais = [
-                b"!AIVDM,1,1,,A,15Muq@0020o?;TPG5J0Qw?vN0<0u,0*1C",
-                b"!AIVDM,1,1,,B,15Muq@0020o?;TPG5J0Qw?vN0<0u,0*1C"
-            ]
+        with aquisicao:
+            for bloco in aquisicao:
+                if bloco.descontinuo:
+                    print(f"⚠️ Processamento atrasado: {aquisicao.stats['overruns']} blocos perdidos até agora")
 
-            for msg in mensagens_ais:
-                processar_mensagem(msg)
+                # --- Demodulação GMSK/HDLC -> sentenças !AIVDM ---
+                for sentencas in demod.processar(bloco.novas):
+                    for s in sentencas:
+                        print(s.decode())
+                    processar_mensagem(*sentencas)
 
     except KeyboardInterrupt:
         print("Encerrando captura AIS...")
     finally:
+        aquisicao.imprimir_estatisticas()
+        demod.imprimir_estatisticas()
+        if gravador is not None:
+            gravador.fechar()
+            print(f"💾 {gravador.amostras} amostras gravadas em {args.gravar}")
         sdr.close()
         print("Dispositivo RTL-SDR fechado com sucesso.")
 
@@ -1,61 +1,30 @@
+import argparse
 import cv2
 import numpy as np
 import time
 from picamera2 import Picamera2
 
+import perfis_deteccao
+from detector_manchas import desenhar_linhas
+from portao_mudanca import PortaoMudanca
+from saida_resultados import abrir_saida
+
 # === Inicializar Picamera2 ===
 picam2 = Picamera2()
 picam2.start()
 
 # === Função de detecção de manchas (linhas pretas) ===
 def detectar_manchas_final(frame_bgr):
-    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
-    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-
-    # --- Detecção de PRETO/MUITO ESCURO ---
-    lower_black = np.array([0, 0, 0])
-    upper_black = np.array([151, 151, 151])  # Detecta preto e cinza muito escuro
-    mask_preto = cv2.inRange(hsv, lower_black, upper_black)
-
-    # --- Limpeza morfológica ---
-    kernel = np.ones((3,3), np.uint8)
-    mask_preto = cv2.morphologyEx(mask_preto, cv2.MORPH_OPEN, kernel, iterations=1)
-    mask_preto = cv2.morphologyEx(mask_preto, cv2.MORPH_CLOSE, kernel, iterations=2)
-
-    # --- Encontrar contornos ---
-    contornos, _ = cv2.findContours(mask_preto, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    # --- Filtrar para detectar APENAS LINHAS/BARRAS alongadas ---
-    linhas_detectadas = []
-    for c in contornos:
-        area = cv2.contourArea(c)
-        if area < 50:  # Ignorar ruído muito pequeno
-            continue
-        
-        # Calcular retângulo rotacionado (para pegar orientação da linha)
-        rect = cv2.minAreaRect(c)
-        width, height = rect[1]
-        
-        if width == 0 or height == 0:
-            continue
-        
-        # Aspect ratio (proporção) - linhas têm proporção alta
-        aspect_ratio = max(width, height) / min(width, height)
-        
-        # Se aspect_ratio > 3, é uma linha/barra alongada
-        if aspect_ratio > 3.0:
-            linhas_detectadas.append(c)
-
-    # --- Porcentagem ---
-    area_total = frame_bgr.shape[0] * frame_bgr.shape[1]
-    area_manchas = sum(cv2.contourArea(c) for c in linhas_detectadas)
-    area_percent = round((area_manchas / area_total) * 100, 4) if area_total>0 else 0
-
-    return linhas_detectadas, area_percent, mask_preto
+    # perfil "linhas-escuras" de perfis_deteccao (DetectorLinhas, limiares no JSON):
+    # área de todos os contornos em bloco e um minAreaRect só por candidato.
+    # Devolve o array LINHA (contorno, ângulo, caixa, centro), que o desenho e o
+    # registro reaproveitam; a máscara é o buffer do detector: copie se for guardar
+    return perfis_deteccao.detector('linhas-escuras')(frame_bgr)
 
 
 # === Função principal para análise em tempo real ===
-def analisar_camera_rpi_real_time(salvar_saida=False):
+def analisar_camera_rpi_real_time(salvar_saida=False, mostrar=True, caminho_resultados=None,
+                                  duracao=None, limiar_mudanca=0, intervalo_refresh=30):
     largura, altura = 640, 480
     fps = 30
 
@@ -68,6 +37,12 @@ def analisar_camera_rpi_real_time(salvar_saida=False):
     print("🎥 Captura da câmera iniciada. Pressione Ctrl+C ou 'q' para sair.")
 
     start_time = time.time()
+    # sem janela e sem gravação: não desenha nada
+    desenhar = mostrar or out is not None
+    saida = abrir_saida(caminho_resultados)
+    # mar parado: só roda a detecção quando o frame muda (limiar_mudanca=0 desliga)
+    portao = PortaoMudanca(limiar_mudanca, intervalo_refresh) if limiar_mudanca else None
+    n_frame = 0
 
     try:
         while True:
@@ -76,66 +51,65 @@ def analisar_camera_rpi_real_time(salvar_saida=False):
             # Converter RGB para BGR
             frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
 
-            contornos, area_percent, mask_preto = detectar_manchas_final(frame_bgr)
-
-            # desenhar resultados
-            frame_resultado = frame_bgr.copy()
-            
-            # Desenhar cada linha detectada com informações
-            for i, c in enumerate(contornos):
-                # Desenhar contorno
-                cv2.drawContours(frame_resultado, [c], -1, (0, 255, 0), 2)
-                
-                # Desenhar retângulo rotacionado
-                rect = cv2.minAreaRect(c)
-                box = cv2.boxPoints(rect)
-                box = np.int0(box)
-                cv2.drawContours(frame_resultado, [box], 0, (255, 0, 0), 2)
-                
-                # Calcular ângulo
-                angle = rect[2]
-                width, height = rect[1]
-                if width < height:
-                    angle = 90 - angle
-                else:
-                    angle = -angle
-                
-                # Mostrar informações
-                M = cv2.moments(c)
-                if M["m00"] != 0:
-                    cX = int(M["m10"] / M["m00"])
-                    cY = int(M["m01"] / M["m00"])
-                    cv2.putText(frame_resultado, f"L{i+1}: {angle:.1f}deg", 
-                               (cX-30, cY), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
-
-            # Informações gerais
-            cv2.putText(frame_resultado, f"Area: {area_percent:.4f}%",
-                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-            cv2.putText(frame_resultado, f"Linhas: {len(contornos)}",
-                        (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-            # Mostrar janelas
-            cv2.imshow("Mask - Deteccao Preto", mask_preto)
-            cv2.imshow("Linhas Pretas - Camera RPi", frame_resultado)
-            
-            if out:
-                out.write(frame_resultado)
-
-            # sair
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            t0 = time.perf_counter()
+            if portao:
+                linhas, area_percent, mask_preto = portao(frame_bgr, detectar_manchas_final)
+            else:
+                linhas, area_percent, mask_preto = detectar_manchas_final(frame_bgr)
+            t1 = time.perf_counter()
+
+            if desenhar:
+                frame_resultado = desenhar_linhas(frame_bgr, linhas, area_percent)
+                if out:
+                    out.write(frame_resultado)
+            t2 = time.perf_counter()
+
+            saida.escrever({'frame': n_frame, 't': round(time.time() - start_time, 3),
+                            'area_percent': area_percent, 'n_linhas': len(linhas),
+                            'angulos': np.round(linhas['angulo'].astype(np.float64), 1).tolist() if caminho_resultados else [],
+                            'reaproveitado': bool(portao and portao.reaproveitado),
+                            't_deteccao_ms': round((t1 - t0) * 1e3, 3),
+                            't_desenho_ms': round((t2 - t1) * 1e3, 3)})
+            n_frame += 1
+
+            if mostrar:
+                # Mostrar janelas
+                cv2.imshow("Mask - Deteccao Preto", mask_preto)
+                cv2.imshow("Linhas Pretas - Camera RPi", frame_resultado)
+
+                # sair
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+            if duracao is not None and time.time() - start_time > duracao:
                 break
 
     except KeyboardInterrupt:
         print("🛑 Interrompido pelo usuário.")
 
+    saida.fechar()
     if out:
         out.release()
         print("💾 Vídeo salvo como 'manchas_camera.mp4'")
+    if portao:
+        portao.imprimir_resumo(n_frame / max(time.time() - start_time, 1e-9))
 
     picam2.stop()
-    cv2.destroyAllWindows()
+    if mostrar:
+        cv2.destroyAllWindows()
 
 
 # === Execução ===
 if __name__ == "__main__":
-    analisar_camera_rpi_real_time(salvar_saida=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Detecção de linhas pretas com a câmera do RPi")
+    parser.add_argument('--sem-janela', action='store_true', help="sem imshow/waitKey (sem monitor)")
+    parser.add_argument('--sem-gravar', action='store_true', help="não grava manchas_camera.mp4")
+    parser.add_argument('--resultados', default=None, help="registro por frame (.jsonl ou .csv)")
+    parser.add_argument('--duracao', type=float, default=None)
+    parser.add_argument('--limiar-mudanca', type=float, default=0,
+                        help="pula frames sem mudança acima deste limiar (0 = desligado)")
+    parser.add_argument('--refresh', type=int, default=30, help="com o portão: analisa pelo menos a cada N frames")
+    args = parser.parse_args()
+
+    analisar_camera_rpi_real_time(salvar_saida=not args.sem_gravar, mostrar=not args.sem_janela,
+                                  caminho_resultados=args.resultados, duracao=args.duracao,
+                                  limiar_mudanca=args.limiar_mudanca, intervalo_refresh=args.refresh)
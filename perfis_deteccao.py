@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# perfis_deteccao.py
+# Motor único de detecção com perfis nomeados, no lugar das cópias de
+# detectar_manchas_final / detectar_manchas_ampliado / missao_v1 espalhadas
+# pelos scripts, cada uma com limiares e kernels no código:
+#   mar-hsv         mar azul + manchas pretas em HSV (DetectorManchas)
+#   linhas-escuras  linhas/barras pretas alongadas (DetectorLinhas)
+#   cinza-limiar    cinza + limiar fixo (DetectorAmpliado)
+# Os parâmetros vêm só de perfis_deteccao.json, o único lugar com limiares e
+# kernels (os construtores dos detectores não têm padrão para eles). Cada
+# perfil monta seu detector (kernels, limiares, tabelas, buffers) uma vez ao
+# carregar; trocar de perfil no meio da captura é só apontar para outro
+# detector já pronto.
+#
+# Uso:
+#   motor = MotorDeteccao(ativo='mar-hsv')
+#   contornos, area_percent, mascara = motor(frame_bgr)
+#   motor.trocar('cinza-limiar')            # no meio do laço, sem reabrir a câmera
+#   motor.recarregar_se_mudou()             # pega edições do JSON (perfil ativo / limiares)
+#
+#   detector('mar-hsv')(frame_bgr)          # detector compartilhado (funções legadas)
+#
+#   python3 perfis_deteccao.py [perfis.json]    # lista os perfis e mede cada um
+
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from detector_manchas import (DetectorAmpliado, DetectorLinhas, DetectorManchas, DetectorPiramide,
+                              desenhar_linhas)
+
+CAMINHO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfis_deteccao.json')
+
+# tipo -> classe do detector
+TIPOS = {
+    'hsv': DetectorManchas,
+    'linhas': DetectorLinhas,
+    'cinza': DetectorAmpliado,
+}
+# tipos que aceitam o modo pirâmide (niveis_piramide); no cinza o caminho cheio
+# já passa de 1000 fps e a pirâmide, medida com o fundo acima do limiar
+# (detector_manchas.py --piramide), ficou entre 0.96x e 1.3x: não vale
+TIPOS_PIRAMIDE = ('hsv',)
+
+
+def carregar_config(caminho=None):
+    """(perfis, nome do ativo) lidos do JSON; ValueError se faltar algo."""
+    caminho = caminho or CAMINHO_PADRAO
+    with open(caminho, encoding='utf-8') as f:
+        config = json.load(f)
+    perfis = config.get('perfis') or {}
+    if not perfis:
+        raise ValueError(f"{caminho}: nenhum perfil em 'perfis'")
+    ativo = config.get('ativo', next(iter(perfis)))
+    for nome, parametros in perfis.items():
+        if parametros.get('tipo') not in TIPOS:
+            raise ValueError(f"perfil '{nome}': tipo {parametros.get('tipo')!r} desconhecido "
+                             f"(use {', '.join(TIPOS)})")
+    if ativo not in perfis:
+        raise ValueError(f"perfil ativo '{ativo}' não existe (perfis: {', '.join(perfis)})")
+    return perfis, ativo
+
+
+def criar_detector(parametros, largura=640, altura=480, **ajustes):
+    """Monta o detector de um perfil; as chaves do JSON são os argumentos do construtor.
+
+    ajustes (niveis_piramide) vêm da linha de comando e só valem para os
+    tipos que os aceitam; valores falsos não mudam o perfil.
+    """
+    parametros = dict(parametros)
+    tipo = parametros.pop('tipo')
+    for chave, valor in ajustes.items():
+        if valor:
+            parametros[chave] = valor
+    niveis = parametros.pop('niveis_piramide', 0)
+    if tipo not in TIPOS_PIRAMIDE:
+        niveis = 0
+    fabrica = TIPOS[tipo]
+    if niveis:
+        return DetectorPiramide(fabrica, largura, altura, niveis=niveis, **parametros)
+    return fabrica(largura, altura, **parametros)
+
+
+def perfil(nome=None, caminho=None):
+    """Parâmetros de um perfil como estão no JSON (dict com 'tipo'); None = o ativo."""
+    perfis, ativo = carregar_config(caminho)
+    nome = nome or ativo
+    if nome not in perfis:
+        raise ValueError(f"perfil '{nome}' não existe (perfis: {', '.join(perfis)})")
+    return perfis[nome]
+
+
+def detector_do_perfil(nome=None, largura=640, altura=480, caminho=None, **ajustes):
+    """Só o detector de um perfil, sem motor (scripts que não trocam de perfil)."""
+    return criar_detector(perfil(nome, caminho), largura, altura, **ajustes)
+
+
+class MotorDeteccao:
+    def __init__(self, caminho=None, ativo=None, largura=640, altura=480, **ajustes):
+        self.caminho = caminho or CAMINHO_PADRAO
+        self.largura = largura
+        self.altura = altura
+        self.ajustes = ajustes      # linha de comando (niveis_piramide) por cima do JSON
+        self._carregar(ativo)
+        if ativo and self.nome != ativo:
+            raise ValueError(f"perfil '{ativo}' não existe (perfis: {', '.join(self.detectores)})")
+
+    def _carregar(self, ativo=None):
+        perfis, ativo_config = carregar_config(self.caminho)
+        if ativo not in perfis:
+            ativo = ativo_config
+        # todos os perfis montados agora: trocar depois não aloca nem recalcula nada
+        detectores = {nome: criar_detector(parametros, self.largura, self.altura, **self.ajustes)
+                      for nome, parametros in perfis.items()}
+        self.perfis, self.detectores = perfis, detectores
+        self._mtime = os.path.getmtime(self.caminho) if os.path.exists(self.caminho) else None
+        self.trocar(ativo)
+
+    def trocar(self, nome):
+        if nome not in self.detectores:
+            raise ValueError(f"perfil '{nome}' não existe (perfis: {', '.join(self.detectores)})")
+        self.nome = nome
+        self.tipo = self.perfis[nome]['tipo']
+        self.detector = self.detectores[nome]
+
+    def recarregar_se_mudou(self):
+        """Relê o JSON se ele mudou no disco; True se recarregou.
+
+        Mantém o perfil escolhido (--perfil, teclas 1-9) se ele ainda existir;
+        senão volta para o 'ativo' do arquivo.
+        """
+        mtime = os.path.getmtime(self.caminho) if os.path.exists(self.caminho) else None
+        if mtime == self._mtime:
+            return False
+        try:
+            self._carregar(self.nome)
+        except (ValueError, OSError, json.JSONDecodeError) as e:
+            # arquivo sendo editado / inválido: segue com os perfis atuais
+            print(f"⚠️ Perfis não recarregados: {e}")
+            self._mtime = mtime
+            return False
+        print(f"🔁 Perfis recarregados de {self.caminho}; ativo: {self.nome}")
+        return True
+
+    def detectar(self, frame_bgr):
+        return self.detector(frame_bgr)
+
+    __call__ = detectar
+
+    @property
+    def area_total(self):
+        return self.detector.area_total
+
+    def desenhar(self, frame_bgr, resultado):
+        # Anotação numa cópia do frame, conforme o tipo do perfil ativo
+        itens, area_percent, _ = resultado
+        if self.tipo == 'linhas':
+            return desenhar_linhas(frame_bgr, itens, area_percent)
+        frame_resultado = frame_bgr.copy()
+        cv2.drawContours(frame_resultado, itens, -1, (0, 255, 0), 2)
+        cv2.putText(frame_resultado, f"{self.nome}: {area_percent:.2f}%",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        return frame_resultado
+
+
+# === Detectores compartilhados (para as funções legadas dos scripts) ===
+_detectores = {}
+
+
+def detector(nome):
+    """Detector já montado do perfil `nome` (config padrão), um por processo."""
+    if nome not in _detectores:
+        _detectores[nome] = detector_do_perfil(nome)
+    return _detectores[nome]
+
+
+if __name__ == "__main__":
+    from detector_manchas import _frames_benchmark
+
+    motor = MotorDeteccao(sys.argv[1] if len(sys.argv) >= 2 else None)
+    frames = _frames_benchmark(None, 100)
+    print(f"Perfis de {motor.caminho} (ativo: {motor.nome}):")
+    for nome in motor.detectores:
+        motor.trocar(nome)
+        t0 = time.perf_counter()
+        for f in frames:
+            _, area_percent, _ = motor(f)
+        dt = time.perf_counter() - t0
+        print(f"  {nome:15s} ({motor.tipo}, {type(motor.detector).__name__}): {len(frames) / dt:7.1f} fps | "
+              f"área no último frame {area_percent}%")
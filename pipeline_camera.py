@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# pipeline_camera.py
+# Modo em pipeline para a análise em tempo real: thread de captura, pool de
+# threads de detecção e thread de escrita ligadas por filas circulares limitadas.
+# O frame rate alcançado passa a ser o do estágio mais lento (e não a soma de
+# todos), e o escritor usa o horário de captura para manter o vídeo em 30 fps.
+# A Picamera2 pode ser trocada por uma fonte de arquivo ou sintética (testes sem hardware).
+#
+# Uso (sem câmera):
+#   python3 pipeline_camera.py --video manchas_video_rastro.mp4
+#   python3 pipeline_camera.py --sintetico --duracao 10
+
+import argparse
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+import perfis_deteccao
+from detector_manchas import desenhar_linhas
+from saida_resultados import abrir_saida
+
+DESCARTAR_ANTIGO = 'descartar_antigo'
+BLOQUEAR = 'bloquear'
+
+
+# === Fontes de frames ===
+class FontePicamera:
+    def __init__(self, picam2, rgb_para_bgr=False):
+        self.picam2 = picam2
+        self.rgb_para_bgr = rgb_para_bgr
+
+    def ler(self):
+        frame = self.picam2.capture_array()
+        if self.rgb_para_bgr:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return frame
+
+    def fechar(self):
+        self.picam2.stop()
+
+
+class FonteVideo:
+    def __init__(self, caminho, tempo_real=False):
+        self.cap = cv2.VideoCapture(caminho)
+        if not self.cap.isOpened():
+            raise IOError(f"Erro ao abrir o vídeo: {caminho}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        # tempo_real: entrega no ritmo do vídeo, como uma câmera faria
+        self.intervalo = 1.0 / fps if (tempo_real and fps > 0) else 0.0
+        self._proximo = None
+
+    def ler(self):
+        if self.intervalo:
+            agora = time.perf_counter()
+            if self._proximo is None:
+                self._proximo = agora
+            elif self._proximo > agora:
+                time.sleep(self._proximo - agora)
+            self._proximo += self.intervalo
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def fechar(self):
+        self.cap.release()
+
+
+class FonteSintetica:
+    # Mar azul com manchas escuras que se deslocam; reprodutível com a semente.
+    def __init__(self, largura=640, altura=480, fps=30, n_frames=None, n_manchas=4, semente=0):
+        self.largura = largura
+        self.altura = altura
+        self.intervalo = 1.0 / fps if fps else 0.0
+        self.n_frames = n_frames
+        rnd = np.random.default_rng(semente)
+        self.pos = rnd.uniform([0, 0], [largura, altura], (n_manchas, 2))
+        self.vel = rnd.uniform(-3, 3, (n_manchas, 2))
+        self.raios = rnd.uniform(15, 45, n_manchas)
+        self.fundo = np.empty((altura, largura, 3), np.uint8)
+        self.fundo[:] = (180, 110, 40)          # azul (BGR)
+        self._i = 0
+        self._proximo = None
+
+    def ler(self):
+        if self.n_frames is not None and self._i >= self.n_frames:
+            return None
+        if self.intervalo:
+            agora = time.perf_counter()
+            if self._proximo is None:
+                self._proximo = agora
+            elif self._proximo > agora:
+                time.sleep(self._proximo - agora)
+            self._proximo += self.intervalo
+        self._i += 1
+        self.pos += self.vel
+        self.pos %= (self.largura, self.altura)
+        frame = self.fundo.copy()
+        for (x, y), r in zip(self.pos, self.raios):
+            cv2.ellipse(frame, (int(x), int(y)), (int(r * 1.6), int(r)), 30, 0, 360, (60, 30, 10), -1)
+        return frame
+
+    def fechar(self):
+        pass
+
+
+# === Fila circular limitada ===
+class FilaLimitada:
+    """Fila de capacidade fixa; quando cheia, descarta o mais antigo ou bloqueia."""
+
+    def __init__(self, capacidade, politica=DESCARTAR_ANTIGO, ao_descartar=None):
+        self.capacidade = capacidade
+        self.politica = politica
+        self.ao_descartar = ao_descartar
+        self._itens = deque()
+        self._cond = threading.Condition()
+        self._fechada = False
+        self.descartados = 0
+
+    def colocar(self, item):
+        with self._cond:
+            if len(self._itens) >= self.capacidade:
+                if self.politica == BLOQUEAR:
+                    while len(self._itens) >= self.capacidade and not self._fechada:
+                        self._cond.wait()
+                else:
+                    descartado = self._itens.popleft()
+                    self.descartados += 1
+                    if self.ao_descartar is not None:
+                        self.ao_descartar(descartado)
+            self._itens.append(item)
+            self._cond.notify_all()
+
+    def retirar(self):
+        # Devolve None quando a fila foi fechada e esvaziada.
+        with self._cond:
+            while not self._itens and not self._fechada:
+                self._cond.wait()
+            if not self._itens:
+                return None
+            item = self._itens.popleft()
+            self._cond.notify_all()
+            return item
+
+    def fechar(self):
+        with self._cond:
+            self._fechada = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class Cronometro:
+    # Tempo acumulado de um estágio (thread-safe o bastante: cada estágio soma no seu)
+    def __init__(self, nome):
+        self.nome = nome
+        self.total = 0.0
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def somar(self, dt):
+        with self._lock:
+            self.total += dt
+            self.n += 1
+
+    def media_ms(self):
+        return 1000.0 * self.total / self.n if self.n else 0.0
+
+
+def desenhar_resultado(frame, contornos, area_percent):
+    frame_resultado = frame.copy()
+    cv2.drawContours(frame_resultado, contornos, -1, (0, 255, 0), 2)
+    cv2.putText(frame_resultado, f"Area: {area_percent:.2f}%",
+                (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+    return frame_resultado
+
+
+# === Pipeline ===
+class PipelineCamera:
+    def __init__(self, fonte, detector=None, n_detectores=2,
+                 capacidade=8, politica=DESCARTAR_ANTIGO, saida=None, fps=30,
+                 sincronizar_tempo=True, desenhar=desenhar_resultado,
+                 fabrica_detector=None, resultados=None, perfil='mar-hsv', caminho_perfis=None):
+        self.fonte = fonte
+        # detector: função sem estado, compartilhada; senão cada thread cria o seu
+        # com fabrica_detector (os buffers pré-alocados não podem ser compartilhados),
+        # por padrão o do perfil em perfis_deteccao.json
+        self.detector = detector
+        self.fabrica_detector = fabrica_detector or (
+            lambda: perfis_deteccao.detector_do_perfil(perfil, caminho=caminho_perfis))
+        if desenhar is desenhar_resultado and perfis_deteccao.perfil(perfil, caminho_perfis)['tipo'] == 'linhas':
+            # perfil de linhas devolve o array LINHA, não contornos (como MotorDeteccao.desenhar)
+            desenhar = desenhar_linhas
+        self.n_detectores = n_detectores
+        self.saida = saida
+        self.fps = fps
+        self.sincronizar_tempo = sincronizar_tempo
+        self.desenhar = desenhar        # None: sem preview nem vídeo, não anota nada
+        self.resultados = resultados    # saida_resultados.Saida*: um registro por frame
+        # índices descartados na captura: o escritor não espera por eles
+        self._descartados = set()
+        self.fila_captura = FilaLimitada(capacidade, politica,
+                                         ao_descartar=lambda item: self._descartados.add(item[0]))
+        # a fila de saída bloqueia: descartar aqui deixaria buracos na reordenação
+        self.fila_resultados = FilaLimitada(capacidade, BLOQUEAR)
+        self.tempos = {nome: Cronometro(nome) for nome in ('captura', 'deteccao', 'escrita')}
+        self.areas = []                 # (indice, t_captura, area_percent) em ordem
+        self.ultimo_resultado = None    # último frame anotado (para preview na thread principal)
+        self.frames_capturados = 0
+        self.frames_escritos = 0
+        self.frames_duplicados = 0
+        self._parar = threading.Event()
+        self.erro = None                # primeira exceção de um estágio (relançada em aguardar)
+        self._threads = []
+        self._t0 = None
+
+    # --- estágios ---
+    def _rodar(self, estagio):
+        # Exceção num estágio: para tudo e fecha as filas, senão os outros
+        # estágios ficam bloqueados esperando por ele e aguardar() nunca volta
+        try:
+            estagio()
+        except Exception as e:
+            if self.erro is None:
+                self.erro = e
+                print(f"❌ Erro na thread {threading.current_thread().name}: {e!r}")
+            self._parar.set()
+            self.fila_captura.fechar()
+            self.fila_resultados.fechar()
+
+    def _captura(self):
+        i = 0
+        try:
+            while not self._parar.is_set():
+                t = time.perf_counter()
+                frame = self.fonte.ler()
+                if frame is None:
+                    break
+                self.tempos['captura'].somar(time.perf_counter() - t)
+                self.fila_captura.colocar((i, t, frame))
+                i += 1
+        finally:
+            self.frames_capturados = i
+            self.fila_captura.fechar()
+
+    def _deteccao(self):
+        # OpenCV libera o GIL: várias threads detectam em paralelo de verdade
+        detector = self.detector or self.fabrica_detector()
+        while self.erro is None:
+            item = self.fila_captura.retirar()
+            if item is None:
+                break
+            i, t_captura, frame = item
+            t = time.perf_counter()
+            contornos, area_percent, _ = detector(frame)
+            self.tempos['deteccao'].somar(time.perf_counter() - t)
+            self.fila_resultados.colocar((i, t_captura, frame, contornos, area_percent))
+
+    def _escrita(self):
+        pendentes = {}          # indice -> item: os detectores terminam fora de ordem
+        proximo = 0
+        frame_video = 0
+        anterior = None
+        while self.erro is None:
+            item = self.fila_resultados.retirar()
+            if item is None:
+                break
+            pendentes[item[0]] = item
+            while True:
+                if proximo in pendentes:
+                    _, t_captura, frame, contornos, area_percent = pendentes.pop(proximo)
+                    frame_video, anterior = self._escrever(proximo, t_captura, frame, contornos,
+                                                          area_percent, frame_video, anterior)
+                elif proximo in self._descartados:
+                    self._descartados.discard(proximo)
+                else:
+                    break
+                proximo += 1
+        if self.erro is not None:
+            return
+        # fim do fluxo: o que sobrou (não deveria haver buracos) sai em ordem
+        for i in sorted(pendentes):
+            _, t_captura, frame, contornos, area_percent = pendentes[i]
+            frame_video, anterior = self._escrever(i, t_captura, frame, contornos,
+                                                  area_percent, frame_video, anterior)
+
+    def _escrever(self, i, t_captura, frame, contornos, area_percent, frame_video, anterior):
+        t = time.perf_counter()
+        self.areas.append((i, t_captura, area_percent))
+        if self.resultados is not None:
+            self.resultados.escrever({'frame': i, 't': round(t_captura - self._t0, 4),
+                                      'area_percent': area_percent, 'n_contornos': len(contornos)})
+        if self.desenhar is None:
+            self.tempos['escrita'].somar(time.perf_counter() - t)
+            return frame_video, anterior
+        frame_resultado = self.desenhar(frame, contornos, area_percent)
+        self.ultimo_resultado = frame_resultado
+        if self.saida is not None:
+            if self.sincronizar_tempo:
+                # posição do frame no vídeo pelo horário de captura; repete o anterior
+                # para cobrir buracos e não deixar o vídeo "acelerado"
+                alvo = int(round((t_captura - self._t0) * self.fps))
+                while anterior is not None and frame_video < alvo:
+                    self.saida.write(anterior)
+                    frame_video += 1
+                    self.frames_duplicados += 1
+            self.saida.write(frame_resultado)
+            frame_video += 1
+            self.frames_escritos += 1
+        self.tempos['escrita'].somar(time.perf_counter() - t)
+        return frame_video, frame_resultado
+
+    # --- controle ---
+    def iniciar(self):
+        self._t0 = time.perf_counter()
+        self._threads = [threading.Thread(target=self._rodar, args=(self._captura,), name='captura', daemon=True)]
+        self._detectores = [threading.Thread(target=self._rodar, args=(self._deteccao,), name=f'deteccao-{k}',
+                                             daemon=True)
+                            for k in range(self.n_detectores)]
+        self._escritor = threading.Thread(target=self._rodar, args=(self._escrita,), name='escrita', daemon=True)
+        self._threads += self._detectores + [self._escritor]
+        for th in self._threads:
+            th.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def aguardar(self):
+        """Espera os estágios terminarem; relança a exceção de um estágio que falhou."""
+        self._threads[0].join()
+        for th in self._detectores:
+            th.join()
+        self.fila_resultados.fechar()
+        self._escritor.join()
+        self.fonte.fechar()
+        if self.erro is not None:
+            raise self.erro
+
+    def rodando(self):
+        return self._threads[0].is_alive()
+
+    def relatorio(self):
+        dt = time.perf_counter() - self._t0
+        print("📊 Pipeline:")
+        print(f"  Frames capturados: {self.frames_capturados} | analisados: {len(self.areas)} | "
+              f"descartados na captura: {self.fila_captura.descartados}")
+        print(f"  Taxa alcançada: {len(self.areas) / dt:.1f} fps em {dt:.1f} s")
+        for cron in self.tempos.values():
+            print(f"  {cron.nome}: {cron.media_ms():.2f} ms/frame ({cron.n} frames)")
+        if self.saida is not None:
+            print(f"  Escritos: {self.frames_escritos} (+{self.frames_duplicados} repetidos p/ manter {self.fps} fps)")
+
+
+def executar(fonte, duracao=None, mostrar=False, caminho_saida=None, fps=30,
+             largura=640, altura=480, caminho_resultados=None, **kwargs):
+    saida = None
+    if caminho_saida:
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        saida = cv2.VideoWriter(caminho_saida, fourcc, fps, (largura, altura))
+    if not mostrar and saida is None:
+        # sem monitor e sem gravação: anotação seria trabalho jogado fora
+        kwargs.setdefault('desenhar', None)
+    resultados = abrir_saida(caminho_resultados)
+
+    pipeline = PipelineCamera(fonte, saida=saida, fps=fps, resultados=resultados, **kwargs)
+    pipeline.iniciar()
+    inicio = time.time()
+    try:
+        while pipeline.rodando():
+            # GUI só na thread principal
+            if mostrar and pipeline.ultimo_resultado is not None:
+                cv2.imshow("Manchas - Pipeline", pipeline.ultimo_resultado)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+            else:
+                time.sleep(0.05)
+            if duracao is not None and time.time() - inicio > duracao:
+                break
+    except KeyboardInterrupt:
+        print("🛑 Interrompido pelo usuário.")
+    pipeline.parar()
+    try:
+        pipeline.aguardar()
+    finally:
+        if saida is not None:
+            saida.release()
+            print(f"💾 Vídeo salvo como '{caminho_saida}'")
+        resultados.fechar()
+        if caminho_resultados:
+            print(f"📝 Resultados por frame em '{caminho_resultados}'")
+        if mostrar:
+            cv2.destroyAllWindows()
+    pipeline.relatorio()
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise de manchas em pipeline")
+    parser.add_argument('--video', help="arquivo de vídeo no lugar da câmera")
+    parser.add_argument('--sintetico', action='store_true', help="frames sintéticos no lugar da câmera")
+    parser.add_argument('--duracao', type=float, default=None)
+    parser.add_argument('--detectores', type=int, default=2)
+    parser.add_argument('--capacidade', type=int, default=8)
+    parser.add_argument('--politica', choices=(DESCARTAR_ANTIGO, BLOQUEAR), default=DESCARTAR_ANTIGO)
+    parser.add_argument('--saida', default=None, help="vídeo anotado (ex. manchas_camera.mp4)")
+    parser.add_argument('--mostrar', action='store_true')
+    parser.add_argument('--resultados', default=None, help="registro por frame (.jsonl ou .csv)")
+    parser.add_argument('--perfil', default='mar-hsv', help="perfil de perfis_deteccao.json")
+    args = parser.parse_args()
+
+    if args.video:
+        fonte = FonteVideo(args.video, tempo_real=True)
+    elif args.sintetico:
+        fonte = FonteSintetica()
+    else:
+        from picamera2 import Picamera2
+        picam2 = Picamera2()
+        picam2.start()
+        fonte = FontePicamera(picam2)
+
+    executar(fonte, duracao=args.duracao, mostrar=args.mostrar, caminho_saida=args.saida,
+             caminho_resultados=args.resultados,
+             n_detectores=args.detectores, capacidade=args.capacidade, politica=args.politica,
+             perfil=args.perfil)
+
+
+if __name__ == "__main__":
+    main()
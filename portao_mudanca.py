@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# portao_mudanca.py
+# Portão de mudança na frente do detector: para longas observações de mar
+# parado, compara uma assinatura barata do frame (médias por bloco, num
+# buffer pequeno) com a do último frame ANALISADO e, se nada mudou além do
+# limiar, devolve o resultado anterior sem rodar HSV + morfologia + contornos.
+# Um refresh forçado a cada N frames garante que mudanças lentas não escapem.
+#
+# Uso:
+#   portao = PortaoMudanca(limiar=6, intervalo_max=30)
+#   for frame in frames:
+#       contornos, area_percent, mask = portao(frame, detector)   # ou reaproveitado
+#   portao.imprimir_resumo(fps_camera)
+#
+#   python3 portao_mudanca.py      # benchmark com mar parado + manchas em movimento
+
+import time
+
+import cv2
+import numpy as np
+
+
+class PortaoMudanca:
+    def __init__(self, limiar=6.0, intervalo_max=30, bloco=16):
+        self.limiar = limiar                # maior variação aceita na média de um bloco (níveis 0-255)
+        self.intervalo_max = intervalo_max  # analisa pelo menos a cada N frames
+        self.bloco = bloco                  # lado do bloco em px (16 -> 40x30 médias em 640x480)
+        self.forma = None
+        self.resultado = None               # último resultado do detector (reaproveitado)
+        self.ultima_mudanca = 0.0           # variação máxima medida no último frame
+        self.frames_analisados = 0
+        self.frames_pulados = 0
+        self._desde_analise = 0
+
+    def _alocar(self, forma):
+        altura, largura = forma[:2]
+        self.forma = forma
+        self.tamanho = (max(1, largura // self.bloco), max(1, altura // self.bloco))
+        canais = forma[2:]
+        # assinatura do último frame analisado, a do frame atual e a diferença
+        self.referencia = np.empty(self.tamanho[::-1] + canais, np.uint8)
+        self.assinatura = np.empty_like(self.referencia)
+        self.diferenca = np.empty_like(self.referencia)
+        self.resultado = None
+
+    def mudou(self, frame):
+        """Calcula a assinatura do frame e diz se ele precisa passar pelo detector."""
+        if frame.shape != self.forma:
+            self._alocar(frame.shape)
+        # INTER_AREA com fator inteiro = média exata de cada bloco
+        cv2.resize(frame, self.tamanho, dst=self.assinatura, interpolation=cv2.INTER_AREA)
+        if self.resultado is None or self._desde_analise + 1 >= self.intervalo_max:
+            return True
+        cv2.absdiff(self.assinatura, self.referencia, dst=self.diferenca)
+        self.ultima_mudanca = float(self.diferenca.max())
+        return self.ultima_mudanca > self.limiar
+
+    def __call__(self, frame, detector):
+        # Roda o detector só quando o frame mudou; senão repete o último resultado.
+        # A máscara reaproveitada é o buffer do detector, intocado desde a última análise.
+        if self.mudou(frame):
+            self.resultado = detector(frame)
+            self.referencia[...] = self.assinatura
+            self._desde_analise = 0
+            self.frames_analisados += 1
+        else:
+            self._desde_analise += 1
+            self.frames_pulados += 1
+        return self.resultado
+
+    @property
+    def reaproveitado(self):
+        # True se o último resultado devolvido veio do cache
+        return self._desde_analise > 0
+
+    def fracao_analisada(self):
+        total = self.frames_analisados + self.frames_pulados
+        return self.frames_analisados / total if total else 1.0
+
+    def taxa_efetiva(self, fps):
+        """Detecções por segundo que sobram a uma câmera de `fps` quadros/s."""
+        return fps * self.fracao_analisada()
+
+    def imprimir_resumo(self, fps=None):
+        total = self.frames_analisados + self.frames_pulados
+        texto = (f"🚦 Portão de mudança: {self.frames_analisados}/{total} frames analisados, "
+                 f"{self.frames_pulados} reaproveitados ({100 * (1 - self.fracao_analisada()):.1f}%)")
+        if fps:
+            texto += f" | detecção efetiva {self.taxa_efetiva(fps):.1f} de {fps:.1f} fps"
+        print(texto)
+
+
+# === Benchmark ===
+def _frames_teste(n=300, parado=0.7, ruido=4, semente=0):
+    # Mar parado com ruído de sensor nos primeiros `parado` dos frames, depois manchas se movendo
+    from pipeline_camera import FonteSintetica
+    fonte = FonteSintetica(fps=0, n_frames=n, semente=semente)
+    velocidade = fonte.vel.copy()
+    rnd = np.random.default_rng(semente)
+    frames = []
+    for i in range(n):
+        fonte.vel[:] = 0 if i < parado * n else velocidade
+        frame = fonte.ler()
+        sinal = rnd.integers(-ruido, ruido + 1, frame.shape, dtype=np.int16)
+        frames.append(np.clip(frame + sinal, 0, 255).astype(np.uint8))
+    return frames
+
+
+def benchmark(n=300, fps_camera=30):
+    from detector_manchas import _do_perfil
+
+    frames = _frames_teste(n)
+    fabrica, parametros = _do_perfil('mar-hsv')
+    detector = fabrica(**parametros)
+
+    # referência: detector em todos os frames
+    referencia = [detector(f)[1] for f in frames]
+    portao = PortaoMudanca()
+    erros = [abs(portao(f, detector)[1] - r) for f, r in zip(frames, referencia)]
+
+    def medir(funcao):
+        melhor = float('inf')
+        for _ in range(3):
+            t0 = time.perf_counter()
+            for f in frames:
+                funcao(f)
+            melhor = min(melhor, time.perf_counter() - t0)
+        return len(frames) / melhor
+
+    fps_cheio = medir(detector)
+    fps_portao = medir(lambda f: portao(f, detector))
+    print(f"Portão de mudança em {n} frames 640x480 (70% mar parado com ruído, depois manchas em movimento):")
+    portao = PortaoMudanca()
+    for f in frames:
+        portao(f, detector)
+    portao.imprimir_resumo(fps_camera)
+    print(f"  |Δ area_percent| contra detectar tudo: médio {np.mean(erros):.3f} | máximo {np.max(erros):.3f} p.p.")
+    print(f"  detector em todos os frames {fps_cheio:.1f} fps | com portão {fps_portao:.1f} fps "
+          f"({fps_portao / fps_cheio:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
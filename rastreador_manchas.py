@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# rastreador_manchas.py
+# Rastreamento temporal das manchas entre frames: associa os contornos de cada
+# frame às trilhas abertas (centroide previsto + IoU das caixas), dá IDs estáveis
+# e guarda por trilha a série de área, centroide e taxa de crescimento em arrays
+# compactos. Opcionalmente pula a detecção completa quando as trilhas estão
+# estáveis (o rastreador prevê que nada mudou).
+#
+# Uso:
+#   rastreador = RastreadorManchas()
+#   for i, frame in enumerate(frames):
+#       if rastreador.precisa_detectar(i):
+#           contornos, area_percent, _ = detector(frame)
+#           rastreador.atualizar(contornos, i, area_total)
+#   rastreador.imprimir_resumo()
+
+import cv2
+import numpy as np
+
+# Uma linha por frame detectado; crescimento em px/frame
+HISTORICO = np.dtype([('frame', np.int32), ('area', np.float32), ('area_percent', np.float32),
+                      ('cx', np.float32), ('cy', np.float32), ('crescimento', np.float32)])
+
+
+class Trilha:
+    __slots__ = ('id', 'historico', 'n', 'caixa', 'vx', 'vy', 'perdidos')
+
+    def __init__(self, id_trilha, capacidade=64):
+        self.id = id_trilha
+        self.historico = np.empty(capacidade, HISTORICO)
+        self.n = 0
+        self.caixa = None       # (x, y, w, h) da última detecção
+        self.vx = 0.0           # velocidade do centroide em px/frame
+        self.vy = 0.0
+        self.perdidos = 0       # detecções seguidas sem associação
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def ultimo(self):
+        return self.historico[self.n - 1]
+
+    def prever(self, frame):
+        u = self.ultimo
+        dt = frame - int(u['frame'])
+        return float(u['cx']) + self.vx * dt, float(u['cy']) + self.vy * dt
+
+    def adicionar(self, frame, area, area_percent, cx, cy, caixa):
+        if self.n == len(self.historico):
+            # dobra a capacidade: custo amortizado O(1) por amostra
+            novo = np.empty(2 * len(self.historico), HISTORICO)
+            novo[:self.n] = self.historico
+            self.historico = novo
+        crescimento = 0.0
+        if self.n:
+            u = self.ultimo
+            dt = max(1, frame - int(u['frame']))
+            crescimento = (area - float(u['area'])) / dt
+            self.vx = (cx - float(u['cx'])) / dt
+            self.vy = (cy - float(u['cy'])) / dt
+        self.historico[self.n] = (frame, area, area_percent, cx, cy, crescimento)
+        self.n += 1
+        self.caixa = caixa
+        self.perdidos = 0
+
+    def serie(self):
+        # visão (sem cópia) das amostras válidas
+        return self.historico[:self.n]
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class RastreadorManchas:
+    def __init__(self, dist_max=40.0, iou_min=0.1, max_perdidos=5, area_min=0.0,
+                 pular_estavel=False, tol_area=0.02, tol_px=2.0, intervalo_max=10):
+        self.dist_max = dist_max            # distância máxima (px) do centroide previsto
+        self.iou_min = iou_min              # ou sobreposição mínima das caixas
+        self.max_perdidos = max_perdidos    # detecções sem associação antes de fechar a trilha
+        self.area_min = area_min            # contornos menores são ignorados
+        # --- pulo de detecção ---
+        self.pular_estavel = pular_estavel
+        self.tol_area = tol_area            # variação relativa de área considerada "parada"
+        self.tol_px = tol_px                # deslocamento do centroide considerado "parado"
+        self.intervalo_max = intervalo_max  # detecta pelo menos a cada N frames
+
+        self.ativas = []
+        self.encerradas = []
+        self.proximo_id = 1
+        self.ultimo_frame = None
+        self._estavel = False
+        self.frames_detectados = 0
+        self.frames_pulados = 0
+
+    # === Associação ===
+    def _medir(self, contornos):
+        medidas = []
+        for c in contornos:
+            m = cv2.moments(c)
+            area = m['m00']
+            if area <= self.area_min or area == 0:
+                continue
+            medidas.append((area, m['m10'] / area, m['m01'] / area, cv2.boundingRect(c), c))
+        return medidas
+
+    def atualizar(self, contornos, frame, area_total=None):
+        """Associa os contornos do frame às trilhas; devolve lista de (id, contorno)."""
+        medidas = self._medir(contornos)
+
+        # custos de todos os pares plausíveis; associação gulosa do menor custo
+        pares = []
+        for t_i, trilha in enumerate(self.ativas):
+            px, py = trilha.prever(frame)
+            for m_i, (_, cx, cy, caixa, _) in enumerate(medidas):
+                d = ((cx - px) ** 2 + (cy - py) ** 2) ** 0.5
+                iou = _iou(trilha.caixa, caixa)
+                if d <= self.dist_max or iou >= self.iou_min:
+                    pares.append((d / self.dist_max - iou, t_i, m_i))
+        pares.sort()
+
+        trilha_usada = [False] * len(self.ativas)
+        medida_usada = [False] * len(medidas)
+        associados = []
+        estavel = bool(self.ativas) and len(medidas) == len(self.ativas)
+        for _, t_i, m_i in pares:
+            if trilha_usada[t_i] or medida_usada[m_i]:
+                continue
+            trilha_usada[t_i] = medida_usada[m_i] = True
+            trilha = self.ativas[t_i]
+            area, cx, cy, caixa, c = medidas[m_i]
+            u = trilha.ultimo
+            if (abs(area - float(u['area'])) > self.tol_area * float(u['area'])
+                    or abs(cx - float(u['cx'])) > self.tol_px or abs(cy - float(u['cy'])) > self.tol_px):
+                estavel = False
+            area_percent = area / area_total * 100 if area_total else 0.0
+            trilha.adicionar(frame, area, area_percent, cx, cy, caixa)
+            associados.append((trilha.id, c))
+
+        # sem par: novas trilhas
+        for m_i, (area, cx, cy, caixa, c) in enumerate(medidas):
+            if medida_usada[m_i]:
+                continue
+            estavel = False
+            trilha = Trilha(self.proximo_id)
+            self.proximo_id += 1
+            area_percent = area / area_total * 100 if area_total else 0.0
+            trilha.adicionar(frame, area, area_percent, cx, cy, caixa)
+            self.ativas.append(trilha)
+            associados.append((trilha.id, c))
+
+        # trilhas não vistas: conta e encerra as que sumiram de vez
+        restantes = []
+        for t_i, trilha in enumerate(self.ativas):
+            if t_i < len(trilha_usada) and not trilha_usada[t_i]:
+                estavel = False
+                trilha.perdidos += 1
+                if trilha.perdidos > self.max_perdidos:
+                    self.encerradas.append(trilha)
+                    continue
+            restantes.append(trilha)
+        self.ativas = restantes
+
+        self._estavel = estavel
+        self.ultimo_frame = frame
+        self.frames_detectados += 1
+        return associados
+
+    # === Pulo de detecção ===
+    def precisa_detectar(self, frame):
+        # Sem pulo, sem histórico ou com trilhas mudando: detecta sempre.
+        if not self.pular_estavel or self.ultimo_frame is None or not self._estavel:
+            return True
+        if frame - self.ultimo_frame >= self.intervalo_max:
+            return True
+        self.frames_pulados += 1
+        return False
+
+    # === Saída ===
+    def trilhas(self):
+        return self.encerradas + self.ativas
+
+    def series(self, min_amostras=1):
+        """Série temporal por trilha: {id: array estruturado (frame, area, area_percent, cx, cy, crescimento)}."""
+        return {t.id: t.serie() for t in sorted(self.trilhas(), key=lambda t: t.id)
+                if len(t) >= min_amostras}
+
+    def imprimir_resumo(self, min_amostras=2):
+        series = self.series(min_amostras)
+        print(f"🧭 Trilhas: {len(series)} (ativas {len(self.ativas)}) | frames detectados: "
+              f"{self.frames_detectados} | pulados: {self.frames_pulados}")
+        for id_trilha, s in series.items():
+            print(f"  #{id_trilha}: quadros {s['frame'][0]}-{s['frame'][-1]} ({len(s)} amostras) | "
+                  f"área {s['area_percent'][0]:.2f}% -> {s['area_percent'][-1]:.2f}% | "
+                  f"crescimento médio {s['crescimento'][1:].mean() if len(s) > 1 else 0.0:+.1f} px/quadro | "
+                  f"centroide ({s['cx'][-1]:.0f}, {s['cy'][-1]:.0f})")
+
+
+def desenhar_ids(frame, associados, cor=(255, 255, 0)):
+    # Escreve o ID da trilha no centro da caixa de cada contorno associado
+    for id_trilha, c in associados:
+        x, y, w, h = cv2.boundingRect(c)
+        cv2.putText(frame, f"#{id_trilha}", (x + w // 2, y + h // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, cor, 2)
+    return frame
+
+
+if __name__ == "__main__":
+    # Demonstração com frames sintéticos (pipeline_camera.FonteSintetica)
+    import sys
+    import time
+
+    from detector_manchas import _do_perfil
+    from pipeline_camera import FonteSintetica
+
+    n = int(sys.argv[1]) if len(sys.argv) >= 2 else 300
+    for cenario, pular in (('em movimento', False), ('em movimento', True), ('paradas', True)):
+        fonte = FonteSintetica(fps=0, n_frames=n)
+        if cenario == 'paradas':
+            fonte.vel[:] = 0
+        fabrica, parametros = _do_perfil('mar-hsv')
+        detector = fabrica(fonte.largura, fonte.altura, **parametros)
+        rastreador = RastreadorManchas(pular_estavel=pular)
+        t0 = time.perf_counter()
+        i = 0
+        while True:
+            frame = fonte.ler()
+            if frame is None:
+                break
+            if rastreador.precisa_detectar(i):
+                contornos, area_percent, _ = detector(frame)
+                rastreador.atualizar(contornos, i, cv2.countNonZero(detector.mask_azul))
+            i += 1
+        dt = time.perf_counter() - t0
+        print(f"\n--- manchas {cenario}, pular_estavel={pular}: {i} frames em {dt:.2f} s ---")
+        rastreador.imprimir_resumo()
@@ -1,6 +1,8 @@
 
 from pyais import decode
 import socket
+import ais_nmea
+from ais_udp import configurar_socket, receber_lotes
 
 
 HOST = '0.0.0.0'   
@@ -8,12 +10,16 @@ PORT = 10110
 
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.bind((HOST, PORT))
+configurar_socket(sock)
 print(f"Aguardando dados AIS em {HOST}:{PORT}...")
 
-while True:
-    data, addr = sock.recvfrom(1024)  
-    try:
-        decoded = decode(data)
-        print(decoded)
-    except Exception as e:
-        print(f"Erro ao decodificar: {e}")
+# cada datagrama pode trazer várias sentenças !AIVDM; fragmentos de mensagens
+# multipartes (tipo 5) são remontados antes do decode
+remontador = ais_nmea.Remontador(ais_nmea.novas_estatisticas())
+for sentencas in receber_lotes(sock):
+    for data in ais_nmea.sentencas_completas(sentencas, remontador):
+        try:
+            decoded = decode(data)
+            print(decoded)
+        except Exception as e:
+            print(f"Erro ao decodificar: {e}")
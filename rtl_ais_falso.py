@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# rtl_ais_falso.py
+# Imita o stdout do rtl_ais para testar leitores sem dongle: sentenças
+# !AIVDM (as de decotificador_ficticio) na taxa pedida, intercaladas com as
+# linhas de log típicas do SDR. Como o rtl_ais de verdade, se o leitor não
+# esvazia o pipe a tempo, a escrita bloqueia e o falso reporta "underrun".
+#
+# Uso:
+#   python3 rtl_ais_falso.py --taxa 20000 | python3 ais_nmea.py
+#   python3 ais_processo.py --falso 20000 --duracao 10
+
+import argparse
+import random
+import sys
+import time
+
+from decotificador_ficticio import AIS_EXAMPLES
+
+LOGS = (
+    b"Found 1 device(s):",
+    b"Found Rafael Micro R820T tuner",
+    b"[R82XX] PLL not locked!",
+    b"Signal caught",
+    b"Tuner gain set to automatic.",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rtl_ais falso para testes de carga")
+    parser.add_argument('--taxa', type=float, default=1000, help="linhas/s (0 = o mais rápido possível)")
+    parser.add_argument('--total', type=int, default=None)
+    parser.add_argument('--logs', type=float, default=0.01, help="fração de linhas de log do SDR")
+    parser.add_argument('--sair-apos', type=int, default=None, help="termina com código 1 após N linhas")
+    parser.add_argument('--rajada', type=int, default=64, help="linhas por escrita no pipe")
+    parser.add_argument('--limite-bloqueio', type=float, default=0.05,
+                        help="escrita bloqueada mais que isso (s) conta como underrun")
+    args = parser.parse_args()
+
+    saida = sys.stdout.buffer
+    rnd = random.Random(0)
+    limite = args.total if args.sair_apos is None else args.sair_apos
+    periodo = args.rajada / args.taxa if args.taxa else 0.0
+    proximo = time.perf_counter()
+    enviadas = 0
+    i = 0
+    try:
+        while limite is None or enviadas < limite:
+            linhas = []
+            for _ in range(args.rajada):
+                if rnd.random() < args.logs:
+                    linhas.append(LOGS[rnd.randrange(len(LOGS))])
+                else:
+                    linhas.append(AIS_EXAMPLES[i % len(AIS_EXAMPLES)])
+                    i += 1
+            linhas.append(b'')
+            t0 = time.perf_counter()
+            saida.write(b'\n'.join(linhas))
+            saida.flush()
+            bloqueado = time.perf_counter() - t0
+            if bloqueado > args.limite_bloqueio:
+                # leitor lento: o pipe encheu e o "SDR" perdeu amostras
+                saida.write(b"Buffer underrun: %d ms blocked\n" % int(bloqueado * 1e3))
+            enviadas += args.rajada
+            if periodo:
+                # agenda pelo relógio: taxas altas não acumulam o atraso de cada sleep
+                proximo += periodo
+                atraso = proximo - time.perf_counter()
+                if atraso > 0:
+                    time.sleep(atraso)
+    except (BrokenPipeError, KeyboardInterrupt):
+        return 0
+    return 1 if args.sair_apos is not None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# saida_resultados.py
+# Saída estruturada dos analisadores de câmera/vídeo para rodar sem monitor
+# (satélite / estação terrena): um registro por frame em JSON lines ou CSV.
+#
+# Uso:
+#   with abrir_saida("resultados.jsonl") as saida:     # .csv -> CSV; None -> descarta
+#       saida.escrever({'frame': i, 'area_percent': area, 't_deteccao_ms': dt})
+
+import csv
+import json
+import os
+
+
+class SaidaJSONL:
+    def __init__(self, caminho, flush_a_cada=30):
+        self.caminho = caminho
+        self.arquivo = open(caminho, 'w', encoding='utf-8')
+        self.flush_a_cada = flush_a_cada    # não perde muito se a energia cair
+        self.n = 0
+
+    def escrever(self, registro):
+        self.arquivo.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+        self.arquivo.write('\n')
+        self.n += 1
+        if self.n % self.flush_a_cada == 0:
+            self.arquivo.flush()
+
+    def fechar(self):
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class SaidaCSV:
+    # As colunas vêm do primeiro registro; listas (ex.: ângulos) viram "a;b;c".
+    def __init__(self, caminho, flush_a_cada=30):
+        self.caminho = caminho
+        self.arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+        self.flush_a_cada = flush_a_cada
+        self.escritor = None
+        self.n = 0
+
+    def escrever(self, registro):
+        if self.escritor is None:
+            self.escritor = csv.DictWriter(self.arquivo, fieldnames=list(registro),
+                                           extrasaction='ignore')
+            self.escritor.writeheader()
+        linha = {chave: ';'.join(f"{v:g}" if isinstance(v, float) else str(v) for v in valor)
+                 if isinstance(valor, (list, tuple)) else valor
+                 for chave, valor in registro.items()}
+        self.escritor.writerow(linha)
+        self.n += 1
+        if self.n % self.flush_a_cada == 0:
+            self.arquivo.flush()
+
+    def fechar(self):
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class SaidaNula:
+    n = 0
+
+    def escrever(self, registro):
+        pass
+
+    def fechar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def abrir_saida(caminho):
+    """SaidaCSV para .csv, SaidaJSONL para o resto, SaidaNula se caminho for None."""
+    if caminho is None:
+        return SaidaNula()
+    if os.path.splitext(caminho)[1].lower() == '.csv':
+        return SaidaCSV(caminho)
+    return SaidaJSONL(caminho)